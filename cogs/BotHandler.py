@@ -1,51 +1,14 @@
 import discord
 from discord.ext import commands
-import json
 import traceback
-# Try importing aiomysql, warn if missing
-try:
-    import aiomysql
-except ImportError:
-    aiomysql = None
-    print("❌ [BotHandler] CRITICAL: 'aiomysql' library not found. Please run 'pip install aiomysql'")
-# --- DATABASE CONFIG (FALLBACK) ---
-# Used because self.bot.pool is missing
-DB_CONFIG = {
-    'host': 'ar-men-08.vexyhost.com',
-    'user': 'u8459_duPcRgL0yL',
-    'password': '7J5ut2hbR!Wkbxb6nnB!+xsk',
-    'db': 's8459_database',
-    'port': 3306,
-    'autocommit': True
-}
 class BotHandler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.local_pool = None
-    async def get_db_pool(self):
-        # 1. Try to find global pool (unlikely based on logs, but good practice)
-        pool = (getattr(self.bot, 'pool', None) or 
-                getattr(self.bot, 'db_pool', None) or 
-                getattr(self.bot, 'db', None) or 
-                getattr(self.bot, 'database', None))
-        
-        if pool:
-            return pool
-            
-        # 2. Fallback: Create local pool if not exists
-        if not self.local_pool:
-            if not aiomysql:
-                print("❌ [BotHandler] Cannot create fallback connection: aiomysql not installed.")
-                return None
-            try:
-                print(f"[BotHandler] Attempting fallback connection to {DB_CONFIG['host']}...")
-                self.local_pool = await aiomysql.create_pool(**DB_CONFIG)
-                print("[BotHandler] ✅ Fallback DB connection established successfully!")
-            except Exception as e:
-                print(f"❌ [BotHandler] Failed to create local DB pool: {e}")
-                traceback.print_exc()
-        
-        return self.local_pool
+    async def cog_load(self):
+        # Dashboard components have arbitrary custom_ids, so this only sees clicks no cog claimed
+        self.bot.router.add_fallback(self.handle_component, owner=self, priority=0)
+    def cog_unload(self):
+        self.bot.router.remove_owner(self)
     async def safe_respond(self, interaction: discord.Interaction, message: str, ephemeral: bool = True):
         """Safely respond to an interaction, handling race conditions."""
         try:
@@ -60,65 +23,34 @@ class BotHandler(commands.Cog):
                 pass
         except Exception as e:
             print(f"[BotHandler] Failed to respond: {e}")
-    async def get_component_rows(self, message_id):
-        pool = await self.get_db_pool()
-        
-        if not pool:
-            print("❌ [BotHandler] No valid database connection available.")
-            return None
-        async with pool.acquire() as conn:
-            async with conn.cursor() as cursor:
-                await cursor.execute("SELECT component_rows FROM reaction_role_messages WHERE message_id = %s", (message_id,))
-                result = await cursor.fetchone()
-                
-                if not result:
-                    return None
-                
-                # Handle Dict or Tuple
-                if hasattr(result, 'get'):
-                    return result.get('component_rows')
-                else:
-                    return result[0]
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
-        if interaction.type != discord.InteractionType.component:
-            return
+    async def handle_component(self, interaction: discord.Interaction) -> bool:
+        """Run the actions configured for this message's component. False if the message isn't ours."""
         custom_id = interaction.data.get('custom_id')
-        if not custom_id:
-            return
         # Debug print
         print(f"[BotHandler] Interaction: {custom_id}")
         try:
-            # 1. Fetch Config
-            component_rows_raw = await self.get_component_rows(str(interaction.message.id))
-            
-            if not component_rows_raw:
-                print(f"[BotHandler] Message {interaction.message.id} not found in DB. Ignoring.")
-                return
-            if isinstance(component_rows_raw, str):
-                component_rows = json.loads(component_rows_raw)
-            else:
-                component_rows = component_rows_raw or []
-            matched_component = None
+            # 1. Find Component (parsed index, no DB round trip)
+            index = self.bot.component_index
+            await index.ensure_loaded()
+            if not interaction.message or not await index.resolve_message(interaction.message.id):
+                return False
+            matched_component = index.get_message_component(interaction.message.id, custom_id)
             matched_actions = []
-            # 2. Find Component
-            for row in component_rows:
-                for comp in row:
-                    if comp.get('custom_id') == custom_id:
-                        matched_component = comp
-                        matched_actions = list(comp.get('actions', []))
-                        if comp.get('type') == 3: # Select Menu
-                            selected_values = interaction.data.get('values', [])
-                            if 'options' in comp:
-                                for opt in comp['options']:
-                                    if opt['value'] in selected_values:
-                                        matched_actions.extend(opt.get('actions', []))
-                        break
-                if matched_component:
-                    break
+            if matched_component:
+                matched_actions = list(matched_component.get('actions', []))
+                if matched_component.get('type') == 3: # Select Menu
+                    selected_values = interaction.data.get('values', [])
+                    if 'options' in matched_component:
+                        for opt in matched_component['options']:
+                            if opt['value'] in selected_values:
+                                matched_actions.extend(opt.get('actions', []))
             if not matched_component or not matched_actions:
+                # Components using the older action_type/role_id format are RoleButtons' job
+                legacy = matched_component and (matched_component.get('action_type') or any(opt.get('action_type') for opt in matched_component.get('options', [])))
+                if not matched_component or legacy:
+                    return False
                 await self.safe_respond(interaction, "❌ No actions configured.")
-                return
+                return True
             # Defer the response for longer operations
             try:
                 if not interaction.response.is_done():
@@ -212,6 +144,7 @@ class BotHandler(commands.Cog):
             print(f"Interaction Handler Error: {e}")
             traceback.print_exc()
             await self.safe_respond(interaction, "❌ System Error (Check Bot Console)")
+        return True
     @commands.Cog.listener()
     async def on_ready(self):
         print(f"[BotHandler] ✅ Ready! Logged in as {self.bot.user}")
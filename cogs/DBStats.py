@@ -0,0 +1,78 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import io
+import json
+from datetime import datetime
+
+OWNER_ID = 719511161757761656
+
+class DBStats(commands.Cog):
+    """Owner-only view of the query statistics collected by bot.db"""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        print('✅ DBStats Cog is ready')
+
+    @app_commands.command(name="dbstats", description="[OWNER] Statistik query database")
+    @app_commands.describe(
+        top="Jumlah query yang ditampilkan (default 8)",
+        dump="Lampirkan semua statistik sebagai file JSON",
+        reset="Kosongkan statistik setelah ditampilkan"
+    )
+    async def dbstats(self, interaction: discord.Interaction, top: app_commands.Range[int, 1, 15] = 8, dump: bool = False, reset: bool = False):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("❌ Kamu tidak memiliki akses ke command ini!", ephemeral=True)
+            return
+
+        stats = self.bot.db.stats
+        data = stats.snapshot(self.bot.db.pool)
+
+        embed = discord.Embed(title="🗄️ Database Query Stats", color=discord.Color.blurple())
+
+        since = datetime.fromtimestamp(data["since"]).strftime('%Y-%m-%d %H:%M:%S')
+        total_calls = sum(q["count"] for q in data["queries"])
+        total_ms = sum(q["total_ms"] for q in data["queries"])
+        embed.description = (
+            f"Sejak **{since}** | **{total_calls:,}** query | **{total_ms / 1000:,.1f}s** total\n"
+            f"Slow query threshold: **{data['slow_query_ms']:.0f} ms** | Slow log: **{len(data['slow_log'])}**"
+        )
+
+        wait = data["pool_wait"]
+        pool = data.get("pool")
+        pool_text = f"Wait p50/p95/p99: `{wait['p50_ms']}/{wait['p95_ms']}/{wait['p99_ms']} ms` (max `{wait['max_ms']} ms`)"
+        if pool:
+            pool_text += f"\nKoneksi: **{pool['size'] - pool['free']}** dipakai / **{pool['size']}** terbuka / max **{pool['maxsize']}**"
+        embed.add_field(name="🏊 Pool", value=pool_text, inline=False)
+
+        for q in data["queries"][:top]:
+            query = q["query"] if len(q["query"]) <= 180 else q["query"][:177] + "..."
+            embed.add_field(
+                name=f"{q['count']:,}x | {q['total_ms'] / 1000:,.2f}s total",
+                value=(
+                    f"```sql\n{query}\n```"
+                    f"p50/p95/p99: `{q['p50_ms']}/{q['p95_ms']}/{q['p99_ms']} ms` | rows/call: `{q['avg_rows']}`"
+                    + (f" | ❌ {q['errors']}" if q["errors"] else "")
+                ),
+                inline=False
+            )
+
+        if not data["queries"]:
+            embed.add_field(name="Query", value="*Belum ada query yang tercatat.*", inline=False)
+
+        files = []
+        if dump:
+            raw = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+            files.append(discord.File(io.BytesIO(raw), filename=f"dbstats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+
+        if reset:
+            stats.reset()
+            embed.set_footer(text="Statistik sudah di-reset.")
+
+        await interaction.response.send_message(embed=embed, files=files, ephemeral=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(DBStats(bot))
@@ -3,7 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 import random
 import asyncio
-import aiohttp
+from utils.components_v2 import send_components_v2, edit_components_v2
 
 class Dadu(commands.Cog):
     def __init__(self, bot):
@@ -78,19 +78,9 @@ class Dadu(commands.Cog):
 
     async def send_raw_payload(self, interaction: discord.Interaction, payload: dict, edit: bool = False):
         if edit:
-            url = f"https://discord.com/api/v10/webhooks/{self.bot.user.id}/{interaction.token}/messages/@original"
-            method = "PATCH"
+            await edit_components_v2(interaction, payload, label="Dadu")
         else:
-            url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-            method = "POST"
-            payload = {"type": 4, "data": payload}
-
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, url, json=payload, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error sending Dadu payload: {resp.status} {await resp.text()}")
+            await send_components_v2(interaction, payload, label="Dadu")
 
     @app_commands.command(name="dadu", description="Lempar dadu! Main sendiri, lawan teman, atau dengan taruhan.")
     @app_commands.describe(
@@ -149,10 +139,10 @@ class Dadu(commands.Cog):
                 await interaction.response.send_message("❌ Ekonomi error!", ephemeral=True)
                 return
             
-            if economy.get_balance(interaction.user.id) < bet:
+            if await economy.get_balance(interaction.user.id) < bet:
                 await interaction.response.send_message(f"❌ Saldo Anda kurang!", ephemeral=True)
                 return
-            if economy.get_balance(opponent.id) < bet:
+            if await economy.get_balance(opponent.id) < bet:
                 await interaction.response.send_message(f"❌ Saldo lawan kurang!", ephemeral=True)
                 return
 
@@ -193,8 +183,10 @@ class Dadu(commands.Cog):
 
         # Money
         if bet > 0 and winner:
-            economy.transfer_money(loser.id, winner.id, bet)
-            res_text += f"\n💰 Won {bet} coins!"
+            if (await economy.transfer_many([(loser.id, winner.id, bet)], reason="dadu"))[0]:
+                res_text += f"\n💰 Won {bet} coins!"
+            else:
+                res_text += f"\n❌ {loser.display_name} couldn't pay the bet."
         elif bet > 0:
             res_text += "\n💰 Bet returned."
 
@@ -1,195 +1,455 @@
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
+import asyncio
+import heapq
 import random
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Optional
-import aiohttp
-from utils.database import get_db_connection
+from utils.components_v2 import send_components_v2, UPDATE_MESSAGE
+import aiomysql
+
+
+class InsufficientBalance(Exception):
+    """Rolls back a transfer batch when a sender cannot cover it"""
+
+
+# Rapid-fire game results for the same users are written together after this long
+BALANCE_FLUSH_DELAY = 0.1
+
+# Select values of the unified leaderboard; each one's payload is cached
+LEADERBOARD_CATEGORIES = ("initial", "economy_balance", "fish_networth", "fish_weight", "fish_catch")
+
 
 class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self._init_db()
-
-    def get_conn(self):
-        return get_db_connection()
-
-    def _init_db(self):
-        """Initialize the economy table (using existing slot_users table)"""
-        conn = self.get_conn()
-        if not conn:
-            print("❌ Failed to connect to DB in Economy init")
-            return
-            
-        cursor = conn.cursor()
-        # We use the existing slot_users table as the main economy table
-        try:
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS slot_users (
-                    user_id BIGINT PRIMARY KEY,
-                    balance BIGINT DEFAULT 500,
-                    total_wins INT DEFAULT 0,
-                    total_losses INT DEFAULT 0,
-                    last_daily TEXT,
-                    last_work TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Loans table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS loans (
-                    user_id BIGINT PRIMARY KEY,
-                    amount BIGINT,
-                    due_date TEXT
-                )
-            ''')
-            conn.commit()
-        except Exception as e:
-            print(f"Error initializing Economy DB: {e}")
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+        self.db = bot.db
+        # Loan schedule: min-heap of (due_date, user_id) mirroring the loans table.
+        # loan_due holds the live due date per user; heap entries that no longer
+        # match it (paid early) are skipped when popped.
+        self.loan_heap = []
+        self.loan_due = {}
+        self.loan_wakeup = asyncio.Event()
+        self.loan_task = None
+        # Write-behind balance buffer (see buffer_balance). balance_base is only
+        # kept while a user has buffered or in-flight deltas.
+        self.balance_base = {}      # user_id -> committed balance
+        self.balance_pending = {}   # user_id -> {reason: delta} not written yet
+        self.balance_inflight = {}  # user_id -> delta being written by a flush right now
+        self.balance_direct = {}    # user_id -> direct transactions in progress (flushes leave them alone)
+        self.balance_flush_task = None
+        self.balance_settled = asyncio.Condition()  # notified whenever a flush finishes
+        # Rendered leaderboard payloads; dirty ones are rebuilt by refresh_leaderboards
+        self.leaderboard_payloads = {}
+        self.leaderboard_dirty = set()
+
+    async def cog_load(self):
+        self.bot.router.add_exact("unified_leaderboard_select", self.on_leaderboard_select, owner=self)
+        self.loan_task = asyncio.create_task(self.loan_scheduler())
+        self.refresh_leaderboards.start()
 
     @commands.Cog.listener()
     async def on_ready(self):
         print('✅ Economy Cog is ready')
-        self.check_loans.start()
 
-    @tasks.loop(minutes=1)
-    async def check_loans(self):
-        """Background task to check for due loans"""
-        conn = self.get_conn()
-        if not conn: return
-        
-        try:
-            cursor = conn.cursor()
-            now = datetime.now()
-            
-            # Get due loans
-            cursor.execute('SELECT user_id, amount, due_date FROM loans')
-            loans = cursor.fetchall()
-            
-            for uid, amount, due_date_str in loans:
-                try:
-                    due_date = datetime.fromisoformat(due_date_str)
-                    if now >= due_date:
-                        # Loan is due! Deduct balance
-                        self.update_balance(uid, -amount)
-                        
-                        # Remove from loans table
-                        cursor.execute('DELETE FROM loans WHERE user_id = %s', (uid,))
-                        conn.commit()
-                        
-                        print(f"[LOAN] Auto-deducted {amount} from {uid}")
-                except Exception as e:
-                    print(f"[LOAN ERROR] {e}")
-        except Exception as e:
-            print(f"Error in check_loans: {e}")
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+    # =========================================================================
+    # LOAN SCHEDULER
+    # =========================================================================
+
+    def schedule_loan(self, user_id: int, due_date: datetime):
+        self.loan_due[user_id] = due_date
+        heapq.heappush(self.loan_heap, (due_date, user_id))
+        # Wake the scheduler in case this loan is now the earliest one
+        self.loan_wakeup.set()
+
+    def unschedule_loan(self, user_id: int):
+        self.loan_due.pop(user_id, None)
+
+    async def load_loan_schedule(self):
+        """Rebuild the heap from the loans table (the persisted schedule)"""
+        loans = await self.db.fetchall('SELECT user_id, due_date FROM loans')
+        self.loan_heap, self.loan_due = [], {}
+        for uid, due_date_str in loans:
+            try:
+                self.loan_due[uid] = datetime.fromisoformat(due_date_str)
+            except (TypeError, ValueError) as e:
+                print(f"[LOAN ERROR] Bad due date for {uid}: {e}")
+        self.loan_heap = [(due, uid) for uid, due in self.loan_due.items()]
+        heapq.heapify(self.loan_heap)
+
+    async def loan_scheduler(self):
+        """Sleep until the earliest due loan (or a schedule change), then settle everything due"""
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self.load_loan_schedule()
+                break
+            except Exception as e:
+                print(f"❌ Loan schedule load failed: {e}")
+                await asyncio.sleep(60)
+
+        while True:
+            self.loan_wakeup.clear()
+            timeout = None
+            if self.loan_heap:
+                timeout = max(0.0, (self.loan_heap[0][0] - datetime.now()).total_seconds())
+            try:
+                await asyncio.wait_for(self.loan_wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
 
-    def get_user_data(self, user_id: int):
+            try:
+                await self.settle_due_loans()
+            except Exception as e:
+                print(f"Error in loan scheduler: {e}")
+                await asyncio.sleep(60)
+
+    async def settle_due_loans(self):
+        """Deduct every due loan and delete it, all in one transaction"""
+        now = datetime.now()
+        due = []
+        while self.loan_heap and self.loan_heap[0][0] <= now:
+            due_date, uid = heapq.heappop(self.loan_heap)
+            if self.loan_due.get(uid) == due_date:
+                due.append((due_date, uid))
+        if not due:
+            return
+
+        user_ids = [uid for _, uid in due]
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        try:
+            async with self.direct_balance(*user_ids):
+                async with self.db.transaction() as cursor:
+                    # Lock the rows so a concurrent /pay_loan cannot also settle them
+                    await cursor.execute(
+                        f'SELECT user_id, amount, due_date FROM loans WHERE user_id IN ({placeholders}) FOR UPDATE',
+                        user_ids
+                    )
+                    settled, later = [], []
+                    for uid, amount, due_date_str in await cursor.fetchall():
+                        due_date = datetime.fromisoformat(due_date_str)
+                        if due_date <= now:
+                            settled.append((uid, amount))
+                        else:
+                            later.append((due_date, uid))
+                    if settled:
+                        await self.apply_balance_deltas({uid: -amount for uid, amount in settled}, cursor, reason="loan_due")
+                        await cursor.execute(
+                            f"DELETE FROM loans WHERE user_id IN ({', '.join(['%s'] * len(settled))})",
+                            [uid for uid, _ in settled]
+                        )
+        except Exception:
+            # Put them back so the next wake-up retries
+            for entry in due:
+                heapq.heappush(self.loan_heap, entry)
+            raise
+
+        # Paid (or settled) loans leave the schedule; anything not yet due goes back in
+        for uid in user_ids:
+            self.unschedule_loan(uid)
+        for due_date, uid in later:
+            self.loan_due[uid] = due_date
+            heapq.heappush(self.loan_heap, (due_date, uid))
+        for uid, amount in settled:
+            print(f"[LOAN] Auto-deducted {amount} from {uid}")
+
+    async def get_user_data(self, user_id: int):
         """Get user data from database"""
-        conn = self.get_conn()
-        if not conn: return 500, 0, 0, None, None
+        result = await self.db.fetchone('SELECT balance, total_wins, total_losses, last_daily, last_work FROM slot_users WHERE user_id = %s', (user_id,))
         
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT balance, total_wins, total_losses, last_daily, last_work FROM slot_users WHERE user_id = %s', (user_id,))
-            result = cursor.fetchone()
-            
-            if not result:
-                # Create new user with starting balance
-                cursor.execute('''
-                    INSERT INTO slot_users (user_id, balance, total_wins, total_losses)
-                    VALUES (%s, 500, 0, 0)
-                ''', (user_id,))
-                conn.commit()
-                return 500, 0, 0, None, None
-            
-            return result
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def get_balance(self, user_id: int) -> int:
-        """Get user balance"""
-        # Optimized: Don't call get_user_data which opens another connection
-        conn = self.get_conn()
-        if not conn: return 0
+        if not result:
+            # Create new user with starting balance
+            await self.db.execute('''
+                INSERT IGNORE INTO slot_users (user_id, balance, total_wins, total_losses)
+                VALUES (%s, 500, 0, 0)
+            ''', (user_id,))
+            return 500, 0, 0, None, None
+        
+        return result
+
+    async def get_balance(self, user_id: int) -> int:
+        """Get user balance, including buffered game results not written yet"""
+        if user_id in self.balance_base:
+            return self.balance_base[user_id] + self.buffered_delta(user_id)
+        return await self.fetch_balance(user_id) + self.buffered_delta(user_id)
+
+    async def fetch_balance(self, user_id: int) -> int:
+        """Committed balance straight from the database"""
+        res = await self.db.fetchone('SELECT balance FROM slot_users WHERE user_id = %s', (user_id,))
+        if res:
+            return res[0]
+        # Initialize
+        await self.get_user_data(user_id)
+        return 500
+
+    async def update_balance(self, user_id: int, amount: int, cursor=None, reason: str = None) -> int:
+        """Update user balance. Returns new balance.
+
+        Pass ``cursor`` to apply the change inside the caller's transaction
+        (wrapped in ``direct_balance`` by the caller). Every change is also
+        appended to ``balance_ledger`` with ``reason``.
+        """
+        if cursor is None:
+            async with self.direct_balance(user_id):
+                async with self.db.transaction() as cursor:
+                    return await self.update_balance(user_id, amount, cursor, reason)
+
+        # Create the row with the starting balance if it does not exist yet
+        await cursor.execute('''
+            INSERT INTO slot_users (user_id, balance, total_wins, total_losses)
+            VALUES (%s, 500 + %s, 0, 0)
+            ON DUPLICATE KEY UPDATE balance = balance + %s
+        ''', (user_id, amount, amount))
         
+        # Fetch new balance
+        await cursor.execute('SELECT balance FROM slot_users WHERE user_id = %s', (user_id,))
+        res = await cursor.fetchone()
+        balance = res[0] if res else 0
+        if amount:
+            await self.record_ledger([(user_id, amount, balance)], reason, cursor)
+            self.invalidate_leaderboard("economy_balance")
+        return balance
+
+    def buffered_delta(self, user_id: int) -> int:
+        return self.balance_inflight.get(user_id, 0) + sum(self.balance_pending.get(user_id, {}).values())
+
+    async def buffer_balance(self, user_id: int, amount: int, reason: str = None) -> int:
+        """Write-behind ``update_balance`` for rapid-fire game results. Returns the new balance.
+
+        Deltas are coalesced per user and written by ``flush_balances`` as one
+        multi-row upsert after ``BALANCE_FLUSH_DELAY``; ``get_balance`` already
+        includes them in the meantime.
+        """
+        if user_id not in self.balance_base:
+            balance = await self.fetch_balance(user_id)
+            self.balance_base.setdefault(user_id, balance)
+
+        per_reason = self.balance_pending.setdefault(user_id, {})
+        per_reason[reason] = per_reason.get(reason, 0) + amount
+
+        if self.balance_flush_task is None or self.balance_flush_task.done():
+            self.balance_flush_task = asyncio.create_task(self.balance_flusher())
+        return self.balance_base[user_id] + self.buffered_delta(user_id)
+
+    async def balance_flusher(self):
+        while self.balance_pending:
+            await asyncio.sleep(BALANCE_FLUSH_DELAY)
+            if not await self.flush_balances():
+                await asyncio.sleep(1)
+
+    async def write_buffered(self, pending):
+        """Write ``{user_id: {reason: delta}}`` in one transaction. Returns the new balances."""
+        by_reason = {}
+        for uid, per_reason in pending.items():
+            for reason, delta in per_reason.items():
+                by_reason.setdefault(reason, {})[uid] = delta
+
+        balances = {}
+        async with self.db.transaction() as cursor:
+            for reason, deltas in by_reason.items():
+                balances.update(await self.apply_balance_deltas(deltas, cursor, reason))
+        return balances
+
+    def restore_pending(self, pending):
+        """Put deltas that failed to write back in front of anything buffered meanwhile"""
+        for uid, per_reason in pending.items():
+            merged = self.balance_pending.setdefault(uid, {})
+            for reason, delta in per_reason.items():
+                merged[reason] = merged.get(reason, 0) + delta
+
+    async def flush_balances(self) -> bool:
+        """Write buffered deltas in one transaction (also called on unload/shutdown). False if it failed."""
+        # Users inside a direct transaction or another flush keep their deltas for the next round
+        pending = {
+            uid: self.balance_pending.pop(uid) for uid in list(self.balance_pending)
+            if uid not in self.balance_direct and uid not in self.balance_inflight
+        }
+        if not pending:
+            return True
+
+        for uid, per_reason in pending.items():
+            self.balance_inflight[uid] = sum(per_reason.values())
+        ok = True
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT balance FROM slot_users WHERE user_id = %s', (user_id,))
-            res = cursor.fetchone()
-            if res:
-                return res[0]
-            else:
-                # Initialize
-                self.get_user_data(user_id) 
-                return 500
+            balances = await self.write_buffered(pending)
+            for uid in pending:
+                if uid in self.balance_pending and uid in balances:
+                    self.balance_base[uid] = balances[uid]
+                else:
+                    self.balance_base.pop(uid, None)
+        except Exception as e:
+            print(f"❌ Balance flush failed, retrying: {e}")
+            self.restore_pending(pending)
+            ok = False
         finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+            for uid in pending:
+                self.balance_inflight.pop(uid, None)
+            async with self.balance_settled:
+                self.balance_settled.notify_all()
+        return ok
+
+    @asynccontextmanager
+    async def direct_balance(self, *user_ids):
+        """Keep the write buffer off these users while a transaction reads or writes their balances directly.
+
+        Only these users are affected: their buffered deltas are written first
+        (so the transaction can check against every pending game result) and
+        flushes skip them until the block ends, when the in-memory base is
+        re-read (or dropped if nothing new was buffered). No lock is held
+        across a query, and nesting for the same user is fine.
+        """
+        user_ids = set(user_ids)
+        async with self.balance_settled:
+            # A flush already writing one of them must land first
+            await self.balance_settled.wait_for(lambda: not user_ids & self.balance_inflight.keys())
+            for uid in user_ids:
+                self.balance_direct[uid] = self.balance_direct.get(uid, 0) + 1
 
-    def update_balance(self, user_id: int, amount: int) -> int:
-        """Update user balance. Returns new balance."""
-        
-        # Ensure user exists (this creates it if not)
-        # We can optimize by trying UPDATE first, if affected_rows == 0 then INSERT.
-        # But sticking to existing logic flow for safety:
-        self.get_user_data(user_id)
-        
-        conn = self.get_conn()
-        if not conn: return 0
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('UPDATE slot_users SET balance = balance + %s WHERE user_id = %s', (amount, user_id))
-            conn.commit()
-            
-            # Fetch new balance
-            cursor.execute('SELECT balance FROM slot_users WHERE user_id = %s', (user_id,))
-            res = cursor.fetchone()
-            return res[0] if res else 0
+            claimed = {uid: self.balance_pending.pop(uid) for uid in user_ids if uid in self.balance_pending}
+            if claimed:
+                try:
+                    await self.write_buffered(claimed)
+                except Exception:
+                    self.restore_pending(claimed)
+                    raise
+            yield
         finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+            for uid in user_ids:
+                try:
+                    if uid in self.balance_pending:
+                        # Buffered during the block: rebase on what is committed now
+                        self.balance_base[uid] = await self.fetch_balance(uid)
+                    else:
+                        self.balance_base.pop(uid, None)
+                except Exception:
+                    self.balance_base.pop(uid, None)
+                self.balance_direct[uid] -= 1
+                if not self.balance_direct[uid]:
+                    del self.balance_direct[uid]
+
+    async def apply_balance_deltas(self, deltas: dict, cursor, reason: str = None) -> dict:
+        """Add ``{user_id: delta}`` to many balances with one multi-row upsert. Returns new balances."""
+        rows = [(uid, delta) for uid, delta in deltas.items() if delta]
+        if not rows:
+            return {}
+        # New rows start at 500 + delta; VALUES(balance) - 500 recovers the delta for existing rows
+        await cursor.executemany('''
+            INSERT INTO slot_users (user_id, balance, total_wins, total_losses)
+            VALUES (%s, 500 + %s, 0, 0)
+            ON DUPLICATE KEY UPDATE balance = balance + VALUES(balance) - 500
+        ''', rows)
+
+        await cursor.execute(
+            f"SELECT user_id, balance FROM slot_users WHERE user_id IN ({', '.join(['%s'] * len(rows))})",
+            [uid for uid, _ in rows]
+        )
+        balances = dict(await cursor.fetchall())
+        await self.record_ledger([(uid, delta, balances.get(uid, 0)) for uid, delta in rows], reason, cursor)
+        self.invalidate_leaderboard("economy_balance")
+        return balances
+
+    async def record_ledger(self, entries, reason, cursor):
+        """Append ``(user_id, delta, balance_after)`` rows to the balance ledger"""
+        now = datetime.now()
+        await cursor.executemany('''
+            INSERT INTO balance_ledger (user_id, delta, balance_after, reason, created_at)
+            VALUES (%s, %s, %s, %s, %s)
+        ''', [(uid, delta, after, reason, now) for uid, delta, after in entries])
+
+    async def balance_as_of(self, user_id: int, when: datetime) -> Optional[int]:
+        """Balance right after the last change at or before ``when`` (None if the ledger has nothing that old)"""
+        res = await self.db.fetchone('''
+            SELECT balance_after FROM balance_ledger
+            WHERE user_id = %s AND created_at <= %s
+            ORDER BY created_at DESC, id DESC LIMIT 1
+        ''', (user_id, when))
+        if res:
+            return res[0]
+        # No change before ``when``: the balance then is the one just before the first later change
+        res = await self.db.fetchone('''
+            SELECT balance_after - delta FROM balance_ledger
+            WHERE user_id = %s AND created_at > %s
+            ORDER BY created_at, id LIMIT 1
+        ''', (user_id, when))
+        return res[0] if res else None
+
+    async def get_ledger(self, user_id: int, limit: int = 10):
+        return await self.db.fetchall('''
+            SELECT delta, balance_after, reason, created_at FROM balance_ledger
+            WHERE user_id = %s ORDER BY created_at DESC, id DESC LIMIT %s
+        ''', (user_id, limit))
+
+    async def transfer_money(self, sender_id: int, receiver_id: int, amount: int, reason: str = "transfer"):
+        """Transfer money between users. Returns (sender_balance, receiver_balance), or None if it failed."""
+        results = await self.transfer_many([(sender_id, receiver_id, amount)], reason)
+        return results[0]
+
+    async def transfer_many(self, transfers, reason: str = "transfer"):
+        """Settle ``(sender_id, receiver_id, amount)`` transfers together, all or nothing.
+
+        The transfers are netted per user and applied by one multi-row
+        conditional UPDATE: a row whose net change is negative only matches if
+        the balance covers it, so fewer affected rows than users means someone
+        could not pay and the whole batch is rolled back. Returns, per transfer,
+        ``(sender_balance, receiver_balance)``, or all None if it failed.
+        """
+        failed = [None] * len(transfers)
+        if not transfers or any(amount <= 0 or sender == receiver for sender, receiver, amount in transfers):
+            return failed
+
+        net = {}
+        for sender, receiver, amount in transfers:
+            net[sender] = net.get(sender, 0) - amount
+            net[receiver] = net.get(receiver, 0) + amount
+        net = {uid: delta for uid, delta in net.items() if delta}
+        users = list({uid for sender, receiver, _ in transfers for uid in (sender, receiver)})
+
+        case = "CASE user_id " + " ".join("WHEN %s THEN %s" for _ in net) + " END"
+        case_args = [arg for item in net.items() for arg in item]
+        marks = ", ".join(["%s"] * len(net))
 
-    def transfer_money(self, sender_id: int, receiver_id: int, amount: int) -> bool:
-        """Transfer money between users. Returns True if successful."""
-        if amount <= 0: return False
-            
-        sender_bal = self.get_balance(sender_id)
-        if sender_bal < amount: return False
-            
-        # Ensure receiver exists
-        self.get_user_data(receiver_id)
-        
-        conn = self.get_conn()
-        if not conn: return False
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute('UPDATE slot_users SET balance = balance - %s WHERE user_id = %s', (amount, sender_id))
-            cursor.execute('UPDATE slot_users SET balance = balance + %s WHERE user_id = %s', (amount, receiver_id))
-            conn.commit()
-            return True
-        except Exception:
-            conn.rollback()
-            return False
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+            # The balance check must see buffered game results too
+            async with self.direct_balance(*users):
+                async with self.db.transaction() as cursor:
+                    if net:
+                        # Users who never played still start with 500
+                        await cursor.executemany('''
+                            INSERT IGNORE INTO slot_users (user_id, balance, total_wins, total_losses)
+                            VALUES (%s, 500, 0, 0)
+                        ''', [(uid,) for uid in net])
+                        updated = await cursor.execute(
+                            f"UPDATE slot_users SET balance = balance + {case} "
+                            f"WHERE user_id IN ({marks}) AND ({case} > 0 OR balance + {case} >= 0)",
+                            (*case_args, *net, *case_args, *case_args)
+                        )
+                        if updated != len(net):
+                            raise InsufficientBalance()
+
+                    marks = ", ".join(["%s"] * len(users))
+                    await cursor.execute(f"SELECT user_id, balance FROM slot_users WHERE user_id IN ({marks})", users)
+                    balances = dict(await cursor.fetchall())
+
+                    # Walk back from the final balances to get each step's balance for the ledger
+                    running = dict(balances)
+                    steps = []
+                    for sender, receiver, amount in reversed(transfers):
+                        steps.append(((sender, -amount, running[sender]), (receiver, amount, running[receiver])))
+                        running[sender] += amount
+                        running[receiver] -= amount
+                    steps.reverse()
+                    await self.record_ledger([entry for step in steps for entry in step], reason, cursor)
+        except InsufficientBalance:
+            return failed
+        except Exception as e:
+            print(f"❌ Transfer failed: {e}")
+            return failed
+
+        self.invalidate_leaderboard("economy_balance")
+        return [(debit[2], credit[2]) for debit, credit in steps]
 
     @app_commands.command(name="balance", description="Cek saldo koin Anda")
     async def balance(self, interaction: discord.Interaction, user: Optional[discord.Member] = None):
@@ -198,7 +458,7 @@ class Economy(commands.Cog):
             await interaction.response.send_message("❌ Bot tidak memiliki saldo!", ephemeral=True)
             return
 
-        balance = self.get_balance(target.id)
+        balance = await self.get_balance(target.id)
         
         embed = discord.Embed(
             title=f"💰 Saldo {target.display_name}",
@@ -223,10 +483,11 @@ class Economy(commands.Cog):
             await interaction.response.send_message("❌ Jumlah harus lebih dari 0!", ephemeral=True)
             return
 
-        if self.transfer_money(interaction.user.id, user.id, amount):
+        result = await self.transfer_money(interaction.user.id, user.id, amount)
+        if result:
             embed = discord.Embed(
                 title="💸 Transfer Berhasil",
-                description=f"Anda berhasil mentransfer **{amount:,}** koin ke {user.mention}",
+                description=f"Anda berhasil mentransfer **{amount:,}** koin ke {user.mention}\nSaldo sekarang: **{result[0]:,}** koin",
                 color=discord.Color.green()
             )
             await interaction.response.send_message(embed=embed)
@@ -236,7 +497,7 @@ class Economy(commands.Cog):
     @app_commands.command(name="daily", description="Klaim bonus harian (setiap 24 jam)")
     async def daily(self, interaction: discord.Interaction):
         user_id = interaction.user.id
-        _, _, _, last_daily, _ = self.get_user_data(user_id)
+        _, _, _, last_daily, _ = await self.get_user_data(user_id)
         
         now = datetime.now()
         
@@ -258,22 +519,13 @@ class Economy(commands.Cog):
                 pass # Invalid date format, allow claim
 
         reward = 200
-        self.update_balance(user_id, reward)
+        new_balance = await self.update_balance(user_id, reward, reason="daily")
         
-        conn = self.get_conn()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute('UPDATE slot_users SET last_daily = %s WHERE user_id = %s', (now.isoformat(), user_id))
-                conn.commit()
-            finally:
-                if conn.is_connected():
-                    cursor.close()
-                    conn.close()
+        await self.db.execute('UPDATE slot_users SET last_daily = %s WHERE user_id = %s', (now.isoformat(), user_id))
         
         embed = discord.Embed(
             title="🌞 Daily Reward",
-            description=f"Kamu mendapatkan **{reward}** koin!\nSaldo sekarang: **{self.get_balance(user_id):,}** koin",
+            description=f"Kamu mendapatkan **{reward}** koin!\nSaldo sekarang: **{new_balance:,}** koin",
             color=discord.Color.gold()
         )
         await interaction.response.send_message(embed=embed)
@@ -281,7 +533,7 @@ class Economy(commands.Cog):
     @app_commands.command(name="work", description="Bekerja untuk mendapatkan koin (setiap 1 jam)")
     async def work(self, interaction: discord.Interaction):
         user_id = interaction.user.id
-        _, _, _, _, last_work = self.get_user_data(user_id)
+        _, _, _, _, last_work = await self.get_user_data(user_id)
         
         now = datetime.now()
         
@@ -302,25 +554,16 @@ class Economy(commands.Cog):
                 pass
 
         earnings = random.randint(50, 350)
-        self.update_balance(user_id, earnings)
+        new_balance = await self.update_balance(user_id, earnings, reason="work")
         
-        conn = self.get_conn()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute('UPDATE slot_users SET last_work = %s WHERE user_id = %s', (now.isoformat(), user_id))
-                conn.commit()
-            finally:
-                if conn.is_connected():
-                    cursor.close()
-                    conn.close()
+        await self.db.execute('UPDATE slot_users SET last_work = %s WHERE user_id = %s', (now.isoformat(), user_id))
         
         jobs = ["Barista", "Programmer", "Gamer", "Chef", "Driver", "Artist", "Editor", "Slave", "Mechanic"]
         job = random.choice(jobs)
         
         embed = discord.Embed(
             title="💼 Kerja Keras",
-            description=f"Kamu bekerja sebagai **{job}** dan mendapat **{earnings}** koin!\nSaldo sekarang: **{self.get_balance(user_id):,}** koin",
+            description=f"Kamu bekerja sebagai **{job}** dan mendapat **{earnings}** koin!\nSaldo sekarang: **{new_balance:,}** koin",
             color=discord.Color.blue()
         )
         await interaction.response.send_message(embed=embed)
@@ -339,7 +582,7 @@ class Economy(commands.Cog):
             await interaction.response.send_message("❌ Jumlah harus lebih dari 0!", ephemeral=True)
             return
 
-        new_balance = self.update_balance(user.id, -amount)
+        new_balance = await self.update_balance(user.id, -amount, reason="admin")
         
         embed = discord.Embed(
             title="💸 Remove Money",
@@ -348,6 +591,34 @@ class Economy(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="balance_history", description="[OWNER] Riwayat saldo user (untuk komplain)")
+    @app_commands.describe(user="User yang dicek", waktu="Saldo pada waktu ini (YYYY-MM-DD HH:MM)")
+    async def balance_history(self, interaction: discord.Interaction, user: discord.Member, waktu: Optional[str] = None):
+        # Restricted to specific user ID
+        if interaction.user.id != 719511161757761656:
+            await interaction.response.send_message("❌ Kamu tidak memiliki akses ke command ini!", ephemeral=True)
+            return
+
+        embed = discord.Embed(title=f"📒 Riwayat Saldo {user.display_name}", color=discord.Color.blue())
+
+        if waktu:
+            try:
+                when = datetime.strptime(waktu, "%Y-%m-%d %H:%M")
+            except ValueError:
+                await interaction.response.send_message("❌ Format waktu salah! Gunakan `YYYY-MM-DD HH:MM`.", ephemeral=True)
+                return
+            balance = await self.balance_as_of(user.id, when)
+            value = f"**{balance:,}** koin" if balance is not None else "Tidak ada data"
+            embed.add_field(name=f"Saldo pada {waktu}", value=value, inline=False)
+
+        entries = await self.get_ledger(user.id)
+        lines = [
+            f"`{created_at:%Y-%m-%d %H:%M}` **{delta:+,}** → {balance_after:,} ({reason or '-'})"
+            for delta, balance_after, reason, created_at in entries
+        ]
+        embed.add_field(name="10 Transaksi Terakhir", value="\n".join(lines) or "Belum ada transaksi", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="ngutang", description="Pinjam koin (Jatuh tempo 24 jam)")
     @app_commands.describe(amount="Jumlah pinjaman (Max 15000)")
     async def ngutang(self, interaction: discord.Interaction, amount: int):
@@ -357,82 +628,66 @@ class Economy(commands.Cog):
             await interaction.response.send_message("❌ Jumlah pinjaman harus 1 - 15000 koin!", ephemeral=True)
             return
 
-        conn = self.get_conn()
-        if not conn:
-             await interaction.response.send_message("❌ Database Error", ephemeral=True)
-             return
-             
+        # Check if already has loan (Fast check)
+        if await self.db.fetchone('SELECT amount FROM loans WHERE user_id = %s', (user_id,)):
+            await interaction.response.send_message("❌ **Bayar dulu hutang sebelumnya!**\nLunasi hutang lama baru bisa pinjam lagi.", ephemeral=True)
+            return
+
+        due_date = datetime.now() + timedelta(days=1)
+        
         try:
-            cursor = conn.cursor()
+            # Try to insert loan first (Atomic check via Primary Key)
+            await self.db.execute('INSERT INTO loans (user_id, amount, due_date) VALUES (%s, %s, %s)', 
+                                  (user_id, amount, due_date.isoformat()))
             
-            # Check if already has loan (Fast check)
-            cursor.execute('SELECT amount FROM loans WHERE user_id = %s', (user_id,))
-            if cursor.fetchone():
-                await interaction.response.send_message("❌ **Bayar dulu hutang sebelumnya!**\nLunasi hutang lama baru bisa pinjam lagi.", ephemeral=True)
-                return
-
-            due_date = datetime.now() + timedelta(days=1)
+            # If successful, give money
+            await self.update_balance(user_id, amount, reason="loan")
+            self.schedule_loan(user_id, due_date)
             
-            try:
-                # Try to insert loan first (Atomic check via Primary Key)
-                cursor.execute('INSERT INTO loans (user_id, amount, due_date) VALUES (%s, %s, %s)', 
-                               (user_id, amount, due_date.isoformat()))
-                conn.commit()
-                
-                # If successful, give money
-                self.update_balance(user_id, amount)
-                
-                embed = discord.Embed(
-                    title="💸 Pinjaman Berhasil",
-                    description=f"Anda meminjam **{amount:,}** koin.\n\n⚠️ **Jatuh Tempo:** <t:{int(due_date.timestamp())}:R>\nJika telat, saldo akan otomatis terpotong (bisa minus).",
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(embed=embed)
-                
-            except mysql.connector.IntegrityError:
-                # Race condition caught: User already has a loan
-                await interaction.response.send_message("❌ **Bayar dulu hutang sebelumnya!**", ephemeral=True)
-            except Exception as e:
-                print(f"Error in ngutang: {e}")
-                await interaction.response.send_message("❌ Terjadi kesalahan saat memproses pinjaman.", ephemeral=True)
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+            embed = discord.Embed(
+                title="💸 Pinjaman Berhasil",
+                description=f"Anda meminjam **{amount:,}** koin.\n\n⚠️ **Jatuh Tempo:** <t:{int(due_date.timestamp())}:R>\nJika telat, saldo akan otomatis terpotong (bisa minus).",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            
+        except aiomysql.IntegrityError:
+            # Race condition caught: User already has a loan
+            await interaction.response.send_message("❌ **Bayar dulu hutang sebelumnya!**", ephemeral=True)
+        except Exception as e:
+            print(f"Error in ngutang: {e}")
+            await interaction.response.send_message("❌ Terjadi kesalahan saat memproses pinjaman.", ephemeral=True)
 
     @app_commands.command(name="pay_loan", description="Bayar hutang lebih awal")
     async def pay_loan(self, interaction: discord.Interaction):
         user_id = interaction.user.id
-        conn = self.get_conn()
-        if not conn: return
         
-        try:
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT amount FROM loans WHERE user_id = %s', (user_id,))
-            result = cursor.fetchone()
-            
-            if not result:
-                await interaction.response.send_message("✅ Anda tidak memiliki hutang!", ephemeral=True)
-                return
-                
-            amount = result[0]
-            balance = self.get_balance(user_id)
-            
-            if balance < amount:
-                await interaction.response.send_message(f"❌ Saldo tidak cukup untuk bayar hutang! (Butuh: {amount}, Ada: {balance})", ephemeral=True)
-                return
-                
-            # Pay loan
-            self.update_balance(user_id, -amount)
-            cursor.execute('DELETE FROM loans WHERE user_id = %s', (user_id,))
-            conn.commit()
-            
-            await interaction.response.send_message(f"✅ Hutang sebesar **{amount:,}** koin telah lunas!", ephemeral=True)
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+        # Pending slot losses must count before checking the balance
+        async with self.direct_balance(user_id):
+            async with self.db.transaction() as cursor:
+                # Lock the loan so the scheduler cannot settle it at the same time
+                await cursor.execute('SELECT amount FROM loans WHERE user_id = %s FOR UPDATE', (user_id,))
+                result = await cursor.fetchone()
+                if result:
+                    amount = result[0]
+                    await cursor.execute('SELECT balance FROM slot_users WHERE user_id = %s FOR UPDATE', (user_id,))
+                    row = await cursor.fetchone()
+                    balance = row[0] if row else 500
+                    if balance >= amount:
+                        # Pay loan
+                        await self.update_balance(user_id, -amount, cursor, reason="loan_payment")
+                        await cursor.execute('DELETE FROM loans WHERE user_id = %s', (user_id,))
+
+        if not result:
+            await interaction.response.send_message("✅ Anda tidak memiliki hutang!", ephemeral=True)
+            return
+
+        if balance < amount:
+            await interaction.response.send_message(f"❌ Saldo tidak cukup untuk bayar hutang! (Butuh: {amount}, Ada: {balance})", ephemeral=True)
+            return
+
+        self.unschedule_loan(user_id)
+        await interaction.response.send_message(f"✅ Hutang sebesar **{amount:,}** koin telah lunas!", ephemeral=True)
 
     # =========================================================================
     # UNIFIED LEADERBOARD (RAW PAYLOAD IMPLEMENTATION)
@@ -441,43 +696,51 @@ class Economy(commands.Cog):
     @app_commands.command(name="leaderboard", description="Lihat leaderboard server (Ekonomi & Fishing)")
     async def leaderboard(self, interaction: discord.Interaction):
         # Initial payload for leaderboard
-        payload = self.build_leaderboard_payload("initial")
+        payload = await self.get_leaderboard_payload("initial")
         await self.send_raw_payload(interaction, payload)
 
+    def invalidate_leaderboard(self, *categories):
+        """Mark categories stale; the refresh task rebuilds them (writes never wait on a rebuild)"""
+        self.leaderboard_dirty.update(categories)
+
+    async def get_leaderboard_payload(self, selected_value):
+        """Serve the cached payload; only a category that was never built costs a rebuild here"""
+        payload = self.leaderboard_payloads.get(selected_value)
+        if payload is None:
+            payload = await self.build_leaderboard_payload(selected_value)
+            if selected_value in LEADERBOARD_CATEGORIES:
+                self.leaderboard_payloads[selected_value] = payload
+        return payload
+
+    @tasks.loop(seconds=30)
+    async def refresh_leaderboards(self):
+        dirty, self.leaderboard_dirty = self.leaderboard_dirty, set()
+        for category in dirty:
+            if category not in self.leaderboard_payloads:
+                continue  # Never viewed yet; built on first click
+            try:
+                self.leaderboard_payloads[category] = await self.build_leaderboard_payload(category)
+            except Exception as e:
+                print(f"❌ Leaderboard refresh failed ({category}): {e}")
+                self.leaderboard_dirty.add(category)
+
+    @refresh_leaderboards.before_loop
+    async def before_refresh_leaderboards(self):
+        await self.bot.wait_until_ready()
+
     async def send_raw_payload(self, interaction: discord.Interaction, payload: dict):
-        url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        json_payload = {"type": 4, "data": payload}
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=json_payload, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error sending Leaderboard payload: {resp.status} {await resp.text()}")
+        await send_components_v2(interaction, payload, label="Leaderboard")
 
     async def update_raw_message(self, interaction: discord.Interaction, payload: dict):
-        url = f"https://discord.com/api/v10/webhooks/{self.bot.user.id}/{interaction.token}/messages/@original"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
         # Type 7: Update Message
-        json_payload = {"type": 7, "data": payload}
-        
-        callback_url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-        async with aiohttp.ClientSession() as session:
-            async with session.post(callback_url, json=json_payload, headers=headers) as resp:
-                    if resp.status != 200:
-                        print(f"Error updating message: {await resp.text()}")
+        await send_components_v2(interaction, payload, UPDATE_MESSAGE, label="Leaderboard")
 
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
-        if interaction.type == discord.InteractionType.component:
-            custom_id = interaction.data.get("custom_id")
-            
-            if custom_id == "unified_leaderboard_select":
-                selected = interaction.data["values"][0]
-                payload = self.build_leaderboard_payload(selected)
-                await self.update_raw_message(interaction, payload)
+    async def on_leaderboard_select(self, interaction: discord.Interaction):
+        selected = interaction.data["values"][0]
+        payload = await self.get_leaderboard_payload(selected)
+        await self.update_raw_message(interaction, payload)
 
-    def build_leaderboard_payload(self, selected_value):
+    async def build_leaderboard_payload(self, selected_value):
         # Determine content based on selection
         content_text = ""
         
@@ -485,26 +748,17 @@ class Economy(commands.Cog):
             content_text = "## Silakan pilih kategori leaderboard di bawah ini."
             
         elif selected_value == "economy_balance":
-            conn = self.get_conn()
-            if conn:
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT user_id, balance FROM slot_users ORDER BY balance DESC LIMIT 10')
-                    top_users = cursor.fetchall()
-                    
-                    content_text = "## 💰 Global Rich List (Economy)\n\n"
-                    if not top_users:
-                        content_text += "*Belum ada data.*"
-                    else:
-                        for i, (uid, bal) in enumerate(top_users, 1):
-                            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-                            user = self.bot.get_user(uid)
-                            name = user.name if user else f"User {uid}"
-                            content_text += f"{medal} **{name}** - {bal:,} koin\n"
-                finally:
-                    if conn.is_connected():
-                        cursor.close()
-                        conn.close()
+            top_users = await self.db.fetchall('SELECT user_id, balance FROM slot_users ORDER BY balance DESC LIMIT 10')
+            
+            content_text = "## 💰 Global Rich List (Economy)\n\n"
+            if not top_users:
+                content_text += "*Belum ada data.*"
+            else:
+                for i, (uid, bal) in enumerate(top_users, 1):
+                    medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+                    user = self.bot.get_user(uid)
+                    name = user.name if user else f"User {uid}"
+                    content_text += f"{medal} **{name}** - {bal:,} koin\n"
 
         elif selected_value.startswith("fish_"):
             fishing_cog = self.bot.get_cog("Fishing")
@@ -512,7 +766,7 @@ class Economy(commands.Cog):
                 content_text = "❌ Fishing cog not loaded!"
             else:
                 if selected_value == "fish_networth":
-                    data = fishing_cog.get_networth_leaderboard()
+                    data = await fishing_cog.get_networth_leaderboard()
                     content_text = "## 🐟 Fishing Networth Leaderboard\n\n"
                     if not data:
                         content_text += "*Belum ada data.*"
@@ -525,7 +779,7 @@ class Economy(commands.Cog):
                             content_text += f"**{i}. {username}** - 💰 {total_value:,}\n"
 
                 elif selected_value == "fish_weight":
-                    data = fishing_cog.get_weight_leaderboard()
+                    data = await fishing_cog.get_weight_leaderboard()
                     content_text = "## 🏆 Leaderboard Berat Ikan\n\n"
                     if not data:
                         content_text += "*Belum ada data.*"
@@ -538,7 +792,7 @@ class Economy(commands.Cog):
                             content_text += f"**{i}. {username}** - {fish_name} ({weight}kg) `{rarity}`\n"
 
                 elif selected_value == "fish_catch":
-                    data = fishing_cog.get_top_fisher_leaderboard()
+                    data = await fishing_cog.get_top_fisher_leaderboard()
                     content_text = "## 🎣 Top Fisher Leaderboard\n\n"
                     if not data:
                         content_text += "*Belum ada data.*"
@@ -618,8 +872,13 @@ class Economy(commands.Cog):
             ]
         }
 
-    def cog_unload(self):
-        self.check_loans.cancel()
+    async def cog_unload(self):
+        if self.loan_task:
+            self.loan_task.cancel()
+        self.refresh_leaderboards.cancel()
+        # Not cancelling the flusher: a flush cut short would drop its deltas
+        await self.flush_balances()
+        self.bot.router.remove_owner(self)
         # self.conn.close() - Managed by pool now
 
 async def setup(bot):
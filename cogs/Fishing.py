@@ -1,11 +1,12 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import mysql.connector # Added
 import random
-import aiohttp
+from utils.components_v2 import send_components_v2, UPDATE_MESSAGE
 from datetime import datetime, timedelta
-from utils.database import get_db_connection
+from utils.cache import TTLCache
+from utils.sampling import AliasSampler
+from utils.topk import TopK
 
 # DB_PATH = 'database.db' # Not used anymore
 
@@ -13,13 +14,25 @@ class Fishing(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         # self.conn = sqlite3.connect(DB_PATH) # Removed SQLite
-        self._init_db()
+        self.db = bot.db
         
         # Cooldown Mappings for Manual Check
         # Normal: 15s, Buff (Rokok Surya): 5s
         # Cooldown Mappings for Manual Check
         # Normal: 15s, Buff (Rokok Surya): 5s
         self.catch_cooldowns = {}
+
+        # Per-user fishing state (equipped rod, rod levels, buffs, materials, items).
+        # Loaded once per user and kept up to date by the mutation helpers below,
+        # so catch / forge / shop read it from memory instead of MySQL.
+        self.state_cache = TTLCache(maxsize=2000, ttl=600)
+
+        # user_id -> {"daily": key, "weekly": key} of quest periods already generated,
+        # so quests are checked/created at most once per period per user
+        self.quest_memo = TTLCache(maxsize=5000, ttl=8 * 24 * 3600)
+
+        # Leaderboards served from fishing_stats + in-memory top-K (see adjust_fishing_stats)
+        self.leaderboards = {"networth": TopK(15), "weight": TopK(15), "catches": TopK(15)}
         
         # Fish Data
         # Fish Data Configuration
@@ -119,6 +132,15 @@ class Fishing(commands.Cog):
             "Legendary": 1
         }
 
+        # Scrap Metal per fish for bulk salvage (single fish salvage rolls 1-3)
+        self.salvage_scrap = {
+            "Common": 1,
+            "Uncommon": 2,
+            "Rare": 5,
+            "Epic": 10,
+            "Legendary": 20
+        }
+
         # Buff Item Data
         self.buff_item_data = {
             "Rokok Surya": {"price": 15000, "duration": 300, "description": "Cooldown Mancing -10s (5 Menit)", "emoji": "🚬", "type": "cooldown", "value": 10},
@@ -216,579 +238,843 @@ class Fishing(commands.Cog):
             }
         }
 
+        # Loot tables compiled into O(1) samplers once, instead of per cast
+        self.build_samplers()
 
 
-    def get_conn(self):
-        return get_db_connection()
 
-    def _init_db(self):
-        conn = self.get_conn()
-        if not conn:
-            print("❌ Failed to connect to DB in Fishing init")
-            return
-            
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fish_inventory (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    user_id BIGINT,
-                    fish_name TEXT,
-                    rarity TEXT,
-                    weight DECIMAL(10, 2),
-                    price INT,
-                    caught_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fishing_rods (
-                    user_id BIGINT,
-                    rod_name VARCHAR(255),
-                    level INT DEFAULT 0,
-                    PRIMARY KEY (user_id, rod_name)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fishing_profile (
-                    user_id BIGINT PRIMARY KEY,
-                    equipped_rod TEXT,
-                    total_catches INT DEFAULT 0
-                )
-            ''')
-            
-            # Ensure fishing_profile default if created without default in previous schema 
-            # (MySQL doesn't support ALTER COLUMN SET DEFAULT easily in one go if table exists, but CREATE handles new ones)
+    def build_samplers(self):
+        """Compile fish_data / rarity_weights into alias samplers.
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fishing_materials (
-                    user_id BIGINT,
-                    material_name VARCHAR(255),
-                    amount INT DEFAULT 0,
-                    PRIMARY KEY (user_id, material_name)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fishing_items (
-                    user_id BIGINT,
-                    item_name VARCHAR(255),
-                    amount INT DEFAULT 0,
-                    PRIMARY KEY (user_id, item_name)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fishing_buffs (
-                    user_id BIGINT,
-                    buff_name VARCHAR(255),
-                    end_time TIMESTAMP,
-                    PRIMARY KEY (user_id, buff_name)
-                )
-            ''')
-            
-            # Fishing Quests
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fishing_quests (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    user_id BIGINT,
-                    quest_type TEXT,
-                    target_criteria TEXT,
-                    target_value INT,
-                    progress INT DEFAULT 0,
-                    reward_amount INT,
-                    is_claimed BOOLEAN DEFAULT 0,
-                    created_at DATE,
-                    quest_period TEXT,
-                    expiration_date TIMESTAMP,
-                    reward_type TEXT DEFAULT 'coin',
-                    reward_name TEXT
-                )
-            ''')
-            
-            conn.commit()
-            
-            # Simple column addition checks (using try-except block for duplicate column error 1060)
-            # MySQL error code for duplicate column is 1060
-            
-            # Check/Add total_catches to fishing_profile
-            try:
-                cursor.execute("DESCRIBE fishing_profile")
-                cols = [row[0] for row in cursor.fetchall()]
-                if 'total_catches' not in cols:
-                    cursor.execute("ALTER TABLE fishing_profile ADD COLUMN total_catches INT DEFAULT 0")
-            except Exception as e:
-                print(f"Warning checking fishing_profile schema: {e}")
-
-            # Check/Add level to fishing_rods
-            try:
-                cursor.execute("DESCRIBE fishing_rods")
-                cols = [row[0] for row in cursor.fetchall()]
-                if 'level' not in cols:
-                    cursor.execute("ALTER TABLE fishing_rods ADD COLUMN level INT DEFAULT 0")
-            except Exception as e:
-                print(f"Warning checking fishing_rods schema: {e}")
-                
-            conn.commit()
-            
-        except mysql.connector.Error as err:
-            print(f"❌ Database error in Fishing _init_db: {err}")
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+        Rarity samplers are keyed by rarity_boost; every rod at every forge level
+        is prebuilt, anything else (e.g. /give levels) is built on first use.
+        Call again after editing the tables at runtime.
+        """
+        self.fish_samplers = {
+            rarity: AliasSampler(fish_list, [f["spawn_weight"] for f in fish_list])
+            for rarity, fish_list in self.fish_data.items()
+        }
+        self.rarity_samplers = {}
+        max_level = max(max(data["levels"]) for data in self.forge_data.values())
+        for rod_stats in self.rod_data.values():
+            for level in range(max_level + 1):
+                self.get_rarity_sampler(rod_stats["rarity_boost"] + level * rod_stats.get("scaling_rarity", 1))
+
+    def get_rarity_sampler(self, rarity_boost):
+        key = round(rarity_boost, 4)
+        sampler = self.rarity_samplers.get(key)
+        if sampler is None:
+            rarities = list(self.rarity_weights.keys())
+            weights = list(self.rarity_weights.values())
+            if key > 0:
+                weights[2] += key # Rare
+                weights[3] += key # Epic
+                weights[4] += key # Legendary
+            sampler = self.rarity_samplers[key] = AliasSampler(rarities, weights)
+        return sampler
+
+    def roll_fish(self, rarity_boost, rng=random):
+        """One rarity + fish roll: (rarity, fish_info)"""
+        rarity = self.get_rarity_sampler(rarity_boost).roll(rng)
+        return rarity, self.fish_samplers[rarity].roll(rng)
+
+    def roll_n(self, rarity_boost, n, rng=random):
+        """Batch of n rolls for simulations: [(rarity, fish_info), ...]"""
+        fish_samplers = self.fish_samplers
+        return [(rarity, fish_samplers[rarity].roll(rng)) for rarity in self.get_rarity_sampler(rarity_boost).roll_n(n, rng)]
+
+    def get_quest_periods(self, now=None):
+        """Current quest period keys and expiries: daily resets at 12:00, weekly on Saturday."""
+        now = now or datetime.now()
+
+        # --- DAILY QUESTS (Reset at 12:00 PM) ---
+        # If now is 11:00 AM, the last reset was yesterday 12:00 PM.
+        # If now is 1:00 PM, the last reset was today 12:00 PM.
+        today_reset = now.replace(hour=12, minute=0, second=0, microsecond=0)
+        if now < today_reset:
+            current_daily_start = today_reset - timedelta(days=1)
+        else:
+            current_daily_start = today_reset
 
-    def generate_quests(self, user_id):
-        """Generate Daily and Weekly quests with variations"""
-        conn = self.get_conn()
-        if not conn: return
-        
-        try:
-            cursor = conn.cursor(buffered=True) # Use buffered cursor to avoid Unread result found
-            now = datetime.now()
-            
-            # --- DAILY QUESTS (Reset at 12:00 PM) ---
-            # If current time < 12:00 PM, today's quest day is effectively "yesterday" (or we haven't reached new day yet)
-            # Logic: Calculate the expected "current daily reset time".
-            # If now is 11:00 AM, the last reset was yesterday 12:00 PM.
-            # If now is 1:00 PM, the last reset was today 12:00 PM.
-            
-            today_reset = now.replace(hour=12, minute=0, second=0, microsecond=0)
-            if now < today_reset:
-                current_daily_start = today_reset - timedelta(days=1)
-            else:
-                current_daily_start = today_reset
-                
-            daily_key = current_daily_start.strftime('%Y-%m-%d')
-            
-            cursor.execute('SELECT id FROM fishing_quests WHERE user_id = %s AND quest_period = %s AND created_at = %s', (user_id, 'daily', daily_key))
-            if not cursor.fetchone():
-                daily_templates = [
-                    # EASY (Tier 1) - Coins: 1500-2500, Scrap: 3-5
-                    {"type": "catch_any", "criteria": "any", "min": 10, "max": 20, "diff": 1},
-                    {"type": "catch_rarity", "criteria": "Common", "min": 10, "max": 15, "diff": 1},
-                    {"type": "catch_weight", "criteria": "1", "min": 10, "max": 15, "diff": 1}, # > 1kg
-                    {"type": "total_weight", "criteria": "total", "min": 20, "max": 30, "diff": 1},
-                    
-                    # MEDIUM (Tier 2) - Coins: 2500-3500, Scrap: 5-8
-                    {"type": "catch_rarity", "criteria": "Uncommon", "min": 5, "max": 10, "diff": 2},
-                    {"type": "catch_weight", "criteria": "2", "min": 5, "max": 10, "diff": 2}, # > 2kg
-                    {"type": "total_weight", "criteria": "total", "min": 40, "max": 50, "diff": 2},
-                    {"type": "catch_specific", "criteria": "Ikan Mas", "min": 5, "max": 5, "diff": 2},
-                    {"type": "catch_specific", "criteria": "Lele", "min": 5, "max": 5, "diff": 2},
-                    {"type": "catch_specific", "criteria": "Nila", "min": 5, "max": 5, "diff": 2},
-                    
-                    # HARD (Tier 3) - Coins: 3500-5000, Scrap: 8-10
-                    {"type": "catch_rarity", "criteria": "Rare", "min": 2, "max": 5, "diff": 3},
-                    {"type": "catch_weight", "criteria": "5", "min": 2, "max": 5, "diff": 3}, # > 5kg
-                    {"type": "catch_specific", "criteria": "Gurame", "min": 3, "max": 3, "diff": 3},
-                    {"type": "catch_specific", "criteria": "Patin", "min": 3, "max": 3, "diff": 3},
-                    {"type": "catch_specific", "criteria": "Bawal Hitam", "min": 3, "max": 3, "diff": 3},
-                ]
-                
-                selected_daily = random.sample(daily_templates, 5)
-                # Expire at next reset
-                expiry_daily = current_daily_start + timedelta(days=1)
-                
-                for quest in selected_daily:
-                    target_val = random.randint(quest["min"], quest["max"])
-                    diff = quest.get("diff", 1)
-                    
-                    # Reward Logic (70% Coin, 30% Scrap Metal)
-                    # Ranges based on Difficulty
-                    coin_range = (1500, 2500)
-                    scrap_range = (3, 5)
-                    
-                    if diff == 2:
-                        coin_range = (2500, 3500)
-                        scrap_range = (5, 8)
-                    elif diff == 3:
-                        coin_range = (3500, 5000)
-                        scrap_range = (8, 10)
-                    
-                    reward_type = 'coin'
-                    reward_name = None
-                    reward_amount = 0
-                    
-                    if random.random() < 0.30:
-                        reward_type = 'material' # Scrap Metal
-                        reward_name = 'Scrap Metal'
-                        reward_amount = random.randint(scrap_range[0], scrap_range[1])
-                    else:
-                        reward_amount = random.randint(coin_range[0], coin_range[1])
-                    
-                    cursor.execute('''
-                        INSERT INTO fishing_quests (user_id, quest_type, target_criteria, target_value, reward_amount, reward_type, reward_name, is_claimed, created_at, quest_period, expiration_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, 0, %s, 'daily', %s)
-                    ''', (user_id, quest["type"], quest["criteria"], target_val, reward_amount, reward_type, reward_name, daily_key, expiry_daily))
-
-            # --- WEEKLY QUESTS (Reset Saturday) ---
-            # Python weekday: Mon=0, Tue=1, ..., Fri=4, Sat=5, Sun=6
-            # We want Saturday as the start of the week.
-            # Calculate days since last Saturday.
-            days_since_saturday = (now.weekday() - 5) % 7
-            start_of_week_date = (now - timedelta(days=days_since_saturday)).replace(hour=0, minute=0, second=0, microsecond=0)
-            start_of_week = start_of_week_date.strftime('%Y-%m-%d')
-            
-            cursor.execute('SELECT id FROM fishing_quests WHERE user_id = %s AND quest_period = %s AND created_at = %s', (user_id, 'weekly', start_of_week))
-            if not cursor.fetchone():
-                weekly_templates = [
-                    {"type": "catch_rarity", "criteria": "Legendary", "min": 3, "max": 5, "reward_mult": 2000},
-                    {"type": "catch_rarity", "criteria": "Epic", "min": 10, "max": 15, "reward_mult": 500},
-                    {"type": "catch_rarity", "criteria": "Rare", "min": 30, "max": 50, "reward_mult": 150},
-                    {"type": "total_weight", "criteria": "total", "min": 300, "max": 400, "reward_mult": 20},
-                    {"type": "total_weight", "criteria": "total", "min": 450, "max": 500, "reward_mult": 20},
-                    {"type": "catch_weight", "criteria": "10", "min": 20, "max": 20, "reward_mult": 200}, # > 10kg x20
-                    {"type": "catch_weight", "criteria": "50", "min": 5, "max": 5, "reward_mult": 500}, # > 50kg x5
-                    {"type": "catch_any", "criteria": "any", "min": 300, "max": 300, "reward_mult": 30},
-                    {"type": "catch_weight", "criteria": "100", "min": 1, "max": 2, "reward_mult": 2000}, # > 100kg
-                    {"type": "total_weight", "criteria": "total", "min": 600, "max": 800, "reward_mult": 25}, 
-                ]
-                
-                selected_weekly = random.sample(weekly_templates, 3)
-                
-                # Expire at next Saturday
-                expiry_weekly = start_of_week_date + timedelta(days=7)
-                
-                for quest in selected_weekly:
-                    target_val = random.randint(quest["min"], quest["max"])
-                    
+        # --- WEEKLY QUESTS (Reset Saturday) ---
+        # Python weekday: Mon=0, Tue=1, ..., Fri=4, Sat=5, Sun=6
+        days_since_saturday = (now.weekday() - 5) % 7
+        start_of_week_date = (now - timedelta(days=days_since_saturday)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        return {
+            "daily": (current_daily_start.strftime('%Y-%m-%d'), current_daily_start + timedelta(days=1)),
+            "weekly": (start_of_week_date.strftime('%Y-%m-%d'), start_of_week_date + timedelta(days=7)),
+        }
+
+    def roll_quests(self, period):
+        """Pick a fresh set of quests for one period (nothing is written here).
+
+        Returns dicts with type, criteria, target, reward_amount, reward_type and reward_name.
+        """
+        rolled = []
+        if period == 'daily':
+            daily_templates = [
+                # EASY (Tier 1) - Coins: 1500-2500, Scrap: 3-5
+                {"type": "catch_any", "criteria": "any", "min": 10, "max": 20, "diff": 1},
+                {"type": "catch_rarity", "criteria": "Common", "min": 10, "max": 15, "diff": 1},
+                {"type": "catch_weight", "criteria": "1", "min": 10, "max": 15, "diff": 1}, # > 1kg
+                {"type": "total_weight", "criteria": "total", "min": 20, "max": 30, "diff": 1},
+
+                # MEDIUM (Tier 2) - Coins: 2500-3500, Scrap: 5-8
+                {"type": "catch_rarity", "criteria": "Uncommon", "min": 5, "max": 10, "diff": 2},
+                {"type": "catch_weight", "criteria": "2", "min": 5, "max": 10, "diff": 2}, # > 2kg
+                {"type": "total_weight", "criteria": "total", "min": 40, "max": 50, "diff": 2},
+                {"type": "catch_specific", "criteria": "Ikan Mas", "min": 5, "max": 5, "diff": 2},
+                {"type": "catch_specific", "criteria": "Lele", "min": 5, "max": 5, "diff": 2},
+                {"type": "catch_specific", "criteria": "Nila", "min": 5, "max": 5, "diff": 2},
+
+                # HARD (Tier 3) - Coins: 3500-5000, Scrap: 8-10
+                {"type": "catch_rarity", "criteria": "Rare", "min": 2, "max": 5, "diff": 3},
+                {"type": "catch_weight", "criteria": "5", "min": 2, "max": 5, "diff": 3}, # > 5kg
+                {"type": "catch_specific", "criteria": "Gurame", "min": 3, "max": 3, "diff": 3},
+                {"type": "catch_specific", "criteria": "Patin", "min": 3, "max": 3, "diff": 3},
+                {"type": "catch_specific", "criteria": "Bawal Hitam", "min": 3, "max": 3, "diff": 3},
+            ]
+
+            for quest in random.sample(daily_templates, 5):
+                target_val = random.randint(quest["min"], quest["max"])
+                diff = quest.get("diff", 1)
+
+                # Reward Logic (70% Coin, 30% Scrap Metal)
+                # Ranges based on Difficulty
+                coin_range = (1500, 2500)
+                scrap_range = (3, 5)
+
+                if diff == 2:
+                    coin_range = (2500, 3500)
+                    scrap_range = (5, 8)
+                elif diff == 3:
+                    coin_range = (3500, 5000)
+                    scrap_range = (8, 10)
+
+                reward_type = 'coin'
+                reward_name = None
+
+                if random.random() < 0.30:
+                    reward_type = 'material' # Scrap Metal
+                    reward_name = 'Scrap Metal'
+                    reward_amount = random.randint(scrap_range[0], scrap_range[1])
+                else:
+                    reward_amount = random.randint(coin_range[0], coin_range[1])
+
+                rolled.append({"type": quest["type"], "criteria": quest["criteria"], "target": target_val,
+                               "reward_amount": reward_amount, "reward_type": reward_type, "reward_name": reward_name})
+        else:
+            weekly_templates = [
+                {"type": "catch_rarity", "criteria": "Legendary", "min": 3, "max": 5, "reward_mult": 2000},
+                {"type": "catch_rarity", "criteria": "Epic", "min": 10, "max": 15, "reward_mult": 500},
+                {"type": "catch_rarity", "criteria": "Rare", "min": 30, "max": 50, "reward_mult": 150},
+                {"type": "total_weight", "criteria": "total", "min": 300, "max": 400, "reward_mult": 20},
+                {"type": "total_weight", "criteria": "total", "min": 450, "max": 500, "reward_mult": 20},
+                {"type": "catch_weight", "criteria": "10", "min": 20, "max": 20, "reward_mult": 200}, # > 10kg x20
+                {"type": "catch_weight", "criteria": "50", "min": 5, "max": 5, "reward_mult": 500}, # > 50kg x5
+                {"type": "catch_any", "criteria": "any", "min": 300, "max": 300, "reward_mult": 30},
+                {"type": "catch_weight", "criteria": "100", "min": 1, "max": 2, "reward_mult": 2000}, # > 100kg
+                {"type": "total_weight", "criteria": "total", "min": 600, "max": 800, "reward_mult": 25},
+            ]
+
+            for quest in random.sample(weekly_templates, 3):
+                target_val = random.randint(quest["min"], quest["max"])
+
+                # Weekly Reward: 60% Coin (10k-15k), 40% Pearl (1-3)
+                if random.random() < 0.40:
+                    reward_type = 'material' # Magic Pearl
+                    reward_name = "Magic Pearl"
+                    reward_amount = random.randint(1, 3)
+                else:
                     reward_type = 'coin'
                     reward_name = None
-                    reward_amount = 0
-                    
-                    # Weekly Reward: 60% Coin (10k-15k), 40% Pearl (1-3)
-                    if random.random() < 0.40: 
-                        reward_type = 'material' # Magic Pearl
-                        reward_name = "Magic Pearl"
-                        reward_amount = random.randint(1, 3)
-                    else:
-                        reward_type = 'coin'
-                        reward_amount = random.randint(10000, 15000)
-                        
-                    cursor.execute('''
-                        INSERT INTO fishing_quests (user_id, quest_type, target_criteria, target_value, reward_amount, reward_type, reward_name, is_claimed, created_at, quest_period, expiration_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, 0, %s, 'weekly', %s)
-                    ''', (user_id, quest["type"], quest["criteria"], target_val, reward_amount, reward_type, reward_name, start_of_week, expiry_weekly))
+                    reward_amount = random.randint(10000, 15000)
+
+                rolled.append({"type": quest["type"], "criteria": quest["criteria"], "target": target_val,
+                               "reward_amount": reward_amount, "reward_type": reward_type, "reward_name": reward_name})
+        return rolled
 
-            # Commit ALL changes at once
-            conn.commit()
+    async def insert_quests(self, cursor, user_id, new_quests):
+        """Write quests produced by roll_quests as one multi-row INSERT.
 
+        new_quests: {period: (key, expiry, quests)}; progress may already be non-zero.
+        """
+        rows = [
+            (user_id, q["type"], q["criteria"], q["target"], q.get("progress", 0), q["reward_amount"], q["reward_type"], q["reward_name"], key, period, expiry)
+            for period, (key, expiry, quests) in new_quests.items()
+            for q in quests
+        ]
+        if rows:
+            await cursor.executemany('''
+                INSERT INTO fishing_quests (user_id, quest_type, target_criteria, target_value, progress, reward_amount, reward_type, reward_name, is_claimed, created_at, quest_period, expiration_date)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0, %s, %s, %s)
+            ''', rows)
+
+    def pending_quest_periods(self, user_id, periods):
+        """Periods whose quests are not known to exist yet for this user"""
+        done = self.quest_memo.get(user_id) or {}
+        return {p: v for p, v in periods.items() if done.get(p) != v[0]}
+
+    def remember_quest_periods(self, user_id, periods):
+        done = dict(self.quest_memo.get(user_id) or {})
+        done.update({p: v[0] for p, v in periods.items()})
+        self.quest_memo.set(user_id, done)
+
+    async def generate_quests(self, user_id):
+        """Generate Daily and Weekly quests with variations"""
+        try:
+            periods = self.get_quest_periods()
+            pending = self.pending_quest_periods(user_id, periods)
+            if not pending:
+                return
+
+            # One transaction so daily and weekly quests are committed together
+            async with self.db.transaction() as cursor:
+                await cursor.execute('''
+                    SELECT DISTINCT quest_period FROM fishing_quests
+                    WHERE user_id = %s
+                    AND ((quest_period = 'daily' AND created_at = %s) OR (quest_period = 'weekly' AND created_at = %s))
+                ''', (user_id, periods["daily"][0], periods["weekly"][0]))
+                existing = {row[0] for row in await cursor.fetchall()}
+
+                await self.insert_quests(cursor, user_id, {
+                    period: (key, expiry, self.roll_quests(period))
+                    for period, (key, expiry) in pending.items() if period not in existing
+                })
+
+            self.remember_quest_periods(user_id, pending)
         except Exception as e:
             print(f"Error generating quests: {e}")
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
 
 
 
-    def get_material(self, user_id, material_name):
-        conn = self.get_conn()
-        if not conn: return 0
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT amount FROM fishing_materials WHERE user_id = %s AND material_name = %s', (user_id, material_name))
-            res = cursor.fetchone()
-            return res[0] if res else 0
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def add_material(self, user_id, material_name, amount):
-        conn = self.get_conn()
-        if not conn: return 0
-        try:
-            cursor = conn.cursor()
-            current = self.get_material(user_id, material_name)
-            new_amount = current + amount
-            if new_amount < 0: new_amount = 0
-            
-            cursor.execute('''
-                INSERT INTO fishing_materials (user_id, material_name, amount)
-                VALUES (%s, %s, %s)
-                ON DUPLICATE KEY UPDATE amount = %s
-            ''', (user_id, material_name, new_amount, new_amount))
-            conn.commit()
-            return new_amount
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def get_rod_level(self, user_id, rod_name):
-        conn = self.get_conn()
-        if not conn: return 0
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT level FROM fishing_rods WHERE user_id = %s AND rod_name = %s', (user_id, rod_name))
-            res = cursor.fetchone()
-            return res[0] if res else 0
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def update_rod_level(self, user_id, rod_name, new_level):
-        conn = self.get_conn()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            if new_level < 0: new_level = 0
-            
-            # MySQL 'INSERT ... ON DUPLICATE KEY UPDATE' is better
-            cursor.execute('''
-                INSERT INTO fishing_rods (user_id, rod_name, level) 
-                VALUES (%s, %s, %s) 
-                ON DUPLICATE KEY UPDATE level = %s
-            ''', (user_id, rod_name, new_level, new_level))
-            conn.commit()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+    async def get_fishing_state(self, user_id):
+        """Cached rod/buff/material/item state of a user, loaded on one connection on a miss"""
+        state = self.state_cache.get(user_id)
+        if state is not None:
+            return state
+
+        now = datetime.now()
+        async with self.db.cursor() as cursor:
+            await cursor.execute('SELECT equipped_rod FROM fishing_profile WHERE user_id = %s', (user_id,))
+            profile = await cursor.fetchone()
+            await cursor.execute('SELECT rod_name, level FROM fishing_rods WHERE user_id = %s', (user_id,))
+            rods = await cursor.fetchall()
+            await cursor.execute('SELECT buff_name, end_time FROM fishing_buffs WHERE user_id = %s AND end_time > %s', (user_id, now))
+            buffs = self.parse_buffs(await cursor.fetchall())
+            await cursor.execute('SELECT material_name, amount FROM fishing_materials WHERE user_id = %s', (user_id,))
+            materials = await cursor.fetchall()
+            await cursor.execute('SELECT item_name, amount FROM fishing_items WHERE user_id = %s', (user_id,))
+            items = await cursor.fetchall()
+
+        state = {
+            "rod": profile[0] if profile and profile[0] else "Common Rod",
+            "levels": {name: level for name, level in rods},
+            "buffs": {name: info["end_time"] for name, info in buffs.items()},
+            "materials": {name: amount for name, amount in materials},
+            "items": {name: amount for name, amount in items if amount > 0},
+        }
+        return self.state_cache.set(user_id, state)
+
+    def invalidate_state(self, user_id):
+        """Drop the cached state after a write that bypasses the helpers below"""
+        self.state_cache.pop(user_id)
+
+    async def get_material(self, user_id, material_name):
+        state = await self.get_fishing_state(user_id)
+        return state["materials"].get(material_name, 0)
+
+    async def apply_deltas(self, table, name_column, user_id, deltas, cursor=None):
+        """Add a dict of {name: delta} to fishing_materials / fishing_items in one statement.
+
+        Amounts are clamped at 0 inside MySQL, so concurrent trades, salvage and
+        forge can't lose updates or go negative. Pass ``cursor`` to join an open transaction.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        rows = " UNION ALL ".join(["SELECT %s AS name, %s AS delta"] * len(deltas))
+        query = f'''
+            INSERT INTO {table} (user_id, {name_column}, amount)
+            SELECT %s, d.name, GREATEST(0, d.delta) FROM ({rows}) d
+            ON DUPLICATE KEY UPDATE amount = GREATEST(0, {table}.amount + d.delta)
+        '''
+        args = (user_id, *[arg for item in deltas.items() for arg in item])
+        if cursor is not None:
+            await cursor.execute(query, args)
+        else:
+            await self.db.execute(query, args)
+
+        state = self.state_cache.get(user_id)
+        if state is not None:
+            cached = state["materials" if table == "fishing_materials" else "items"]
+            for name, delta in deltas.items():
+                cached[name] = max(0, cached.get(name, 0) + delta)
+                if cached[name] == 0 and table == "fishing_items":
+                    del cached[name]
+
+    async def add_material(self, user_id, material_name, amount):
+        await self.apply_deltas("fishing_materials", "material_name", user_id, {material_name: amount})
+
+    async def add_materials(self, user_id, deltas, cursor=None):
+        """Bulk add_material: {"Scrap Metal": -5, "Magic Pearl": -1, ...} in one statement"""
+        await self.apply_deltas("fishing_materials", "material_name", user_id, deltas, cursor)
+
+    async def get_rod_level(self, user_id, rod_name):
+        state = await self.get_fishing_state(user_id)
+        return state["levels"].get(rod_name, 0)
+
+    async def update_rod_level(self, user_id, rod_name, new_level, cursor=None):
+        if new_level < 0: new_level = 0
+        
+        # MySQL 'INSERT ... ON DUPLICATE KEY UPDATE' is better
+        query = '''
+            INSERT INTO fishing_rods (user_id, rod_name, level) 
+            VALUES (%s, %s, %s) 
+            ON DUPLICATE KEY UPDATE level = %s
+        '''
+        if cursor is not None:
+            await cursor.execute(query, (user_id, rod_name, new_level, new_level))
+        else:
+            await self.db.execute(query, (user_id, rod_name, new_level, new_level))
+
+        state = self.state_cache.get(user_id)
+        if state is not None:
+            state["levels"][rod_name] = new_level
 
     # --- BUFF & ITEM HELPERS ---
-    def add_item(self, user_id, item_name, amount):
-        conn = self.get_conn()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            # We can use ON DUPLICATE KEY UPDATE with amount = amount + VALUES(amount) or logic
-            # Logic here: check existing first
-            cursor.execute('SELECT amount FROM fishing_items WHERE user_id = %s AND item_name = %s', (user_id, item_name))
-            res = cursor.fetchone()
-            current = res[0] if res else 0
-            new_amount = current + amount
-            
-            if new_amount <= 0:
-                cursor.execute('DELETE FROM fishing_items WHERE user_id = %s AND item_name = %s', (user_id, item_name))
-            else:
-                cursor.execute('''
-                    INSERT INTO fishing_items (user_id, item_name, amount) VALUES (%s, %s, %s)
-                    ON DUPLICATE KEY UPDATE amount = %s
-                ''', (user_id, item_name, new_amount, new_amount))
-            conn.commit()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+    async def add_item(self, user_id, item_name, amount):
+        # Used-up items stay as amount = 0 rows; readers only list amount > 0
+        await self.apply_deltas("fishing_items", "item_name", user_id, {item_name: amount})
     
-    def get_item_amount(self, user_id, item_name):
-        conn = self.get_conn()
-        if not conn: return 0
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT amount FROM fishing_items WHERE user_id = %s AND item_name = %s', (user_id, item_name))
-            res = cursor.fetchone()
-            return res[0] if res else 0
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def activate_buff(self, user_id, buff_name):
+    async def get_item_amount(self, user_id, item_name):
+        state = await self.get_fishing_state(user_id)
+        return state["items"].get(item_name, 0)
+
+    async def activate_buff(self, user_id, buff_name):
         data = self.buff_item_data.get(buff_name)
         if not data: return False
         
         duration = data['duration']
         end_time = datetime.now() + timedelta(seconds=duration)
         
-        conn = self.get_conn()
-        if not conn: return False
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO fishing_buffs (user_id, buff_name, end_time) VALUES (%s, %s, %s)
-                ON DUPLICATE KEY UPDATE end_time = %s
-            ''', (user_id, buff_name, end_time, end_time))
-            conn.commit()
-            return end_time
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def get_active_buffs(self, user_id):
-        conn = self.get_conn()
-        if not conn: return {}
-        try:
-            cursor = conn.cursor()
-            now = datetime.now()
-            cursor.execute('SELECT buff_name, end_time FROM fishing_buffs WHERE user_id = %s AND end_time > %s', (user_id, now))
-            rows = cursor.fetchall()
-            
-            buffs = {}
-            for name, end_ts in rows:
-                if isinstance(end_ts, str):
-                    try:
-                        end_ts = datetime.fromisoformat(end_ts)
-                    except:
-                        continue 
-                
-                buffs[name] = {"end_time": end_ts, "data": self.buff_item_data.get(name)}
-                
-            return buffs
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    async def check_quest_progress(self, interaction, fish_name, rarity, weight):
-        """Check and update quest progress (Daily & Weekly)"""
-        user_id = interaction.user.id
+        await self.db.execute('''
+            INSERT INTO fishing_buffs (user_id, buff_name, end_time) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE end_time = %s
+        ''', (user_id, buff_name, end_time, end_time))
+
+        state = self.state_cache.get(user_id)
+        if state is not None:
+            state["buffs"][buff_name] = end_time
+        return end_time
+
+    async def get_active_buffs(self, user_id):
         now = datetime.now()
-        conn = self.get_conn()
-        if not conn: return
-        
-        try:
-            cursor = conn.cursor()
-            
-            # Check active quests (not claimed, not expired)
-            cursor.execute('''
-                SELECT id, quest_type, target_criteria, target_value, progress 
-                FROM fishing_quests 
-                WHERE user_id = %s AND is_claimed = 0 AND (expiration_date IS NULL OR expiration_date > %s)
-            ''', (user_id, now))
-            
-            active_quests = cursor.fetchall()
-            
-            completed_quests = []
-            
-            for q_id, q_type, criteria, target, progress in active_quests:
-                if progress >= target:
-                    continue
-                    
-                increment = 0
-                if q_type == "catch_any":
-                    increment = 1
-                elif q_type == "catch_rarity" and criteria.lower() == rarity.lower():
-                    increment = 1
-                elif q_type == "catch_weight" and weight >= float(criteria):
-                    increment = 1
-                elif q_type == "catch_specific" and criteria.lower() == fish_name.lower():
-                    increment = 1
-                elif q_type == "total_weight":
-                     # Use round for fairness. Min 1 if weight > 0.
-                    val = int(round(weight))
-                    increment = max(1, val) if weight > 0 else 0
-                
-                if increment > 0:
-                    new_progress = progress + increment
-                    cursor.execute('UPDATE fishing_quests SET progress = %s WHERE id = %s', (new_progress, q_id))
-                    
-                    if new_progress >= target:
-                        completed_quests.append(q_id)
-            
-            conn.commit()
-            
-            if completed_quests:
+        state = await self.get_fishing_state(user_id)
+        return self.parse_buffs([(name, end_ts) for name, end_ts in state["buffs"].items() if end_ts > now])
+
+    def parse_buffs(self, rows):
+        buffs = {}
+        for name, end_ts in rows:
+            if isinstance(end_ts, str):
                 try:
-                    await interaction.followup.send("🎉 **Quest Selesai!** Cek `/fish quests` untuk klaim hadiah.", ephemeral=True)
+                    end_ts = datetime.fromisoformat(end_ts)
                 except:
-                    pass
-        except Exception as e:
-            print(f"Error checking quests: {e}")
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+                    continue 
+            
+            buffs[name] = {"end_time": end_ts, "data": self.buff_item_data.get(name)}
+            
+        return buffs
+
+    def quest_increment(self, q_type, criteria, fish_name, rarity, weight):
+        """Progress a single caught fish adds to a quest"""
+        if q_type == "catch_any":
+            return 1
+        elif q_type == "catch_rarity" and criteria.lower() == rarity.lower():
+            return 1
+        elif q_type == "catch_weight" and weight >= float(criteria):
+            return 1
+        elif q_type == "catch_specific" and criteria.lower() == fish_name.lower():
+            return 1
+        elif q_type == "total_weight":
+            # Use round for fairness. Min 1 if weight > 0.
+            val = int(round(weight))
+            return max(1, val) if weight > 0 else 0
+        return 0
+
+    async def load_catch_state(self, user_id):
+        """Everything /fish catch needs in one batched read.
+
+        Returns the equipped rod and its level, active buffs (both from the state
+        cache), open quests and which quest periods still have to be generated.
+        """
+        now = datetime.now()
+        periods = self.get_quest_periods(now)
+
+        fishing = await self.get_fishing_state(user_id)
+        equipped_rod = fishing["rod"]
+        rod_level = fishing["levels"].get(equipped_rod, 0)
+        buffs = await self.get_active_buffs(user_id)
+
+        # Only look for "already generated" rows of periods the memo doesn't know about
+        pending = self.pending_quest_periods(user_id, periods)
+        pending_clause = "".join(" OR (quest_period = %s AND created_at = %s)" for _ in pending)
+        pending_args = [arg for period, (key, _) in pending.items() for arg in (period, key)]
+
+        async with self.db.cursor() as cursor:
+            # Open quests plus anything created for pending periods (claimed ones
+            # still count as "already generated")
+            await cursor.execute(f'''
+                SELECT id, quest_type, target_criteria, target_value, progress, is_claimed, quest_period, created_at,
+                       (expiration_date IS NULL OR expiration_date > %s) AS is_active
+                FROM fishing_quests
+                WHERE user_id = %s
+                AND ((is_claimed = 0 AND (expiration_date IS NULL OR expiration_date > %s)){pending_clause})
+            ''', (now, user_id, now, *pending_args))
+            quest_rows = await cursor.fetchall()
+
+        quests = []
+        generated = set()
+        for q_id, q_type, criteria, target, progress, claimed, period, created_at, is_active in quest_rows:
+            if period in pending and str(created_at) == pending[period][0]:
+                generated.add(period)
+            if not claimed and is_active:
+                quests.append({"id": q_id, "type": q_type, "criteria": criteria, "target": target, "progress": progress})
+
+        self.remember_quest_periods(user_id, {p: v for p, v in pending.items() if p in generated})
+
+        return {
+            "rod": equipped_rod,
+            "rod_level": rod_level,
+            "buffs": buffs,
+            "quests": quests,
+            "missing_periods": {p: v for p, v in pending.items() if p not in generated},
+        }
+
+    async def save_catch(self, user_id, caught_items, materials, state):
+        """Persist one cast in a single transaction.
+
+        Writes the fish, the profile counter, dropped materials, any quests that
+        had to be generated and the quest progress computed in memory.
+        Returns the number of quests this cast completed.
+        """
+        completed = 0
+        progress_updates = {}  # quest id -> increment
+
+        def advance(quest):
+            nonlocal completed
+            if quest["progress"] >= quest["target"]:
+                return 0
+            increment = sum(
+                self.quest_increment(quest["type"], quest["criteria"], f["name"], f["rarity"], f["weight"])
+                for f in caught_items
+            )
+            if increment > 0:
+                if quest["progress"] < quest["target"] <= quest["progress"] + increment:
+                    completed += 1
+                quest["progress"] += increment
+            return increment
+
+        for quest in state["quests"]:
+            increment = advance(quest)
+            if increment > 0:
+                progress_updates[quest["id"]] = increment
+
+        new_quests = {}
+        for period, (key, expiry) in state["missing_periods"].items():
+            rolled = self.roll_quests(period)
+            for quest in rolled:
+                quest["progress"] = 0
+                advance(quest)
+            new_quests[period] = (key, expiry, rolled)
+
+        async with self.db.transaction() as cursor:
+            await cursor.executemany('''
+                INSERT INTO fish_inventory (user_id, fish_name, rarity, weight, price)
+                VALUES (%s, %s, %s, %s, %s)
+            ''', [(user_id, f["name"], f["rarity"], f["weight"], f["price"]) for f in caught_items])
+
+            await cursor.execute('''
+                INSERT INTO fishing_profile (user_id, total_catches) 
+                VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE total_catches = total_catches + %s
+            ''', (user_id, len(caught_items), len(caught_items)))
+
+            await self.add_materials(user_id, materials, cursor)
+
+            # Leaderboard aggregates: networth grows, best weight only if beaten
+            heaviest = max(caught_items, key=lambda f: f["weight"])
+            await cursor.execute('''
+                INSERT INTO fishing_stats (user_id, networth, best_weight, best_fish, best_rarity)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    best_fish = IF(VALUES(best_weight) > best_weight, VALUES(best_fish), best_fish),
+                    best_rarity = IF(VALUES(best_weight) > best_weight, VALUES(best_rarity), best_rarity),
+                    best_weight = GREATEST(best_weight, VALUES(best_weight)),
+                    networth = networth + VALUES(networth)
+            ''', (user_id, sum(f["price"] for f in caught_items), heaviest["weight"], heaviest["name"], heaviest["rarity"]))
+            await cursor.execute('''
+                SELECT s.user_id, s.networth, s.best_weight, s.best_fish, s.best_rarity, p.total_catches
+                FROM fishing_stats s LEFT JOIN fishing_profile p ON p.user_id = s.user_id
+                WHERE s.user_id = %s
+            ''', (user_id,))
+            stats_rows = await cursor.fetchall()
+
+            await self.insert_quests(cursor, user_id, new_quests)
+
+            if progress_updates:
+                # Flush the in-memory quest table with one statement for all quests
+                cases = " ".join("WHEN %s THEN %s" for _ in progress_updates)
+                ids = ", ".join(["%s"] * len(progress_updates))
+                await cursor.execute(
+                    f'UPDATE fishing_quests SET progress = progress + CASE id {cases} ELSE 0 END WHERE id IN ({ids})',
+                    (*[arg for item in progress_updates.items() for arg in item], *progress_updates)
+                )
+
+        self.remember_quest_periods(user_id, state["missing_periods"])
+        self.apply_fishing_stats(stats_rows)
+        return completed
 
     def get_economy(self):
         return self.bot.get_cog('Economy')
 
     async def send_raw_payload(self, interaction: discord.Interaction, payload: dict):
-        url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        json_payload = {"type": 4, "data": payload}
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=json_payload, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error sending Fishing payload: {resp.status} {await resp.text()}")
-
-    def get_equipped_rod(self, user_id):
-        conn = self.get_conn()
-        if not conn: return "Common Rod" # Default fallback
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT equipped_rod FROM fishing_profile WHERE user_id = %s', (user_id,))
-            res = cursor.fetchone()
-            return res[0] if res else "Common Rod"
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def get_owned_rods(self, user_id):
-        conn = self.get_conn()
-        if not conn: return ["Common Rod"]
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT rod_name FROM fishing_rods WHERE user_id = %s', (user_id,))
-            rows = cursor.fetchall()
-            owned = [r[0] for r in rows]
-            if "Common Rod" not in owned:
-                owned.append("Common Rod")
-            return owned
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def get_weight_leaderboard(self):
-        conn = self.get_conn()
-        if not conn: return []
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT user_id, fish_name, weight, rarity 
-                FROM fish_inventory 
-                ORDER BY weight DESC 
-                LIMIT 15
-            ''')
-            return cursor.fetchall()
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def get_networth_leaderboard(self):
-        conn = self.get_conn()
-        if not conn: return []
+        await send_components_v2(interaction, payload, label="Fishing")
+
+    async def get_equipped_rod(self, user_id):
+        state = await self.get_fishing_state(user_id)
+        return state["rod"]
+
+    async def get_owned_rods(self, user_id):
+        state = await self.get_fishing_state(user_id)
+        owned = list(state["levels"])
+        if "Common Rod" not in owned:
+            owned.append("Common Rod")
+        return owned
+
+    def apply_fishing_stats(self, rows):
+        """Feed (user_id, networth, best_weight, best_fish, best_rarity, total_catches) rows to the top-K boards"""
+        for user_id, networth, best_weight, best_fish, best_rarity, total_catches in rows:
+            self.leaderboards["networth"].update(user_id, int(networth or 0))
+            self.leaderboards["weight"].update(user_id, float(best_weight or 0), (best_fish, best_rarity))
+            self.leaderboards["catches"].update(user_id, int(total_catches or 0))
+        economy = self.get_economy()
+        if economy and rows:
+            economy.invalidate_leaderboard("fish_networth", "fish_weight", "fish_catch")
+
+    async def adjust_fishing_stats(self, changes, cursor):
+        """Apply fish leaving/arriving to fishing_stats as deltas, inside the caller's transaction.
+
+        ``changes`` is ``{user_id: (networth_delta, heaviest_removed, heaviest_added)}``
+        where ``heaviest_removed`` is a weight (or None) and ``heaviest_added`` a
+        ``(weight, fish_name, rarity)`` tuple (or None). Inventories are never
+        summed; the best fish is only looked up again (one index seek) when the
+        removed fish may have been it.
+        """
+        if not changes:
+            return
+        rows = []
+        for user_id, (networth_delta, _, added) in changes.items():
+            weight, fish_name, rarity = added or (0, None, None)
+            rows.append((user_id, int(networth_delta), weight, fish_name, rarity))
+        # Same upsert as a catch: networth moves by the delta, best weight only if beaten
+        await cursor.executemany('''
+            INSERT INTO fishing_stats (user_id, networth, best_weight, best_fish, best_rarity)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                best_fish = IF(VALUES(best_weight) > best_weight, VALUES(best_fish), best_fish),
+                best_rarity = IF(VALUES(best_weight) > best_weight, VALUES(best_rarity), best_rarity),
+                best_weight = GREATEST(best_weight, VALUES(best_weight)),
+                networth = networth + VALUES(networth)
+        ''', rows)
+
+        ids = ", ".join(["%s"] * len(changes))
+        await cursor.execute(f'''
+            SELECT s.user_id, s.networth, s.best_weight, s.best_fish, s.best_rarity, p.total_catches
+            FROM fishing_stats s LEFT JOIN fishing_profile p ON p.user_id = s.user_id
+            WHERE s.user_id IN ({ids})
+        ''', list(changes))
+        stats_rows = [list(row) for row in await cursor.fetchall()]
+
+        for row in stats_rows:
+            removed = changes[row[0]][1]
+            if removed is None or float(row[2] or 0) > float(removed):
+                continue
+            # The current best may have just left: next heaviest via idx_fish_inventory_user_weight
+            await cursor.execute(
+                'SELECT weight, fish_name, rarity FROM fish_inventory WHERE user_id = %s ORDER BY weight DESC, id LIMIT 1',
+                (row[0],)
+            )
+            best = await cursor.fetchone() or (0, None, None)
+            await cursor.execute(
+                'UPDATE fishing_stats SET best_weight = %s, best_fish = %s, best_rarity = %s WHERE user_id = %s',
+                (*best, row[0])
+            )
+            row[2:5] = best
+        self.apply_fishing_stats(stats_rows)
+
+    async def get_leaderboard(self, name):
+        """Top 15 of a board from memory; reloads the top-K from MySQL (O(K) via index) when needed"""
+        board = self.leaderboards[name]
+        top = board.top()
+        if top is None:
+            if name == "networth":
+                rows = await self.db.fetchall('SELECT user_id, networth FROM fishing_stats WHERE networth > 0 ORDER BY networth DESC LIMIT %s', (board.capacity,))
+                board.load([(uid, int(value), None) for uid, value in rows])
+            elif name == "weight":
+                rows = await self.db.fetchall('SELECT user_id, best_weight, best_fish, best_rarity FROM fishing_stats WHERE best_weight > 0 ORDER BY best_weight DESC LIMIT %s', (board.capacity,))
+                board.load([(uid, float(weight), (fish, rarity)) for uid, weight, fish, rarity in rows])
+            else:
+                rows = await self.db.fetchall('SELECT user_id, total_catches FROM fishing_profile WHERE total_catches > 0 ORDER BY total_catches DESC LIMIT %s', (board.capacity,))
+                board.load([(uid, int(value), None) for uid, value in rows])
+            top = board.top() or []
+        return [entry for entry in top if entry[1] > 0]
+
+    async def get_weight_leaderboard(self):
+        # Heaviest fish per user: (user_id, fish_name, weight, rarity)
+        return [(uid, extra[0], weight, extra[1]) for uid, weight, extra in await self.get_leaderboard("weight")]
+
+    async def get_networth_leaderboard(self):
+        return [(uid, value) for uid, value, _ in await self.get_leaderboard("networth")]
+
+    async def get_top_fisher_leaderboard(self):
+        return [(uid, value) for uid, value, _ in await self.get_leaderboard("catches")]
+
+    async def get_inventory_summary(self, user_id):
+        """{rarity: (count, total_value)} computed in MySQL, without loading the fish themselves"""
+        rows = await self.db.fetchall('''
+            SELECT rarity, COUNT(*), COALESCE(SUM(price), 0) FROM fish_inventory
+            WHERE user_id = %s GROUP BY rarity
+        ''', (user_id,))
+        return {rarity: (int(count), int(value)) for rarity, count, value in rows}
+
+    async def sell_fish_bulk(self, user_id, rarity=None):
+        """Sell every fish (or every fish of ``rarity``) in one transaction.
+
+        The price is summed, credited and the rows deleted entirely in MySQL
+        under row locks, so a concurrent catch/trade can't change what gets
+        paid. Returns (count, total_price, new_summary); count is 0 if there
+        was nothing to sell. Raises if the Economy cog is not loaded.
+        """
+        economy = self.get_economy()
+        if not economy:
+            raise RuntimeError("Economy cog not loaded")
+
+        where = "user_id = %s AND rarity = %s" if rarity else "user_id = %s"
+        params = (user_id, rarity) if rarity else (user_id,)
+        async with economy.direct_balance(user_id):
+            async with self.db.transaction() as cursor:
+                await cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(price), 0), MAX(weight) FROM fish_inventory WHERE {where} FOR UPDATE", params)
+                count, total_price, heaviest = await cursor.fetchone()
+                count, total_price = int(count), int(total_price)
+                if count:
+                    await cursor.execute(f"DELETE FROM fish_inventory WHERE {where}", params)
+                    await economy.update_balance(user_id, total_price, cursor, reason="fish_sell")
+                    await self.adjust_fishing_stats({user_id: (-total_price, heaviest, None)}, cursor)
+
+                await cursor.execute('''
+                    SELECT rarity, COUNT(*), COALESCE(SUM(price), 0) FROM fish_inventory
+                    WHERE user_id = %s GROUP BY rarity
+                ''', (user_id,))
+                summary = {r: (int(c), int(v)) for r, c, v in await cursor.fetchall()}
+        return count, total_price, summary
+
+    async def trade_fish(self, user_a, ids_a, user_b, ids_b):
+        """Swap two sets of fish between users atomically. Returns False if anything changed hands meanwhile.
+
+        All offered rows are locked with one SELECT ... FOR UPDATE and checked
+        against their expected owner before a single UPDATE per side, so the
+        round trips don't grow with the size of the trade.
+        """
+        ids_a = sorted({int(fid) for fid in ids_a})
+        ids_b = sorted({int(fid) for fid in ids_b})
+        expected = {fid: user_a for fid in ids_a}
+        expected.update({fid: user_b for fid in ids_b})
+        if len(expected) != len(ids_a) + len(ids_b):
+            return False
+        if not expected:
+            return True
+
+        async with self.db.transaction() as cursor:
+            all_ids = list(expected)
+            marks = ", ".join(["%s"] * len(all_ids))
+            await cursor.execute(f"SELECT id, user_id, price, weight, fish_name, rarity FROM fish_inventory WHERE id IN ({marks}) FOR UPDATE", all_ids)
+            rows = await cursor.fetchall()
+            owners = {row[0]: row[1] for row in rows}
+            if owners != expected:
+                # Sold, salvaged or traded away since it was offered
+                return False
+
+            for ids, giver, receiver in ((ids_a, user_a, user_b), (ids_b, user_b, user_a)):
+                if ids:
+                    marks = ", ".join(["%s"] * len(ids))
+                    await cursor.execute(f"UPDATE fish_inventory SET user_id = %s WHERE user_id = %s AND id IN ({marks})", (receiver, giver, *ids))
+
+            # Each side loses what it gave and gains what it got
+            changes = {}
+            for giver, receiver in ((user_a, user_b), (user_b, user_a)):
+                given = [row for row in rows if row[1] == giver]
+                received = [row for row in rows if row[1] == receiver]
+                value = sum(row[2] for row in received) - sum(row[2] for row in given)
+                heaviest_given = max((row[3] for row in given), default=None)
+                heaviest_received = max(received, key=lambda row: row[3], default=None)
+                changes[giver] = (value, heaviest_given, heaviest_received[3:6] if heaviest_received else None)
+            await self.adjust_fishing_stats(changes, cursor)
+        return True
+
+    async def salvage_fish(self, user_id, fish_ids=None, rarity=None):
+        """Turn fish into Scrap Metal in one transaction. Returns (count, scrap).
+
+        ``fish_ids`` salvages those fish (1-3 scrap each), otherwise every fish
+        of ``rarity`` (or all fish) at the bulk ``salvage_scrap`` rate. Rows are
+        locked, deleted and the scrap credited together, so nothing can be
+        salvaged twice or lost between the two writes.
+        """
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT user_id, SUM(price) as total_value 
-                FROM fish_inventory 
-                GROUP BY user_id 
-                ORDER BY total_value DESC 
-                LIMIT 15
-            ''')
-            return cursor.fetchall()
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-    def get_top_fisher_leaderboard(self):
-        conn = self.get_conn()
-        if not conn: return []
+            async with self.db.transaction() as cursor:
+                if fish_ids:
+                    fish_ids = [int(fid) for fid in fish_ids]
+                    marks = ", ".join(["%s"] * len(fish_ids))
+                    where, params = f"user_id = %s AND id IN ({marks})", (user_id, *fish_ids)
+                    await cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(price), 0), MAX(weight) FROM fish_inventory WHERE {where} FOR UPDATE", params)
+                    count, value, heaviest = await cursor.fetchone()
+                    count, value = int(count), int(value)
+                    scrap = sum(random.randint(1, 3) for _ in range(count))
+                else:
+                    where, params = ("user_id = %s AND rarity = %s", (user_id, rarity)) if rarity else ("user_id = %s", (user_id,))
+                    await cursor.execute(f"SELECT rarity, COUNT(*), COALESCE(SUM(price), 0), MAX(weight) FROM fish_inventory WHERE {where} GROUP BY rarity FOR UPDATE", params)
+                    by_rarity = await cursor.fetchall()
+                    count = sum(int(c) for _, c, _, _ in by_rarity)
+                    value = sum(int(v) for _, _, v, _ in by_rarity)
+                    heaviest = max((w for _, _, _, w in by_rarity), default=None)
+                    scrap = sum(self.salvage_scrap.get(r, 1) * int(c) for r, c, _, _ in by_rarity)
+
+                if count:
+                    await cursor.execute(f"DELETE FROM fish_inventory WHERE {where}", params)
+                    await self.add_materials(user_id, {"Scrap Metal": scrap}, cursor)
+                    await self.adjust_fishing_stats({user_id: (-value, heaviest, None)}, cursor)
+        except Exception:
+            # add_materials already wrote through to the cache
+            self.invalidate_state(user_id)
+            raise
+        return count, scrap
+
+    async def forge_rod(self, user_id, rod_name, use_lucky_charm=False):
+        """One forge attempt as a single transaction.
+
+        Balance, materials and rod level are read and locked with one query,
+        then the cost is deducted and the new level written together, so two
+        quick clicks can't spend the same resources twice. Returns
+        (error, success, level, new_level, risk); ``error`` is a message to
+        show the user when nothing was spent, ``new_level`` is None if the rod
+        was destroyed.
+        """
+        economy = self.get_economy()
+        if not economy:
+            return "❌ Economy Error.", False, 0, 0, None
+
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT user_id, total_catches 
-                FROM fishing_profile 
-                ORDER BY total_catches DESC 
-                LIMIT 15
-            ''')
-            return cursor.fetchall()
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+            # Buffered slot results must be written before the locked balance check
+            async with economy.direct_balance(user_id):
+                async with self.db.transaction() as cursor:
+                    await cursor.execute('''
+                        SELECT u.balance, s.amount, p.amount, c.amount, r.level
+                        FROM (SELECT %s AS user_id) me
+                        LEFT JOIN slot_users u ON u.user_id = me.user_id
+                        LEFT JOIN fishing_materials s ON s.user_id = me.user_id AND s.material_name = 'Scrap Metal'
+                        LEFT JOIN fishing_materials p ON p.user_id = me.user_id AND p.material_name = 'Magic Pearl'
+                        LEFT JOIN fishing_materials c ON c.user_id = me.user_id AND c.material_name = 'Lucky Charm'
+                        LEFT JOIN fishing_rods r ON r.user_id = me.user_id AND r.rod_name = %s
+                        FOR UPDATE
+                    ''', (user_id, rod_name))
+                    bal, user_scrap, user_pearl, user_charm, level = await cursor.fetchone()
+                    bal, user_scrap, user_pearl, user_charm = bal or 0, user_scrap or 0, user_pearl or 0, user_charm or 0
+
+                    if level is None and rod_name != "Common Rod":
+                        return "❌ Kamu tidak memiliki rod ini!", False, 0, 0, None
+                    level = level or 0
+                    next_level = level + 1
+
+                    # Validate Forge Data
+                    if rod_name not in self.forge_data or next_level not in self.forge_data[rod_name]["levels"]:
+                        return "❌ Data forge tidak ditemukan atau level sudah maksimal!", False, level, level, None
+
+                    forge_info = self.forge_data[rod_name]["levels"][next_level]
+                    cost = forge_info["cost"]
+                    scrap = forge_info["scrap"]
+                    pearl = forge_info["pearl"]
+                    rate = forge_info["rate"]
+                    risk = forge_info["risk"]
+
+                    # Apply Lucky Charm Boost
+                    if use_lucky_charm:
+                        rate = min(100, rate + 50)
+
+                    if bal < cost:
+                        return f"❌ Uang tidak cukup! Butuh {cost:,} coins.", False, level, level, risk
+                    if user_scrap < scrap:
+                        return f"❌ Scrap Metal kurang! Butuh {scrap}x.", False, level, level, risk
+                    if user_pearl < pearl:
+                        return f"❌ Magic Pearl kurang! Butuh {pearl}x.", False, level, level, risk
+                    if use_lucky_charm and user_charm < 1:
+                        return "❌ Lucky Charm kurang!", False, level, level, risk
+
+                    # Deduct Resources
+                    await economy.update_balance(user_id, -cost, cursor, reason="forge")
+                    await self.add_materials(user_id, {
+                        "Scrap Metal": -scrap,
+                        "Magic Pearl": -pearl,
+                        "Lucky Charm": -1 if use_lucky_charm else 0,
+                    }, cursor)
+
+                    # Roll RNG
+                    roll = random.randint(1, 100)
+                    success = roll <= rate
+
+                    if success:
+                        new_level = next_level
+                    elif risk == "downgrade":
+                        new_level = max(0, level - 1)
+                    elif risk == "reset":
+                        new_level = 0
+                    elif risk == "destroy":
+                        new_level = None
+                    else:
+                        new_level = level
+
+                    if new_level is None:
+                        await cursor.execute('DELETE FROM fishing_rods WHERE user_id = %s AND rod_name = %s', (user_id, rod_name))
+                        # Check if equipped, if so, equip Common Rod
+                        await cursor.execute('UPDATE fishing_profile SET equipped_rod = %s WHERE user_id = %s AND equipped_rod = %s', ("Common Rod", user_id, rod_name))
+                    elif new_level != level:
+                        await self.update_rod_level(user_id, rod_name, new_level, cursor)
+        except Exception:
+            # Cached materials/levels were written through before the rollback
+            self.invalidate_state(user_id)
+            raise
+
+        if new_level is None:
+            self.invalidate_state(user_id)
+        print(f"[DEBUG] Forge: User={user_id}, Rod={rod_name}, Level={level}->{next_level}, Rate={rate}, Roll={roll}, Success={success}")
+        return None, success, level, new_level, risk
+
+    async def get_inventory_page(self, user_id, before_id=None, limit=24):
+        """One page of fish, newest first, keyset-paginated on id (no OFFSET).
+
+        ``before_id`` is the last id of the previous page; each page costs
+        O(limit) through idx (user_id, id) no matter how big the inventory is.
+        """
+        if before_id is None:
+            return await self.db.fetchall('''
+                SELECT id, fish_name, rarity, weight, price FROM fish_inventory
+                WHERE user_id = %s ORDER BY id DESC LIMIT %s
+            ''', (user_id, limit))
+        return await self.db.fetchall('''
+            SELECT id, fish_name, rarity, weight, price FROM fish_inventory
+            WHERE user_id = %s AND id < %s ORDER BY id DESC LIMIT %s
+        ''', (user_id, before_id, limit))
 
     async def give_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
         choices = ["Coin"]
@@ -827,7 +1113,7 @@ class Fishing(commands.Cog):
         if item == "Coin":
             economy = self.bot.get_cog('Economy')
             if economy:
-                new_balance = economy.update_balance(user.id, amount)
+                new_balance = await economy.update_balance(user.id, amount, reason="admin")
                 embed = discord.Embed(
                     title="✅ Transaction Successful",
                     description=f"Berhasil memberikan **{amount:,} Coins** ke {user.mention}.",
@@ -842,7 +1128,7 @@ class Fishing(commands.Cog):
 
         # 2. RODS
         if item in self.rod_data:
-            self.update_rod_level(user.id, item, amount)
+            await self.update_rod_level(user.id, item, amount)
             embed = discord.Embed(
                 title="✅ Item Given",
                 description=f"Berhasil memberikan **{item}** (Level {amount}) ke {user.mention}.",
@@ -853,7 +1139,7 @@ class Fishing(commands.Cog):
 
         # 3. BUFF ITEMS
         if item in self.buff_item_data:
-            self.add_item(user.id, item, amount)
+            await self.add_item(user.id, item, amount)
             embed = discord.Embed(
                 title="✅ Item Given",
                 description=f"Berhasil memberikan **{amount}x {item}** ke {user.mention}.",
@@ -865,7 +1151,7 @@ class Fishing(commands.Cog):
         # 4. MATERIALS
         valid_materials = ["Scrap Metal", "Magic Pearl"]
         if item in valid_materials:
-            self.add_material(user.id, item, amount)
+            await self.add_material(user.id, item, amount)
             embed = discord.Embed(
                 title="✅ Material Given",
                 description=f"Berhasil memberikan **{amount}x {item}** ke {user.mention}.",
@@ -881,24 +1167,16 @@ class Fishing(commands.Cog):
     fish_group = app_commands.Group(name="fish", description="Fishing commands")
 
     async def item_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        user_id = interaction.user.id
-        conn = self.get_conn()
-        if not conn: return []
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT item_name, amount FROM fishing_items WHERE user_id = %s AND item_name LIKE %s", (user_id, f"%{current}%"))
-            rows = cursor.fetchall()
-            
-            choices = []
-            for name, amount in rows:
-                label = f"{name} (x{amount})"
-                choices.append(app_commands.Choice(name=label, value=name))
-            
-            return choices[:25]
-        finally:
-            if conn.is_connected():
-                cursor.close()
-                conn.close()
+        state = await self.get_fishing_state(interaction.user.id)
+        
+        choices = []
+        for name, amount in state["items"].items():
+            if current.lower() not in name.lower():
+                continue
+            label = f"{name} (x{amount})"
+            choices.append(app_commands.Choice(name=label, value=name))
+        
+        return choices[:25]
 
     @fish_group.command(name="use", description="Gunakan item buff")
     @app_commands.autocomplete(item=item_autocomplete)
@@ -908,55 +1186,46 @@ class Fishing(commands.Cog):
         # If no item arg, show list
         if not item:
             # Check inventory
-            conn = self.get_conn()
-            if conn:
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT item_name, amount FROM fishing_items WHERE user_id = %s', (user_id,))
-                    rows = cursor.fetchall()
-                    
-                    if not rows:
-                        await interaction.response.send_message("🎒 Tas item lu kosong!", ephemeral=True)
-                        return
-                    
-                    opts = [discord.SelectOption(label=f"{name} (x{amt})", value=name) for name, amt in rows]
-                    view = discord.ui.View()
-                    select = discord.ui.Select(placeholder="Pilih item...", options=opts)
-                    
-                    async def callback(inter):
-                        if inter.user.id != user_id: return
-                        await self.process_use_item(inter, select.values[0])
-                    
-                    select.callback = callback
-                    view.add_item(select)
-                    await interaction.response.send_message("Pilih item untuk dipakai:", view=view, ephemeral=True)
-                finally:
-                    if conn.is_connected():
-                        cursor.close()
-                        conn.close()
+            rows = list((await self.get_fishing_state(user_id))["items"].items())
+            
+            if not rows:
+                await interaction.response.send_message("🎒 Tas item lu kosong!", ephemeral=True)
+                return
+            
+            opts = [discord.SelectOption(label=f"{name} (x{amt})", value=name) for name, amt in rows]
+            view = discord.ui.View()
+            select = discord.ui.Select(placeholder="Pilih item...", options=opts)
+            
+            async def callback(inter):
+                if inter.user.id != user_id: return
+                await self.process_use_item(inter, select.values[0])
+            
+            select.callback = callback
+            view.add_item(select)
+            await interaction.response.send_message("Pilih item untuk dipakai:", view=view, ephemeral=True)
         else:
             await self.process_use_item(interaction, item)
 
     async def process_use_item(self, interaction, item_name):
         # Allow fuzzy match logic if needed, currently exact match from select
         # Verify ownership
-        amt = self.get_item_amount(interaction.user.id, item_name)
+        amt = await self.get_item_amount(interaction.user.id, item_name)
         if amt < 1:
             await interaction.response.send_message("❌ Lu gak punya item itu!", ephemeral=True)
             return
 
-        end_time = self.activate_buff(interaction.user.id, item_name)
+        end_time = await self.activate_buff(interaction.user.id, item_name)
         if not end_time:
              await interaction.response.send_message("❌ Item tidak valid atau error.", ephemeral=True)
              return
              
-        self.add_item(interaction.user.id, item_name, -1) # Consume
+        await self.add_item(interaction.user.id, item_name, -1) # Consume
         ts = int(end_time.timestamp())
         await interaction.response.send_message(f"✅ **{item_name}** Aktif! Efek sampai <t:{ts}:R>.", ephemeral=True)
 
     @fish_group.command(name="buffs", description="Cek buff aktif")
     async def fish_buffs(self, interaction: discord.Interaction):
-        buffs = self.get_active_buffs(interaction.user.id)
+        buffs = await self.get_active_buffs(interaction.user.id)
         if not buffs:
             await interaction.response.send_message("❌ Tidak ada buff aktif.", ephemeral=True)
             return
@@ -976,15 +1245,16 @@ class Fishing(commands.Cog):
         # 0. Manual Cooldown Logic to Support Buffs
         # Standard Cooldown: 15s. With Buff: 5s.
         user_id = interaction.user.id
-        buffs = self.get_active_buffs(user_id)
-        
-        cooldown_duration = 15.0
-        
-        if "Rokok Surya" in buffs:
-            cooldown_duration = 5.0 # -10s
-
         now = interaction.created_at.timestamp()
         last_time = self.catch_cooldowns.get(user_id, 0)
+
+        cooldown_duration = 15.0
+        buffs = {}
+        if now - last_time < cooldown_duration:
+            # Only a click inside the standard cooldown needs the buffs (state cache) to decide
+            buffs = await self.get_active_buffs(user_id)
+            if "Rokok Surya" in buffs:
+                cooldown_duration = 5.0 # -10s
         
         if now - last_time < cooldown_duration:
             retry_after = cooldown_duration - (now - last_time)
@@ -997,9 +1267,13 @@ class Fishing(commands.Cog):
             
         self.catch_cooldowns[user_id] = now
 
+        # Single batched read: rod, level, buffs and quests for this cast
+        state = await self.load_catch_state(user_id)
+        buffs = state["buffs"]
+
         # 1. Get Equipped Rod and Stats
-        equipped_rod = self.get_equipped_rod(user_id)
-        rod_level = self.get_rod_level(user_id, equipped_rod)
+        equipped_rod = state["rod"]
+        rod_level = state["rod_level"]
         rod_stats = self.rod_data.get(equipped_rod, self.rod_data["Common Rod"])
         
         # Calculate Total Boosts
@@ -1033,21 +1307,8 @@ class Fishing(commands.Cog):
         total_xp = 0 # Not used but good to track if needed
         
         for _ in range(fish_count):
-            # 2. Rarity Roll
-            rarities = list(self.rarity_weights.keys())
-            rarity_weights = list(self.rarity_weights.values())
-            
-            if rarity_boost > 0:
-                rarity_weights[2] += rarity_boost # Rare
-                rarity_weights[3] += rarity_boost # Epic
-                rarity_weights[4] += rarity_boost # Legendary
-                
-            rarity = random.choices(rarities, weights=rarity_weights, k=1)[0]
-            
-            # 3. Fish Roll
-            fish_list = self.fish_data[rarity]
-            fish_weights = [f["spawn_weight"] for f in fish_list]
-            fish_info = random.choices(fish_list, weights=fish_weights, k=1)[0]
+            # 2 & 3. Rarity + Fish Roll (precompiled samplers, rarity_boost applied)
+            rarity, fish_info = self.roll_fish(rarity_boost)
             
             name = fish_info["name"]
             image_url = fish_info.get("image_url") # Only last image used if double
@@ -1061,52 +1322,18 @@ class Fishing(commands.Cog):
             weight_multiplier = weight / min_w
             final_price = int(base_price * weight_multiplier)
             
-            # Save
-            conn = self.get_conn()
-            if conn:
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO fish_inventory (user_id, fish_name, rarity, weight, price)
-                        VALUES (%s, %s, %s, %s, %s)
-                    ''', (user_id, name, rarity, weight, final_price))
-                    
-                    caught_items.append({
-                        "name": name, "rarity": rarity, "weight": weight, "price": final_price, "image": image_url
-                    })
-                    conn.commit()
-                finally:
-                     if conn.is_connected():
-                        cursor.close()
-                        conn.close()
-            
-            # Quest Check
-            self.generate_quests(user_id) 
-            await self.check_quest_progress(interaction, name, rarity, weight)
-
-        # 5. Profile Update
-        conn = self.get_conn()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO fishing_profile (user_id, total_catches) 
-                    VALUES (%s, %s)
-                    ON DUPLICATE KEY UPDATE total_catches = total_catches + %s
-                ''', (user_id, fish_count, fish_count))
-                conn.commit()
-            finally:
-                 if conn.is_connected():
-                    cursor.close()
-                    conn.close()
-        
-        # 6. Material Drops
+            caught_items.append({
+                "name": name, "rarity": rarity, "weight": weight, "price": final_price, "image": image_url
+            })
+
+        # 5. Material Drops (saved together with the fish below)
+        materials = {}
         material_msg = ""
         # Scrap: 10% + Buff
         scrap_chance = 0.10 + loot_boost
         if random.random() < scrap_chance:
             scrap_amount = random.randint(1, 3)
-            self.add_material(user_id, "Scrap Metal", scrap_amount)
+            materials["Scrap Metal"] = scrap_amount
             material_msg = f"\n🔩 **{scrap_amount}x Scrap Metal**!"
             
         # Pearl: 1% + Buff (Rare+ only)
@@ -1120,9 +1347,19 @@ class Fishing(commands.Cog):
         if best_rarity in ["Rare", "Epic", "Legendary"]:
             pearl_chance = 0.01 + pearl_boost
             if random.random() < pearl_chance:
-                self.add_material(user_id, "Magic Pearl", 1)
+                materials["Magic Pearl"] = 1
                 material_msg += f"\n🔮 **1x Magic Pearl**!"
 
+        # 6. Save fish, profile, materials and quest progress in one transaction
+        try:
+            completed_quests = await self.save_catch(user_id, caught_items, materials, state)
+        except Exception as e:
+            print(f"❌ Error saving catch: {e}")
+            self.catch_cooldowns.pop(user_id, None)
+            self.invalidate_state(user_id) # cached materials may include the rolled-back drops
+            await interaction.response.send_message("❌ Gagal menyimpan hasil pancingan, coba lagi!", ephemeral=True)
+            return
+
         # 7. Embed
         # Restore "Main Fish" focus style
         main_fish = caught_items[0]
@@ -1178,39 +1415,35 @@ class Fishing(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
 
+        if completed_quests:
+            try:
+                await interaction.followup.send("🎉 **Quest Selesai!** Cek `/fish quests` untuk klaim hadiah.", ephemeral=True)
+            except:
+                pass
+
 
     @fish_group.command(name="inventory", description="Lihat hasil pancinganmu")
     async def inventory(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        conn = self.get_conn()
-        if not conn:
-             await interaction.followup.send("❌ Database Error", ephemeral=True)
-             return
-             
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (interaction.user.id,))
-            rows = cursor.fetchall()
-            
-            if not rows:
-                await interaction.followup.send("🎒 Tas ikanmu kosong! Ayo memancing dulu.", ephemeral=True)
-                return
-                
-            view = FishingInventoryView(self, interaction, rows)
-            await view.send_initial_message()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+        view = FishingInventoryView(self, interaction)
+        await view.load()
+
+        if not view.page_rows:
+            await interaction.followup.send("🎒 Tas ikanmu kosong! Ayo memancing dulu.", ephemeral=True)
+            return
+
+        await view.send_initial_message()
+
     @app_commands.command(name="fishing_rod", description="Equip your fishing rod")
     async def fishing_rod(self, interaction: discord.Interaction):
         view = RodEquipView(self, interaction.user)
-        await interaction.response.send_message(embed=view.build_embed(), view=view)
+        await view.update_components()
+        await interaction.response.send_message(embed=await view.build_embed(), view=view)
 
     @fish_group.command(name="shop", description="Buy better fishing rods")
     async def fish_shop(self, interaction: discord.Interaction):
         view = FishShopView(self, interaction.user)
-        await interaction.response.send_message(embed=view.build_embed(), view=view)
+        await interaction.response.send_message(embed=await view.build_embed(), view=view)
 
     @fish_group.command(name="trade", description="Trade fish with another user")
     async def fish_trade(self, interaction: discord.Interaction, user: discord.User):
@@ -1256,35 +1489,15 @@ class Fishing(commands.Cog):
         
         # 2. Process Logic
         try:
-            self.generate_quests(interaction.user.id)
+            await self.generate_quests(interaction.user.id)
         except Exception as e:
             print(f"[ERROR] generate_quests crashed: {e}")
         
-        conn = self.get_conn()
-        if not conn:
-             await interaction.edit_original_response(content="❌ Database Error", embed=None)
-             return
-        
         try:
-            cursor = conn.cursor()
             now = datetime.now()
             
-            # 1. Sync Date Logic with generate_quests (Daily Reset 12:00 PM)
-            today_reset = now.replace(hour=12, minute=0, second=0, microsecond=0)
-            if now < today_reset:
-                current_daily_start = today_reset - timedelta(days=1)
-            else:
-                current_daily_start = today_reset
-            
-            daily_key = current_daily_start.strftime('%Y-%m-%d')
-            
-            # 2. Sync Weekly Logic (Reset Saturday)
-            days_since_saturday = (now.weekday() - 5) % 7
-            start_of_week_date = (now - timedelta(days=days_since_saturday)).replace(hour=0, minute=0, second=0, microsecond=0)
-            weekly_key = start_of_week_date.strftime('%Y-%m-%d')
-            
             # Fetch Active Quests (Use expiration_date > now for robustness)
-            cursor.execute('''
+            quests = await self.db.fetchall('''
                 SELECT id, quest_type, target_criteria, target_value, progress, reward_amount, is_claimed, quest_period, reward_type, reward_name, expiration_date
                 FROM fishing_quests 
                 WHERE user_id = %s 
@@ -1295,8 +1508,6 @@ class Fishing(commands.Cog):
                 )
             ''', (interaction.user.id, now, now))
             
-            quests = cursor.fetchall()
-            
             embed = discord.Embed(title="📜 Fishing Quests", color=discord.Color.blue())
             
             daily_text = ""
@@ -1375,53 +1586,41 @@ class Fishing(commands.Cog):
                 await interaction.edit_original_response(content=f"❌ Terjadi kesalahan: {e}", embed=None)
             except:
                 pass
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
 
     async def claim_quest_reward(self, interaction: discord.Interaction, quest_id: int):
-        conn = self.get_conn()
-        if not conn: return
+        res = await self.db.fetchone('SELECT reward_amount, is_claimed, progress, target_value, reward_type, reward_name FROM fishing_quests WHERE id = %s', (quest_id,))
         
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT reward_amount, is_claimed, progress, target_value, reward_type, reward_name FROM fishing_quests WHERE id = %s', (quest_id,))
-            res = cursor.fetchone()
+        if not res:
+            await interaction.response.send_message("❌ Quest tidak ditemukan!", ephemeral=True)
+            return
             
-            if not res:
-                await interaction.response.send_message("❌ Quest tidak ditemukan!", ephemeral=True)
-                return
-                
-            reward, is_claimed, progress, target, r_type, r_name = res
+        reward, is_claimed, progress, target, r_type, r_name = res
+        
+        if is_claimed:
+            await interaction.response.send_message("❌ Quest sudah diklaim!", ephemeral=True)
+            return
             
-            if is_claimed:
-                await interaction.response.send_message("❌ Quest sudah diklaim!", ephemeral=True)
-                return
-                
-            if progress < target:
-                await interaction.response.send_message("❌ Quest belum selesai!", ephemeral=True)
-                return
-                
-            # Update DB
-            cursor.execute('UPDATE fishing_quests SET is_claimed = 1 WHERE id = %s', (quest_id,))
-            conn.commit()
-            
-            # Add Reward
-            if r_type == 'material':
-                self.add_material(interaction.user.id, r_name, reward)
-                await interaction.response.send_message(f"🎉 **Selamat!** Kamu mendapatkan **{reward}x {r_name}**!", ephemeral=True)
+        if progress < target:
+            await interaction.response.send_message("❌ Quest belum selesai!", ephemeral=True)
+            return
+            
+        # Update DB (guarded so a double click can't claim twice)
+        claimed = await self.db.execute('UPDATE fishing_quests SET is_claimed = 1 WHERE id = %s AND is_claimed = 0', (quest_id,))
+        if not claimed:
+            await interaction.response.send_message("❌ Quest sudah diklaim!", ephemeral=True)
+            return
+        
+        # Add Reward
+        if r_type == 'material':
+            await self.add_material(interaction.user.id, r_name, reward)
+            await interaction.response.send_message(f"🎉 **Selamat!** Kamu mendapatkan **{reward}x {r_name}**!", ephemeral=True)
+        else:
+            economy = self.get_economy()
+            if economy:
+                await economy.update_balance(interaction.user.id, reward, reason="fish_quest")
+                await interaction.response.send_message(f"🎉 **Selamat!** Kamu mendapatkan 💰 **{reward}** koin!", ephemeral=True)
             else:
-                economy = self.get_economy()
-                if economy:
-                    economy.update_balance(interaction.user.id, reward)
-                    await interaction.response.send_message(f"🎉 **Selamat!** Kamu mendapatkan 💰 **{reward}** koin!", ephemeral=True)
-                else:
-                    await interaction.response.send_message("❌ Economy system error.", ephemeral=True)
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+                await interaction.response.send_message("❌ Economy system error.", ephemeral=True)
 
 
 
@@ -1432,32 +1631,20 @@ class Fishing(commands.Cog):
 
     @fish_group.command(name="salvage", description="Salvage fish into materials (Scrap Metal)")
     async def salvage(self, interaction: discord.Interaction):
-        conn = self.get_conn()
-        if not conn:
-             await interaction.response.send_message("❌ Database Error", ephemeral=True)
-             return
-             
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (interaction.user.id,))
-            rows = cursor.fetchall()
+        rows = await self.db.fetchall('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (interaction.user.id,))
+        
+        if not rows:
+            await interaction.response.send_message("🎒 Tas ikanmu kosong! Tidak ada yang bisa di-salvage.", ephemeral=True)
+            return
             
-            if not rows:
-                await interaction.response.send_message("🎒 Tas ikanmu kosong! Tidak ada yang bisa di-salvage.", ephemeral=True)
-                return
-                
-            view = FishingSalvageView(self, interaction, rows)
-            await view.send_initial_message()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+        view = FishingSalvageView(self, interaction, rows)
+        await view.send_initial_message()
 
     @fish_group.command(name="forge", description="Upgrade your fishing rod (Tempa)")
     async def forge(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
-            owned_rods = self.get_owned_rods(interaction.user.id)
+            owned_rods = await self.get_owned_rods(interaction.user.id)
             if not owned_rods:
                 await interaction.followup.send("❌ Kamu belum memiliki pancingan!", ephemeral=True)
                 return
@@ -1529,52 +1716,64 @@ class Fishing(commands.Cog):
             ]
         }
 
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
-        if interaction.type == discord.InteractionType.component:
-            custom_id = interaction.data.get("custom_id")
-            
-            if custom_id == "fish_catalog_rarity_select":
-                selected = interaction.data["values"][0]
-                payload = self.build_catalog_payload(selected)
-                await self.update_raw_message(interaction, payload)
+    async def cog_load(self):
+        self.bot.router.add_exact("fish_catalog_rarity_select", self.on_catalog_select, owner=self)
+
+    async def on_catalog_select(self, interaction: discord.Interaction):
+        selected = interaction.data["values"][0]
+        payload = self.build_catalog_payload(selected)
+        await self.update_raw_message(interaction, payload)
 
     async def update_raw_message(self, interaction: discord.Interaction, payload: dict):
-        url = f"https://discord.com/api/v10/webhooks/{self.bot.user.id}/{interaction.token}/messages/@original"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
         # Type 7: Update Message
-        json_payload = {"type": 7, "data": payload}
-        
-        callback_url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-        async with aiohttp.ClientSession() as session:
-            async with session.post(callback_url, json=json_payload, headers=headers) as resp:
-                    if resp.status != 200:
-                        print(f"Error updating message: {await resp.text()}")
+        await send_components_v2(interaction, payload, UPDATE_MESSAGE, label="Fishing catalog")
 
     def cog_unload(self):
         # MySQL connection pooling handles connections, no single persistent conn to close
-        pass
+        self.bot.router.remove_owner(self)
 
 class FishingInventoryView(discord.ui.View):
-    def __init__(self, cog, interaction, all_rows):
+    def __init__(self, cog, interaction):
         super().__init__(timeout=120)
         self.cog = cog
         self.original_interaction = interaction
-        self.all_rows = all_rows
-        self.page = 0
         self.items_per_page = 24
-        self.max_pages = (len(all_rows) - 1) // self.items_per_page + 1
-        
+        self.page = 0
+        # Keyset cursors: anchors[p] is the before_id used to load page p
+        self.anchors = [None]
+        self.page_rows = []
+        self.summary = {}
+        self.total_count = 0
+        self.total_value = 0
+        self.max_pages = 1
+
+    async def load(self):
+        """Fetch the rarity summary and the current page (after opening or selling)"""
+        self.set_summary(await self.cog.get_inventory_summary(self.original_interaction.user.id))
+        await self.load_page()
+
+    def set_summary(self, summary):
+        self.summary = summary
+        self.total_count = sum(count for count, _ in summary.values())
+        self.total_value = sum(value for _, value in summary.values())
+        self.max_pages = max(1, (self.total_count - 1) // self.items_per_page + 1)
+
+    async def load_page(self):
+        """Fetch only the fish on the current page; page flips cost O(items_per_page)"""
+        user_id = self.original_interaction.user.id
+        self.page_rows = await self.cog.get_inventory_page(user_id, self.anchors[-1], self.items_per_page)
+        # Everything from this page on was sold; step back to the last page that still has fish
+        while not self.page_rows and self.page > 0:
+            self.anchors.pop()
+            self.page -= 1
+            self.page_rows = await self.cog.get_inventory_page(user_id, self.anchors[-1], self.items_per_page)
+
         self.update_components()
 
     def update_components(self):
         self.clear_items()
         
-        # Slicing for current page
-        start = self.page * self.items_per_page
-        end = start + self.items_per_page
-        current_rows = self.all_rows[start:end]
+        current_rows = self.page_rows
         
         # 1. Select Menu for Selling
         options = []
@@ -1592,14 +1791,16 @@ class FishingInventoryView(discord.ui.View):
                 emoji="🐟"
             ))
             
-        select = discord.ui.Select(
-            placeholder=f"Jual ikan (Halaman {self.page + 1}/{self.max_pages})...",
-            min_values=1,
-            max_values=len(options),
-            options=options
-        )
-        select.callback = self.select_callback
-        self.add_item(select)
+        # Discord rejects a select without options (everything was sold)
+        if options:
+            select = discord.ui.Select(
+                placeholder=f"Jual ikan (Halaman {self.page + 1}/{self.max_pages})...",
+                min_values=1,
+                max_values=len(options),
+                options=options
+            )
+            select.callback = self.select_callback
+            self.add_item(select)
         
         # 2. Bulk Action Select Menu
         bulk_options = [
@@ -1626,7 +1827,7 @@ class FishingInventoryView(discord.ui.View):
         prev_btn.callback = self.prev_callback
         self.add_item(prev_btn)
         
-        next_btn = discord.ui.Button(label="Next ▶️", style=discord.ButtonStyle.secondary, disabled=(self.page >= self.max_pages - 1), row=2)
+        next_btn = discord.ui.Button(label="Next ▶️", style=discord.ButtonStyle.secondary, disabled=(self.page >= self.max_pages - 1 or len(self.page_rows) < self.items_per_page), row=2)
         next_btn.callback = self.next_callback
         self.add_item(next_btn)
 
@@ -1635,20 +1836,23 @@ class FishingInventoryView(discord.ui.View):
         await self.original_interaction.edit_original_response(embed=embed, view=self)
 
     def build_embed(self):
-        total_value = sum(row[4] for row in self.all_rows)
-        
         embed = discord.Embed(title=f"🎒 Tas Ikan {self.original_interaction.user.display_name}", color=discord.Color.blue())
-        embed.set_footer(text=f"Total Ikan: {len(self.all_rows)} | Total Nilai: {total_value:,} koin | Halaman {self.page + 1}/{self.max_pages}")
-        
-        start = self.page * self.items_per_page
-        end = start + self.items_per_page
-        current_rows = self.all_rows[start:end]
+        embed.set_footer(text=f"Total Ikan: {self.total_count:,} | Total Nilai: {self.total_value:,} koin | Halaman {self.page + 1}/{self.max_pages}")
         
         desc = ""
-        for i, (fid, name, rarity, weight, price) in enumerate(current_rows, start=1):
+        for i, (fid, name, rarity, weight, price) in enumerate(self.page_rows, start=1):
             desc += f"`{i}.` **{name}** ({rarity}) - {weight}kg - 💰{price}\n"
             
         embed.description = desc
+
+        # Per-rarity totals come from the GROUP BY summary, not from the page
+        summary_lines = []
+        for rarity in self.cog.rarity_weights:
+            if rarity in self.summary:
+                count, value = self.summary[rarity]
+                summary_lines.append(f"**{rarity}**: {count:,} ikan - 💰{value:,}")
+        if summary_lines:
+            embed.add_field(name="📊 Ringkasan", value="\n".join(summary_lines), inline=False)
         return embed
 
     async def prev_callback(self, interaction: discord.Interaction):
@@ -1658,7 +1862,8 @@ class FishingInventoryView(discord.ui.View):
         
         if self.page > 0:
             self.page -= 1
-            self.update_components()
+            self.anchors.pop()
+            await self.load_page()
             await interaction.response.edit_message(embed=self.build_embed(), view=self)
 
     async def next_callback(self, interaction: discord.Interaction):
@@ -1666,9 +1871,10 @@ class FishingInventoryView(discord.ui.View):
             await interaction.response.send_message("❌ Bukan tas ikanmu!", ephemeral=True)
             return
             
-        if self.page < self.max_pages - 1:
+        if self.page < self.max_pages - 1 and self.page_rows:
             self.page += 1
-            self.update_components()
+            self.anchors.append(self.page_rows[-1][0])
+            await self.load_page()
             await interaction.response.edit_message(embed=self.build_embed(), view=self)
 
     async def select_callback(self, interaction: discord.Interaction):
@@ -1683,47 +1889,30 @@ class FishingInventoryView(discord.ui.View):
             await self.sell_all_callback(interaction)
             return
         
-        conn = self.cog.get_conn()
-        if not conn:
-             await interaction.response.send_message("❌ Database Error", ephemeral=True)
-             return
-             
-        try:
-            cursor = conn.cursor()
-            
-            total_price = 0
-            count = 0
-            
+        total_price = 0
+        count = 0
+        
+        heaviest = None
+        async with self.cog.db.transaction() as cursor:
             for fid in selected_ids:
-                cursor.execute('SELECT price FROM fish_inventory WHERE id = %s', (fid,))
-                res = cursor.fetchone()
+                await cursor.execute('SELECT price, weight FROM fish_inventory WHERE id = %s FOR UPDATE', (fid,))
+                res = await cursor.fetchone()
                 if res:
                     total_price += res[0]
-                    cursor.execute('DELETE FROM fish_inventory WHERE id = %s', (fid,))
+                    heaviest = res[1] if heaviest is None else max(heaviest, res[1])
+                    await cursor.execute('DELETE FROM fish_inventory WHERE id = %s', (fid,))
                     count += 1
-                    
-            conn.commit()
-            
-            economy = self.cog.get_economy()
-            if economy:
-                economy.update_balance(interaction.user.id, total_price)
-                
-            await interaction.response.send_message(f"💰 Berhasil menjual **{count}** ikan seharga **{total_price:,}** koin!", ephemeral=True)
-            
-            # Refresh data and view
-            cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (self.original_interaction.user.id,))
-            self.all_rows = cursor.fetchall()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
-
-        self.max_pages = (len(self.all_rows) - 1) // self.items_per_page + 1
+            if count:
+                await self.cog.adjust_fishing_stats({interaction.user.id: (-total_price, heaviest, None)}, cursor)
         
-        if self.page >= self.max_pages and self.page > 0:
-            self.page = self.max_pages - 1
+        economy = self.cog.get_economy()
+        if economy:
+            await economy.update_balance(interaction.user.id, total_price, reason="fish_sell")
             
-        self.update_components()
+        await interaction.response.send_message(f"💰 Berhasil menjual **{count}** ikan seharga **{total_price:,}** koin!", ephemeral=True)
+        
+        # Refresh summary and the current page only
+        await self.load()
         await interaction.message.edit(embed=self.build_embed(), view=self)
 
     async def bulk_action_callback(self, interaction: discord.Interaction):
@@ -1732,6 +1921,9 @@ class FishingInventoryView(discord.ui.View):
             return
             
         action = interaction.data["values"][0]
+
+        # Quote the prompt from a fresh aggregate; the confirm button recomputes it again atomically
+        self.set_summary(await self.cog.get_inventory_summary(self.original_interaction.user.id))
         
         if action == "sell_all":
             await self.sell_all_callback(interaction)
@@ -1740,13 +1932,7 @@ class FishingInventoryView(discord.ui.View):
         if action.startswith("sell_"):
             rarity = action.split("_")[1]
             
-            # Calculate total for this rarity
-            total_price = 0
-            count = 0
-            for row in self.all_rows:
-                if row[2] == rarity:
-                    total_price += row[4]
-                    count += 1
+            count, total_price = self.summary.get(rarity, (0, 0))
             
             if count == 0:
                 await interaction.response.send_message(f"❌ Tidak ada ikan **{rarity}** di inventory!", ephemeral=True)
@@ -1760,8 +1946,8 @@ class FishingInventoryView(discord.ui.View):
             await interaction.response.send_message("❌ Ini bukan inventory kamu!", ephemeral=True)
             return
             
-        total_price = sum(row[4] for row in self.all_rows)
-        count = len(self.all_rows)
+        total_price = self.total_value
+        count = self.total_count
         
         if count == 0:
             await interaction.response.send_message("❌ Inventory kamu kosong!", ephemeral=True)
@@ -1783,42 +1969,24 @@ class ConfirmSellAllView(discord.ui.View):
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         
-        conn = self.inventory_view.cog.get_conn()
-        if not conn:
-             await interaction.followup.send("❌ Database Error", ephemeral=True)
-             return
-             
+        # Price is recomputed and paid inside the same transaction that deletes the fish,
+        # so it may differ from the prompt if the inventory changed meanwhile
         try:
-            # Update Economy
-            economy = self.inventory_view.cog.get_economy()
-            if economy:
-                economy.update_balance(interaction.user.id, self.total_price)
-                
-            # Delete Fish
-            cursor = conn.cursor()
-            if self.rarity:
-                cursor.execute('DELETE FROM fish_inventory WHERE user_id = %s AND rarity = %s', (interaction.user.id, self.rarity))
-            else:
-                cursor.execute('DELETE FROM fish_inventory WHERE user_id = %s', (interaction.user.id,))
-                
-            conn.commit()
-            
-            # Update Inventory View
-            self.inventory_view.all_rows = [] 
-            
-            # Re-fetch to see what's left
-            cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (interaction.user.id,))
-            self.inventory_view.all_rows = cursor.fetchall()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+            count, total_price, summary = await self.inventory_view.cog.sell_fish_bulk(interaction.user.id, self.rarity)
+        except Exception as e:
+            print(f"❌ Sell all failed for {interaction.user.id}: {e}")
+            await interaction.edit_original_response(content="❌ Gagal menjual ikan, coba lagi!", view=None)
+            return
+
+        if count == 0:
+            await interaction.edit_original_response(content="❌ Tidak ada ikan yang bisa dijual!", view=None)
+            return
         
+        # Back to the first page of whatever is left
         self.inventory_view.page = 0
-        self.inventory_view.max_pages = (len(self.inventory_view.all_rows) - 1) // self.inventory_view.items_per_page + 1
-        if self.inventory_view.max_pages < 1: self.inventory_view.max_pages = 1
-        
-        self.inventory_view.update_components()
+        self.inventory_view.anchors = [None]
+        self.inventory_view.set_summary(summary)
+        await self.inventory_view.load_page()
         
         try:
             await self.inventory_view.original_interaction.edit_original_response(embed=self.inventory_view.build_embed(), view=self.inventory_view)
@@ -1826,7 +1994,7 @@ class ConfirmSellAllView(discord.ui.View):
             pass
         
         rarity_text = f" ({self.rarity})" if self.rarity else " SEMUA"
-        await interaction.edit_original_response(content=f"✅ Berhasil menjual **{self.count}** ikan{rarity_text} seharga **{self.total_price:,}** koin!", view=None)
+        await interaction.edit_original_response(content=f"✅ Berhasil menjual **{count}** ikan{rarity_text} seharga **{total_price:,}** koin!", view=None)
 
     @discord.ui.button(label="❌ Batal", style=discord.ButtonStyle.secondary)
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -1941,19 +2109,7 @@ class TradeView(discord.ui.View):
         await interaction.response.send_message("Select fish to REMOVE from trade:", view=view, ephemeral=True)
 
     async def open_inventory_select(self, interaction: discord.Interaction, user):
-        conn = self.cog.get_conn()
-        if not conn:
-             await interaction.response.send_message("❌ Database Error", ephemeral=True)
-             return
-             
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (user.id,))
-            rows = cursor.fetchall()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+        rows = await self.cog.db.fetchall('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (user.id,))
         
         if not rows:
             await interaction.response.send_message("🎒 Your inventory is empty!", ephemeral=True)
@@ -1986,26 +2142,21 @@ class TradeView(discord.ui.View):
             await self.execute_trade(interaction)
 
     async def execute_trade(self, interaction):
-        conn = self.cog.get_conn()
-        if not conn:
-             await interaction.followup.send("❌ Database Error", ephemeral=True)
-             return
-             
-        try:
-            cursor = conn.cursor()
-            
-            # Swap Owner
-            for item in self.initiator_offer:
-                cursor.execute('UPDATE fish_inventory SET user_id = %s WHERE id = %s', (self.target.id, item['id']))
-                
-            for item in self.target_offer:
-                cursor.execute('UPDATE fish_inventory SET user_id = %s WHERE id = %s', (self.initiator.id, item['id']))
-                
-            conn.commit()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+        # Both sides swap in one transaction, or nothing moves
+        success = await self.cog.trade_fish(
+            self.initiator.id, [item['id'] for item in self.initiator_offer],
+            self.target.id, [item['id'] for item in self.target_offer]
+        )
+        
+        if not success:
+            self.clear_items()
+            embed = self.build_embed()
+            embed.title = "❌ Trade Failed"
+            embed.description = "Some fish in the offer are no longer owned by their trader. Nothing was exchanged."
+            embed.color = discord.Color.red()
+            await interaction.message.edit(embed=embed, view=None)
+            self.stop()
+            return
         
         self.clear_items()
         embed = self.build_embed()
@@ -2049,25 +2200,13 @@ class TradeSelectView(discord.ui.View):
         await interaction.response.defer(ephemeral=True)
         selected_ids = interaction.data["values"]
         
-        # Add to offer
-        conn = self.trade_view.cog.get_conn()
-        if not conn:
-             await interaction.followup.send("❌ Database Error", ephemeral=True)
-             return
-        
-        new_items = []
-        try:
-            cursor = conn.cursor()
-            for fid in selected_ids:
-                cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE id = %s', (fid,))
-                row = cursor.fetchone()
-                if row:
-                    item = {"id": row[0], "name": row[1], "rarity": row[2], "weight": row[3], "price": row[4]}
-                    new_items.append(item)
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+        # Add to offer (one query, only fish this user still owns)
+        marks = ", ".join(["%s"] * len(selected_ids))
+        rows = await self.trade_view.cog.db.fetchall(
+            f'SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s AND id IN ({marks})',
+            (self.user.id, *selected_ids)
+        )
+        new_items = [{"id": row[0], "name": row[1], "rarity": row[2], "weight": row[3], "price": row[4]} for row in rows]
         
         if self.user.id == self.trade_view.initiator.id:
             self.trade_view.initiator_offer.extend(new_items)
@@ -2201,14 +2340,15 @@ class FishShopView(discord.ui.View):
         else:
             self.add_item(ShopItemSelect(self.cog, self.user, row=1))
 
-    def build_embed(self):
+    async def build_embed(self):
         embed = discord.Embed(title="🏪 Fishing Shop", color=discord.Color.gold())
         
         if self.tab == "rods":
             embed.description = "Upgrade pancinganmu biar makin gacor!"
+            owned_rods = await self.cog.get_owned_rods(self.user.id)
             for rod, data in self.cog.rod_data.items():
                 if rod == "Common Rod": continue
-                owned = rod in self.cog.get_owned_rods(self.user.id)
+                owned = rod in owned_rods
                 status = "✅ Dimiliki" if owned else f"💰 {data['price']:,}"
                 
                 embed.add_field(
@@ -2242,7 +2382,7 @@ class FishShopView(discord.ui.View):
             
         # Balance Footer
         economy = self.cog.get_economy()
-        bal = economy.get_balance(self.user.id) if economy else 0
+        bal = await economy.get_balance(self.user.id) if economy else 0
         embed.set_footer(text=f"Saldo Anda: {bal:,} coins")
         
         return embed
@@ -2259,7 +2399,7 @@ class ShopTabButton(discord.ui.Button):
         
         view.tab = "rods" if self.custom_id == "tab_rods" else "items"
         view.update_buttons()
-        await interaction.response.edit_message(embed=view.build_embed(), view=view)
+        await interaction.response.edit_message(embed=await view.build_embed(), view=view)
 
 class ShopQuantityModal(discord.ui.Modal):
     """Modal untuk input quantity setiap item yang dipilih"""
@@ -2319,7 +2459,7 @@ class ShopQuantityModal(discord.ui.Modal):
         
         # Show confirmation view
         confirm_view = ShopConfirmView(self.cog, self.user, cart, self.shop_view)
-        embed = confirm_view.build_embed()
+        embed = await confirm_view.build_embed()
         await interaction.response.send_message(embed=embed, view=confirm_view, ephemeral=True)
 
 
@@ -2359,7 +2499,7 @@ class ShopConfirmView(discord.ui.View):
             total += self._get_item_price(item_name) * qty
         return total
     
-    def build_embed(self) -> discord.Embed:
+    async def build_embed(self) -> discord.Embed:
         embed = discord.Embed(
             title="🛒 Konfirmasi Pembelian",
             description="Apakah kamu yakin ingin membeli item berikut?",
@@ -2382,7 +2522,7 @@ class ShopConfirmView(discord.ui.View):
         
         # User balance
         economy = self.cog.get_economy()
-        bal = economy.get_balance(self.user.id) if economy else 0
+        bal = await economy.get_balance(self.user.id) if economy else 0
         embed.set_footer(text=f"Saldo Anda: {bal:,} coins")
         
         return embed
@@ -2399,23 +2539,23 @@ class ShopConfirmView(discord.ui.View):
             return
         
         total = self.calculate_total()
-        bal = economy.get_balance(self.user.id)
+        bal = await economy.get_balance(self.user.id)
         
         if bal < total:
             await interaction.response.send_message(f"❌ Duit lu kurang bos! Butuh {total:,} tapi saldo cuma {bal:,}", ephemeral=True)
             return
         
         # Deduct money
-        economy.update_balance(self.user.id, -total)
+        await economy.update_balance(self.user.id, -total, reason="fish_shop")
         
         # Add items to inventory
         purchased_text = ""
         for item_name, qty in self.cart.items():
             emoji = self._get_item_emoji(item_name)
             if self._is_buff_item(item_name):
-                self.cog.add_item(self.user.id, item_name, qty)
+                await self.cog.add_item(self.user.id, item_name, qty)
             else:
-                self.cog.add_material(self.user.id, item_name, qty)
+                await self.cog.add_material(self.user.id, item_name, qty)
             purchased_text += f"{emoji} **{item_name}** x{qty}\n"
         
         # Success embed
@@ -2425,7 +2565,7 @@ class ShopConfirmView(discord.ui.View):
             color=discord.Color.green()
         )
         
-        new_bal = economy.get_balance(self.user.id)
+        new_bal = await economy.get_balance(self.user.id)
         success_embed.set_footer(text=f"Saldo sekarang: {new_bal:,} coins")
         
         await interaction.response.edit_message(embed=success_embed, view=None)
@@ -2433,7 +2573,7 @@ class ShopConfirmView(discord.ui.View):
         # Refresh shop view
         try:
             if self.shop_view and hasattr(self.shop_view, 'message'):
-                await self.shop_view.message.edit(embed=self.shop_view.build_embed(), view=self.shop_view)
+                await self.shop_view.message.edit(embed=await self.shop_view.build_embed(), view=self.shop_view)
         except:
             pass
     
@@ -2501,7 +2641,7 @@ class ShopRodSelect(discord.ui.Select):
         price = rod_data["price"]
         
         # Check if owned
-        owned = self.cog.get_owned_rods(interaction.user.id)
+        owned = await self.cog.get_owned_rods(interaction.user.id)
         if rod_name in owned:
             return await interaction.response.send_message("❌ You already own this rod!", ephemeral=True)
             
@@ -2509,38 +2649,30 @@ class ShopRodSelect(discord.ui.Select):
         if not economy:
             return await interaction.response.send_message("❌ Economy system not loaded.", ephemeral=True)
             
-        bal = economy.get_balance(interaction.user.id)
+        bal = await economy.get_balance(interaction.user.id)
         if bal < price:
              return await interaction.response.send_message("❌ Insufficient funds!", ephemeral=True)
              
-        economy.update_balance(interaction.user.id, -price)
+        await economy.update_balance(interaction.user.id, -price, reason="fish_shop")
         
-        conn = self.cog.get_conn()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("INSERT INTO fishing_rods (user_id, rod_name) VALUES (%s, %s)", (interaction.user.id, rod_name))
-                conn.commit()
-            finally:
-                 if conn.is_connected():
-                    cursor.close()
-                    conn.close()
+        await self.cog.db.execute("INSERT INTO fishing_rods (user_id, rod_name) VALUES (%s, %s)", (interaction.user.id, rod_name))
+        self.cog.invalidate_state(interaction.user.id)
         
         await interaction.response.send_message(f"✅ Successfully bought **{rod_name}**!", ephemeral=True)
-        await interaction.message.edit(embed=self.view.build_embed(), view=self.view)
+        await interaction.message.edit(embed=await self.view.build_embed(), view=self.view)
 
 class RodEquipView(discord.ui.View):
     def __init__(self, cog, user):
         super().__init__(timeout=60)
         self.cog = cog
         self.user = user
-        self.update_components()
+        # Components need DB reads; caller awaits update_components() before sending
 
-    def update_components(self):
+    async def update_components(self):
         self.clear_items()
         
-        owned_rods = self.cog.get_owned_rods(self.user.id)
-        equipped = self.cog.get_equipped_rod(self.user.id)
+        owned_rods = await self.cog.get_owned_rods(self.user.id)
+        equipped = await self.cog.get_equipped_rod(self.user.id)
         
         options = []
         for rod_name in owned_rods:
@@ -2561,9 +2693,9 @@ class RodEquipView(discord.ui.View):
         select.callback = self.callback
         self.add_item(select)
 
-    def build_embed(self):
-        equipped = self.cog.get_equipped_rod(self.user.id)
-        level = self.cog.get_rod_level(self.user.id, equipped)
+    async def build_embed(self):
+        equipped = await self.cog.get_equipped_rod(self.user.id)
+        level = await self.cog.get_rod_level(self.user.id, equipped)
         stats = self.cog.rod_data.get(equipped, self.cog.rod_data["Common Rod"])
         
         # Calculate Stats with Level
@@ -2587,21 +2719,13 @@ class RodEquipView(discord.ui.View):
             
         rod_name = interaction.data["values"][0]
         
-        conn = self.cog.get_conn()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute('INSERT INTO fishing_profile (user_id, equipped_rod) VALUES (%s, %s) ON DUPLICATE KEY UPDATE equipped_rod = %s', (self.user.id, rod_name, rod_name))
-                conn.commit()
-            finally:
-                 if conn.is_connected():
-                    cursor.close()
-                    conn.close()
+        await self.cog.db.execute('INSERT INTO fishing_profile (user_id, equipped_rod) VALUES (%s, %s) ON DUPLICATE KEY UPDATE equipped_rod = %s', (self.user.id, rod_name, rod_name))
+        self.cog.invalidate_state(self.user.id)
         
         await interaction.response.send_message(f"✅ Equipped **{rod_name}**!", ephemeral=True)
         
-        self.update_components()
-        await interaction.message.edit(embed=self.build_embed(), view=self)
+        await self.update_components()
+        await interaction.message.edit(embed=await self.build_embed(), view=self)
 
 class FishLeaderboardView(discord.ui.View):
     def __init__(self, cog, user):
@@ -2623,14 +2747,14 @@ class FishLeaderboardView(discord.ui.View):
         select.callback = self.callback
         self.add_item(select)
 
-    def build_embed(self):
+    async def build_embed(self):
         if self.mode == "weight":
             title = "🏆 Fishing Leaderboard - Heaviest Fish"
-            data = self.cog.get_weight_leaderboard()
+            data = await self.cog.get_weight_leaderboard()
             # data: [(user_id, fish_name, weight, rarity), ...]
         else:
             title = "💎 Fishing Leaderboard - Networth"
-            data = self.cog.get_networth_leaderboard()
+            data = await self.cog.get_networth_leaderboard()
             # data: [(user_id, total_value), ...]
             
         embed = discord.Embed(title=title, color=discord.Color.gold())
@@ -2675,16 +2799,15 @@ class FishingForgeView(discord.ui.View):
         self.use_lucky_charm = False
         self.last_result = None # Store result message
         self.last_status = None # Store result status (success/failure) for color
-        
-        self.update_components()
+        # Components need DB reads; send_initial_message awaits update_components()
 
-    def update_components(self):
+    async def update_components(self):
         self.clear_items()
         
         # Select Rod
         options = []
         for rod_name in self.owned_rods:
-            level = self.cog.get_rod_level(self.original_interaction.user.id, rod_name)
+            level = await self.cog.get_rod_level(self.original_interaction.user.id, rod_name)
             
             # Safe access to rod data
             rod_data = self.cog.rod_data.get(rod_name, {})
@@ -2707,7 +2830,7 @@ class FishingForgeView(discord.ui.View):
         
         # Forge Button & Lucky Charm Toggle
         if self.selected_rod:
-            level = self.cog.get_rod_level(self.original_interaction.user.id, self.selected_rod)
+            level = await self.cog.get_rod_level(self.original_interaction.user.id, self.selected_rod)
             if level < 10:
                 # Lucky Charm Toggle
                 charm_label = "🍀 Lucky Charm: ON" if self.use_lucky_charm else "🍀 Lucky Charm: OFF"
@@ -2722,16 +2845,17 @@ class FishingForgeView(discord.ui.View):
 
     async def charm_callback(self, interaction: discord.Interaction):
         # Check if user has charm
-        user_charm = self.cog.get_material(interaction.user.id, "Lucky Charm")
+        user_charm = await self.cog.get_material(interaction.user.id, "Lucky Charm")
         if not self.use_lucky_charm and user_charm <= 0:
             await interaction.response.send_message("❌ Kamu tidak punya Lucky Charm! Beli di shop.", ephemeral=True)
             return
             
         self.use_lucky_charm = not self.use_lucky_charm
-        self.update_components()
-        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+        await self.update_components()
+        await interaction.response.edit_message(embed=await self.build_embed(), view=self)
 
     async def send_initial_message(self):
+        await self.update_components()
         embed = discord.Embed(title="⚒️ Blacksmith Forge", description="Pilih pancingan yang ingin kamu upgrade.", color=discord.Color.dark_grey())
         await self.original_interaction.followup.send(embed=embed, view=self, ephemeral=True)
 
@@ -2739,14 +2863,14 @@ class FishingForgeView(discord.ui.View):
         self.selected_rod = interaction.data["values"][0]
         self.last_result = None # Reset result on new selection
         self.last_status = None # Reset status
-        self.update_components()
-        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+        await self.update_components()
+        await interaction.response.edit_message(embed=await self.build_embed(), view=self)
 
-    def build_embed(self):
+    async def build_embed(self):
         if not self.selected_rod:
             return discord.Embed(title="⚒️ Blacksmith Forge", description="Pilih pancingan yang ingin kamu upgrade.", color=discord.Color.dark_grey())
             
-        level = self.cog.get_rod_level(self.original_interaction.user.id, self.selected_rod)
+        level = await self.cog.get_rod_level(self.original_interaction.user.id, self.selected_rod)
         
         # Determine Color
         color = discord.Color.dark_red()
@@ -2804,11 +2928,11 @@ class FishingForgeView(discord.ui.View):
         embed.add_field(name="📦 Material Dibutuhkan", value="\n".join(materials) if materials else "None", inline=False)
         
         # User Resources
-        user_scrap = self.cog.get_material(self.original_interaction.user.id, "Scrap Metal")
-        user_pearl = self.cog.get_material(self.original_interaction.user.id, "Magic Pearl")
-        user_charm = self.cog.get_material(self.original_interaction.user.id, "Lucky Charm")
+        user_scrap = await self.cog.get_material(self.original_interaction.user.id, "Scrap Metal")
+        user_pearl = await self.cog.get_material(self.original_interaction.user.id, "Magic Pearl")
+        user_charm = await self.cog.get_material(self.original_interaction.user.id, "Lucky Charm")
         economy = self.cog.get_economy()
-        user_bal = economy.get_balance(self.original_interaction.user.id) if economy else 0
+        user_bal = await economy.get_balance(self.original_interaction.user.id) if economy else 0
         
         embed.set_footer(text=f"Resources: 💰{user_bal:,} | 🔩{user_scrap} | 🔮{user_pearl} | 🍀{user_charm}")
         
@@ -2823,96 +2947,23 @@ class FishingForgeView(discord.ui.View):
                 await interaction.response.send_message("❌ Pilih rod terlebih dahulu!", ephemeral=True)
                 return
 
-            level = self.cog.get_rod_level(user_id, rod_name)
-            next_level = level + 1
-            
-            # Validate Forge Data
-            if rod_name not in self.cog.forge_data or next_level not in self.cog.forge_data[rod_name]["levels"]:
-                 await interaction.response.send_message("❌ Data forge tidak ditemukan atau level sudah maksimal!", ephemeral=True)
-                 return
-                 
-            forge_info = self.cog.forge_data[rod_name]["levels"][next_level]
-            
-            cost = forge_info["cost"]
-            scrap = forge_info["scrap"]
-            pearl = forge_info["pearl"]
-            rate = forge_info["rate"]
-            risk = forge_info["risk"]
-            
-            # Apply Lucky Charm Boost
-            if self.use_lucky_charm:
-                rate += 50
-                if rate > 100: rate = 100
-            
-            # Check Resources
-            economy = self.cog.get_economy()
-            if not economy:
-                await interaction.response.send_message("❌ Economy Error.", ephemeral=True)
-                return
-                
-            bal = economy.get_balance(user_id)
-            user_scrap = self.cog.get_material(user_id, "Scrap Metal")
-            user_pearl = self.cog.get_material(user_id, "Magic Pearl")
-            user_charm = self.cog.get_material(user_id, "Lucky Charm")
-            
-            if bal < cost:
-                await interaction.response.send_message(f"❌ Uang tidak cukup! Butuh {cost:,} coins.", ephemeral=True)
+            # Check, pay and roll in one transaction
+            error, success, level, new_level, risk = await self.cog.forge_rod(user_id, rod_name, self.use_lucky_charm)
+            if error:
+                await interaction.response.send_message(error, ephemeral=True)
                 return
-            if user_scrap < scrap:
-                await interaction.response.send_message(f"❌ Scrap Metal kurang! Butuh {scrap}x.", ephemeral=True)
-                return
-            if user_pearl < pearl:
-                await interaction.response.send_message(f"❌ Magic Pearl kurang! Butuh {pearl}x.", ephemeral=True)
-                return
-            if self.use_lucky_charm and user_charm < 1:
-                 await interaction.response.send_message("❌ Lucky Charm kurang!", ephemeral=True)
-                 return
-                
-            # Deduct Resources
-            economy.update_balance(user_id, -cost)
-            self.cog.add_material(user_id, "Scrap Metal", -scrap)
-            self.cog.add_material(user_id, "Magic Pearl", -pearl)
-            if self.use_lucky_charm:
-                self.cog.add_material(user_id, "Lucky Charm", -1)
-            
-            # Roll RNG
-            roll = random.randint(1, 100)
-            success = roll <= rate
-            
-            print(f"[DEBUG] Forge: User={interaction.user.name}, Rod={rod_name}, Level={level}->{next_level}, Rate={rate}, Roll={roll}, Success={success}")
             
             if success:
-                self.cog.update_rod_level(user_id, rod_name, next_level)
-                self.last_result = f"🔥 **SUKSES!** {rod_name} naik ke level **+{next_level}**!"
+                self.last_result = f"🔥 **SUKSES!** {rod_name} naik ke level **+{new_level}**!"
                 self.last_status = "success"
             else:
                 # Failure Logic
                 result_text = "Gagal! Level tetap."
                 if risk == "downgrade":
-                    new_level = max(0, level - 1)
-                    self.cog.update_rod_level(user_id, rod_name, new_level)
                     result_text = f"Gagal! Level turun menjadi **+{new_level}**."
                 elif risk == "reset":
-                    self.cog.update_rod_level(user_id, rod_name, 0)
                     result_text = "Gagal! Level **RESET** ke +0."
                 elif risk == "destroy":
-                    conn = self.cog.get_conn()
-                    if conn:
-                        try:
-                            cursor = conn.cursor()
-                            cursor.execute('DELETE FROM fishing_rods WHERE user_id = %s AND rod_name = %s', (user_id, rod_name))
-                            
-                            # Check if equipped, if so, equip Common Rod
-                            equipped = self.cog.get_equipped_rod(user_id)
-                            if equipped == rod_name:
-                                cursor.execute('UPDATE fishing_profile SET equipped_rod = %s WHERE user_id = %s', ("Common Rod", user_id))
-                                
-                            conn.commit()
-                        finally:
-                             if conn.is_connected():
-                                cursor.close()
-                                conn.close()
-                    
                     result_text = "💥 **GAGAL TOTAL!** Rod **HANCUR** berkeping-keping! 💀"
                     self.selected_rod = None # Reset selection
                     
@@ -2924,8 +2975,8 @@ class FishingForgeView(discord.ui.View):
                 self.use_lucky_charm = False
                 
             # Refresh View
-            self.update_components()
-            await interaction.response.edit_message(embed=self.build_embed(), view=self)
+            await self.update_components()
+            await interaction.response.edit_message(embed=await self.build_embed(), view=self)
             
         except Exception as e:
             print(f"[ERROR] Forge Callback: {e}")
@@ -2949,35 +3000,18 @@ class ConfirmSalvageView(discord.ui.View):
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         
-        conn = self.salvage_view.cog.get_conn()
-        if not conn:
-             await interaction.followup.send("❌ Database Error", ephemeral=True)
-             return
-             
+        db = self.salvage_view.cog.db
+        
+        # Delete and credit scrap in one transaction
         try:
-            cursor = conn.cursor()
-            
-            # Execute Deletion
-            if self.selected_ids:
-                for fid in self.selected_ids:
-                     cursor.execute('DELETE FROM fish_inventory WHERE id = %s', (fid,))
-            elif self.rarity:
-                cursor.execute('DELETE FROM fish_inventory WHERE user_id = %s AND rarity = %s', (self.salvage_view.original_interaction.user.id, self.rarity))
-            else:
-                # Salvage All
-                cursor.execute('DELETE FROM fish_inventory WHERE user_id = %s', (self.salvage_view.original_interaction.user.id,))
-                 
-            conn.commit()
-            
-            self.salvage_view.cog.add_material(interaction.user.id, "Scrap Metal", self.total_scrap)
-            
-            # Update Parent View
-            cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (self.salvage_view.original_interaction.user.id,))
-            self.salvage_view.all_rows = cursor.fetchall()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+            count, total_scrap = await self.salvage_view.cog.salvage_fish(interaction.user.id, self.selected_ids, self.rarity)
+        except Exception as e:
+            print(f"❌ Salvage failed for {interaction.user.id}: {e}")
+            await interaction.edit_original_response(content="❌ Gagal men-salvage ikan, coba lagi!", view=None)
+            return
+        
+        # Update Parent View
+        self.salvage_view.all_rows = await db.fetchall('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (self.salvage_view.original_interaction.user.id,))
         
         self.salvage_view.max_pages = (len(self.salvage_view.all_rows) - 1) // self.salvage_view.items_per_page + 1
         if self.salvage_view.page >= self.salvage_view.max_pages: self.salvage_view.page = max(0, self.salvage_view.max_pages - 1)
@@ -2992,7 +3026,7 @@ class ConfirmSalvageView(discord.ui.View):
         rarity_text = f" ({self.rarity})" if self.rarity else ""
         if not self.rarity and not self.selected_ids: rarity_text = " SEMUA"
         
-        await interaction.edit_original_response(content=f"✅ Berhasil men-salvage **{self.count}** ikan{rarity_text} menjadi **{self.total_scrap}x Scrap Metal** 🔩!", view=None)
+        await interaction.edit_original_response(content=f"✅ Berhasil men-salvage **{count}** ikan{rarity_text} menjadi **{total_scrap}x Scrap Metal** 🔩!", view=None)
 
     @discord.ui.button(label="❌ Batal", style=discord.ButtonStyle.secondary)
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -3096,11 +3130,6 @@ class FishingSalvageView(discord.ui.View):
     async def select_callback(self, interaction: discord.Interaction):
         selected_ids = interaction.data["values"]
         
-        conn = self.cog.get_conn()
-        if not conn:
-             await interaction.response.send_message("❌ Database Error", ephemeral=True)
-             return
-        
         # Handle Select All
         if "select_all" in selected_ids:
             start = self.page * self.items_per_page
@@ -3120,39 +3149,15 @@ class FishingSalvageView(discord.ui.View):
                 view=confirm_view,
                 ephemeral=True
             )
-            if conn.is_connected(): conn.close()
             return
 
-        total_scrap = 0
-        deleted_count = 0
+        # Only fish the user still owns are salvaged; scrap is credited in the same transaction
+        deleted_count, total_scrap = await self.cog.salvage_fish(self.original_interaction.user.id, selected_ids)
         
-        try:
-            cursor = conn.cursor()
-            
-            for fid in selected_ids:
-                # Get fish details to verify ownership (paranoid check)
-                cursor.execute('SELECT id FROM fish_inventory WHERE id = %s AND user_id = %s', (fid, self.original_interaction.user.id))
-                if cursor.fetchone():
-                    # Delete fish
-                    cursor.execute('DELETE FROM fish_inventory WHERE id = %s', (fid,))
-                    
-                    # Calculate Scrap (Random 1-3)
-                    scrap = random.randint(1, 3)
-                    total_scrap += scrap
-                    deleted_count += 1
-            
-            conn.commit()
-            self.cog.add_material(self.original_interaction.user.id, "Scrap Metal", total_scrap)
-            
-            await interaction.response.send_message(f"✅ Berhasil men-salvage **{deleted_count}** ikan menjadi **{total_scrap}x Scrap Metal** 🔩!", ephemeral=True)
-            
-            # Refresh data
-            cursor.execute('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (self.original_interaction.user.id,))
-            self.all_rows = cursor.fetchall()
-        finally:
-             if conn.is_connected():
-                cursor.close()
-                conn.close()
+        await interaction.response.send_message(f"✅ Berhasil men-salvage **{deleted_count}** ikan menjadi **{total_scrap}x Scrap Metal** 🔩!", ephemeral=True)
+        
+        # Refresh data
+        self.all_rows = await self.cog.db.fetchall('SELECT id, fish_name, rarity, weight, price FROM fish_inventory WHERE user_id = %s ORDER BY id DESC', (self.original_interaction.user.id,))
 
         self.max_pages = (len(self.all_rows) - 1) // self.items_per_page + 1
         if self.page >= self.max_pages: self.page = max(0, self.max_pages - 1)
@@ -3179,12 +3184,7 @@ class FishingSalvageView(discord.ui.View):
             count = 0
             for row in self.all_rows:
                 if row[2] == rarity:
-                    r_scrap = 1
-                    if rarity == "Uncommon": r_scrap = 2
-                    elif rarity == "Rare": r_scrap = 5
-                    elif rarity == "Epic": r_scrap = 10
-                    elif rarity == "Legendary": r_scrap = 20
-                    total_scrap += r_scrap
+                    total_scrap += self.cog.salvage_scrap.get(rarity, 1)
                     count += 1
             
             if count == 0:
@@ -3199,13 +3199,7 @@ class FishingSalvageView(discord.ui.View):
         count = len(self.all_rows)
         
         for row in self.all_rows:
-            rarity = row[2]
-            scrap = 1
-            if rarity == "Uncommon": scrap = 2
-            elif rarity == "Rare": scrap = 5
-            elif rarity == "Epic": scrap = 10
-            elif rarity == "Legendary": scrap = 20
-            total_scrap += scrap
+            total_scrap += self.cog.salvage_scrap.get(row[2], 1)
             
         if count == 0:
             await interaction.response.send_message("❌ Inventory kamu kosong!", ephemeral=True)
@@ -1,7 +1,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
+from utils.components_v2 import send_components_v2, UPDATE_MESSAGE
 
 
 def parse_emoji(raw: str):
@@ -27,6 +27,12 @@ class Help(commands.Cog):
     def __init__(self, client: commands.Bot):
         self.client = client
 
+    async def cog_load(self):
+        self.client.router.add_prefix("help_cog_", self.on_help_component, owner=self)
+
+    def cog_unload(self):
+        self.client.router.remove_owner(self)
+
     @commands.Cog.listener()
     async def on_ready(self):
         print('✅ Help Cog is ready')
@@ -111,22 +117,14 @@ class Help(commands.Cog):
         }
 
         # Send via API
-        headers = {"Authorization": f"Bot {self.client.http.token}", "Content-Type": "application/json"}
-        url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-
-        async with aiohttp.ClientSession() as session:
-            await session.post(url, json={"type": 4, "data": payload}, headers=headers)
+        await send_components_v2(interaction, payload, label="Help")
 
     @app_commands.command(name="help", description="Display bot command list")
     async def help(self, interaction: discord.Interaction):
         await self.send_layoutview_message(interaction)
 
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
+    async def on_help_component(self, interaction: discord.Interaction):
         """Handle button clicks from Container"""
-        if interaction.type != discord.InteractionType.component:
-            return
-        
         custom_id = interaction.data.get("custom_id", "")
         
         if custom_id.startswith("help_cog_"):
@@ -271,11 +269,7 @@ class Help(commands.Cog):
                     "components": [{"type": 17, "spoiler": False, "components": components_list}]
                 }
 
-                headers = {"Authorization": f"Bot {self.client.http.token}", "Content-Type": "application/json"}
-                url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-
-                async with aiohttp.ClientSession() as session:
-                    await session.post(url, json={"type": 7, "data": payload}, headers=headers)
+                await send_components_v2(interaction, payload, UPDATE_MESSAGE, label="Help")
             else:
                 await interaction.response.send_message(f"❌ No commands available for '{cog_name}' category!", ephemeral=True)
 
@@ -2,7 +2,6 @@ import discord
 from discord.ext import commands
 import json
 from datetime import datetime
-from utils.database import get_db_connection
 
 
 class Logging(commands.Cog):
@@ -16,21 +15,14 @@ class Logging(commands.Cog):
     async def on_ready(self):
         print('✅ Logging Cog is ready')
 
-    def get_settings(self, guild_id: int) -> dict | None:
+    async def get_settings(self, guild_id: int) -> dict | None:
         """Get logging settings from database"""
         try:
-            conn = get_db_connection()
-            if not conn:
-                return None
-            
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(
+            row = await self.bot.db.fetchone(
                 "SELECT * FROM logging_settings WHERE guild_id = %s",
-                (str(guild_id),)
+                (str(guild_id),),
+                dictionary=True
             )
-            row = cursor.fetchone()
-            cursor.close()
-            conn.close()
             
             if row:
                 return {
@@ -90,7 +82,7 @@ class Logging(commands.Cog):
     async def send_log(self, guild: discord.Guild, category: str, log_type: str, embed: discord.Embed, 
                        user: discord.Member = None, channel: discord.TextChannel = None):
         """Send a log message to the appropriate channel"""
-        settings = self.get_settings(guild.id)
+        settings = await self.get_settings(guild.id)
         if not settings:
             return
         
@@ -869,7 +861,7 @@ class Logging(commands.Cog):
     
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-        settings = self.get_settings(member.guild.id)
+        settings = await self.get_settings(member.guild.id)
         if settings and settings.get('ignore_voice_users') and self.should_ignore(settings, member):
             return
         
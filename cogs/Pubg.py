@@ -2,7 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from utils.pubg_api import get_pubg_stats, get_last_match
-import aiohttp
+from utils.components_v2 import send_components_v2, edit_components_v2, DEFERRED_UPDATE
 import json
 import asyncio
 
@@ -10,6 +10,14 @@ class PubgStats(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        self.bot.router.add_exact("pubg_delete", self.on_pubg_component, owner=self)
+        self.bot.router.add_prefix("pubg_refresh:", self.on_pubg_component, owner=self)
+        self.bot.router.add_prefix("pubg_tab:", self.on_pubg_component, owner=self)
+
+    def cog_unload(self):
+        self.bot.router.remove_owner(self)
+
     def build_match_payload(self, match: dict = None, loading: bool = False):
         """Builds the raw JSON payload for the match details container"""
         
@@ -214,30 +222,14 @@ class PubgStats(commands.Cog):
     async def send_initial_loading(self, interaction: discord.Interaction):
         """Sends the initial 'Loading' response (Type 4)"""
         payload = self.build_pubg_payload(loading=True)
-        
-        url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
-        async with aiohttp.ClientSession() as session:
-            callback_payload = {"type": 4, "data": payload}
-            async with session.post(url, json=callback_payload, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error sending loading state: {resp.status} {await resp.text()}")
-                    return False
-        return True
+        return await send_components_v2(interaction, payload, label="PUBG loading")
 
     async def update_pubg_message(self, interaction: discord.Interaction, stats: dict, tab: str = "overview"):
         """Updates the original message via Webhook (PATCH)"""
         payload = self.build_pubg_payload(stats=stats, loading=False, tab=tab)
         
         # Use Webhook endpoint to edit the original message
-        url = f"https://discord.com/api/v10/webhooks/{self.bot.user.id}/{interaction.token}/messages/@original"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.patch(url, json=payload, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error updating PUBG message: {resp.status} {await resp.text()}")
+        await edit_components_v2(interaction, payload, label="PUBG")
 
     @app_commands.command(name="pubg", description="Cek stats PUBG pemain (Components V2)")
     @app_commands.describe(username="Username PUBG", platform="Platform (steam, kakao, xbox, psn)")
@@ -256,10 +248,7 @@ class PubgStats(commands.Cog):
                     "content": "❌ Pemain tidak ditemukan atau API Key salah.",
                     "components": [] # Clear components
                 }
-                url = f"https://discord.com/api/v10/webhooks/{self.bot.user.id}/{interaction.token}/messages/@original"
-                headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-                async with aiohttp.ClientSession() as session:
-                    await session.patch(url, json=error_payload, headers=headers)
+                await edit_components_v2(interaction, error_payload, label="PUBG")
                 return
 
             # 3. Update with Real Stats (Default Tab: Overview)
@@ -268,12 +257,8 @@ class PubgStats(commands.Cog):
         except Exception as e:
             print(f"Error PUBG: {e}")
 
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
+    async def on_pubg_component(self, interaction: discord.Interaction):
         """Handle button clicks for PUBG components"""
-        if interaction.type != discord.InteractionType.component:
-            return
-            
         custom_id = interaction.data.get("custom_id", "")
         
         if custom_id == "pubg_delete":
@@ -284,10 +269,7 @@ class PubgStats(commands.Cog):
                 _, username, platform = custom_id.split(":")
                 
                 # Defer Update (Type 6)
-                url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-                headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-                async with aiohttp.ClientSession() as session:
-                    await session.post(url, json={"type": 6}, headers=headers)
+                await send_components_v2(interaction, response_type=DEFERRED_UPDATE, label="PUBG")
                 
                 # Fetch and Edit
                 stats = await get_pubg_stats(username, platform, force_refresh=True)
@@ -303,10 +285,7 @@ class PubgStats(commands.Cog):
                 _, tab_mode, username, platform = custom_id.split(":")
                 
                 # Defer Update (Type 6)
-                url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-                headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-                async with aiohttp.ClientSession() as session:
-                    await session.post(url, json={"type": 6}, headers=headers)
+                await send_components_v2(interaction, response_type=DEFERRED_UPDATE, label="PUBG")
 
                 # Fetch (Cached) and Edit with new Tab
                 stats = await get_pubg_stats(username, platform)
@@ -321,32 +300,24 @@ class PubgStats(commands.Cog):
     async def pubg_match(self, interaction: discord.Interaction, username: str, platform: str = "steam"):
         # 1. Send Loading State
         payload = self.build_match_payload(loading=True)
-        url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
-        async with aiohttp.ClientSession() as session:
-            await session.post(url, json={"type": 4, "data": payload}, headers=headers)
-            
-            # 2. Fetch Match Data
-            match_data = await get_last_match(username, platform)
+        await send_components_v2(interaction, payload, label="PUBG match")
             
-            webhook_url = f"https://discord.com/api/v10/webhooks/{self.bot.user.id}/{interaction.token}/messages/@original"
+        # 2. Fetch Match Data
+        match_data = await get_last_match(username, platform)
             
-            if not match_data:
-                error_payload = {
-                    "content": "❌ Match tidak ditemukan atau API Key salah.",
-                    "components": []
-                }
-                await session.patch(webhook_url, json=error_payload, headers=headers)
-                return
+        if not match_data:
+            error_payload = {
+                "content": "❌ Match tidak ditemukan atau API Key salah.",
+                "components": []
+            }
+            await edit_components_v2(interaction, error_payload, label="PUBG match")
+            return
 
-            # 3. Update with Match Details
-            final_payload = self.build_match_payload(match=match_data, loading=False)
-            async with session.patch(webhook_url, json=final_payload, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error updating match message: {resp.status} {await resp.text()}")
-                    # Fallback: Send error message to user
-                    await session.patch(webhook_url, json={"content": f"❌ Error: {resp.status} - Invalid Payload"}, headers=headers)
+        # 3. Update with Match Details
+        final_payload = self.build_match_payload(match=match_data, loading=False)
+        if not await edit_components_v2(interaction, final_payload, label="PUBG match"):
+            # Fallback: Send error message to user
+            await edit_components_v2(interaction, {"content": "❌ Error: Invalid Payload"}, label="PUBG match")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(PubgStats(bot))
@@ -6,7 +6,6 @@ from discord.ui import Button, View
 import asyncio
 import random
 from typing import Dict, Optional, List
-from utils.database import get_db_connection
 import time
 
 class RPSGame:
@@ -145,8 +144,8 @@ class PostGameView(View):
         if self.game.bet > 0:
             economy = self.cog.get_economy()
             if economy:
-                p1_bal = economy.get_balance(self.game.player1.id)
-                p2_bal = economy.get_balance(self.game.player2.id)
+                p1_bal = await economy.get_balance(self.game.player1.id)
+                p2_bal = await economy.get_balance(self.game.player2.id)
                 
                 if p1_bal < self.game.bet or p2_bal < self.game.bet:
                     await interaction.response.send_message("❌ Salah satu pemain tidak memiliki cukup saldo untuk main lagi!", ephemeral=True)
@@ -183,18 +182,14 @@ class RPS(commands.Cog):
     
     def __init__(self, client):
         self.client = client
+        self.db = client.db
         self.active_games: Dict[int, RPSGame] = {}
         # self.conn = sqlite3.connect('database.db') # Replaced with connection pooling
-        self._init_db()
         self.emojis = {"Batu": "✊", "Gunting": "✌️", "Kertas": "📰"}
 
     def get_economy(self):
         return self.client.get_cog('Economy')
 
-    def _init_db(self):
-        """Initialize provided via migration"""
-        pass
-
     def cog_unload(self):
         pass
 
@@ -202,53 +197,39 @@ class RPS(commands.Cog):
     async def on_ready(self):
         print(f'✅ RPS Cog is ready')
 
-    def get_player_stats(self, user_id: int) -> Dict[str, int]:
+    async def get_player_stats(self, user_id: int) -> Dict[str, int]:
         """Get player statistics from database"""
-        conn = get_db_connection()
-        if not conn: return {'total_games':0, 'games_won':0, 'games_lost':0, 'rounds_won':0, 'rounds_lost':0, 'rounds_tied':0}
-        
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT total_games, games_won, games_lost, rounds_won, rounds_lost, rounds_tied
-                FROM rps_stats WHERE user_id = %s
+        result = await self.db.fetchone('''
+            SELECT total_games, games_won, games_lost, rounds_won, rounds_lost, rounds_tied
+            FROM rps_stats WHERE user_id = %s
+        ''', (user_id,))
+        
+        if result:
+            return {
+                'total_games': result[0],
+                'games_won': result[1],
+                'games_lost': result[2],
+                'rounds_won': result[3],
+                'rounds_lost': result[4],
+                'rounds_tied': result[5]
+            }
+        else:
+            # Create new player entry
+            await self.db.execute('''
+                INSERT IGNORE INTO rps_stats (user_id) VALUES (%s)
             ''', (user_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                return {
-                    'total_games': result[0],
-                    'games_won': result[1],
-                    'games_lost': result[2],
-                    'rounds_won': result[3],
-                    'rounds_lost': result[4],
-                    'rounds_tied': result[5]
-                }
-            else:
-                # Create new player entry
-                cursor.execute('''
-                    INSERT INTO rps_stats (user_id) VALUES (%s)
-                ''', (user_id,))
-                conn.commit()
-                return {
-                    'total_games': 0,
-                    'games_won': 0,
-                    'games_lost': 0,
-                    'rounds_won': 0,
-                    'rounds_lost': 0,
-                    'rounds_tied': 0
-                }
-        finally:
-            conn.close()
-
-    def update_game_stats(self, game: RPSGame, session_winner: discord.Member):
+            return {
+                'total_games': 0,
+                'games_won': 0,
+                'games_lost': 0,
+                'rounds_won': 0,
+                'rounds_lost': 0,
+                'rounds_tied': 0
+            }
+
+    async def update_game_stats(self, game: RPSGame, session_winner: discord.Member):
         """Update game statistics after a session ends"""
-        conn = get_db_connection()
-        if not conn: return
-        
-        try:
-            cursor = conn.cursor()
-            
+        async with self.db.transaction() as cursor:
             player1, player2 = game.player1, game.player2
             winner_id = session_winner.id if session_winner else None
             loser_id = player2.id if session_winner == player1 else player1.id if session_winner else None
@@ -256,7 +237,7 @@ class RPS(commands.Cog):
             # Update total games and wins/losses
             if winner_id and loser_id:
                 # Winner stats
-                cursor.execute('''
+                await cursor.execute('''
                     UPDATE rps_stats 
                     SET total_games = total_games + 1, 
                         games_won = games_won + 1,
@@ -274,7 +255,7 @@ class RPS(commands.Cog):
                 ))
                 
                 # Loser stats
-                cursor.execute('''
+                await cursor.execute('''
                     UPDATE rps_stats 
                     SET total_games = total_games + 1, 
                         games_lost = games_lost + 1,
@@ -292,7 +273,7 @@ class RPS(commands.Cog):
                 ))
             
             # Record session in history
-            cursor.execute('''
+            await cursor.execute('''
                 INSERT INTO rps_sessions 
                 (player1_id, player2_id, winner_id, player1_score, player2_score, rounds_played, timestamp)
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
@@ -305,44 +286,31 @@ class RPS(commands.Cog):
                 game.rounds_played,
                 int(time.time())
             ))
-            
-            conn.commit()
-        finally:
-            conn.close()
 
-    def update_round_stats(self, winner_id: Optional[int], loser_id: Optional[int], is_tie: bool = False):
+    async def update_round_stats(self, winner_id: Optional[int], loser_id: Optional[int], is_tie: bool = False):
         """Update round-level statistics"""
-        conn = get_db_connection()
-        if not conn: return
-        
-        try:
-            cursor = conn.cursor()
-            
+        async with self.db.transaction() as cursor:
             if is_tie and winner_id and loser_id:
                 # Both players get a tie
-                cursor.execute('''
+                await cursor.execute('''
                     UPDATE rps_stats 
                     SET rounds_tied = rounds_tied + 1, last_played = %s
                     WHERE user_id IN (%s, %s)
                 ''', (int(time.time()), winner_id, loser_id))
             elif winner_id and loser_id:
                 # Winner gets a round win
-                cursor.execute('''
+                await cursor.execute('''
                     UPDATE rps_stats 
                     SET rounds_won = rounds_won + 1, last_played = %s
                     WHERE user_id = %s
                 ''', (int(time.time()), winner_id))
                 
                 # Loser gets a round loss
-                cursor.execute('''
+                await cursor.execute('''
                     UPDATE rps_stats 
                     SET rounds_lost = rounds_lost + 1, last_played = %s
                     WHERE user_id = %s
                 ''', (int(time.time()), loser_id))
-            
-            conn.commit()
-        finally:
-            conn.close()
 
     def create_session_stats_embed(self, game: RPSGame) -> discord.Embed:
         """Create current session statistics embed"""
@@ -437,8 +405,8 @@ class RPS(commands.Cog):
                 await interaction.response.send_message("❌ Sistem ekonomi belum siap!", ephemeral=True)
                 return
                 
-            p1_bal = economy.get_balance(interaction.user.id)
-            p2_bal = economy.get_balance(member.id)
+            p1_bal = await economy.get_balance(interaction.user.id)
+            p2_bal = await economy.get_balance(member.id)
             
             if p1_bal < bet:
                 await interaction.response.send_message(f"❌ Anda tidak memiliki cukup saldo! (Butuh: {bet}, Ada: {p1_bal})", ephemeral=True)
@@ -476,8 +444,8 @@ class RPS(commands.Cog):
         self.active_games[channel.id] = game
         
         # Initialize player stats in database
-        self.get_player_stats(player1.id)
-        self.get_player_stats(player2.id)
+        await self.get_player_stats(player1.id)
+        await self.get_player_stats(player2.id)
         
         # Create game view
         view = RPSView(game, self)
@@ -566,13 +534,13 @@ class RPS(commands.Cog):
             result_text = "🤝 **SERI!**"
             result_color = discord.Color.orange()
             # Update round tie stats
-            self.update_round_stats(player1.id, player2.id, is_tie=True)
+            await self.update_round_stats(player1.id, player2.id, is_tie=True)
         else:
             result_text = f"🏆 **{round_winner.display_name} MENANG RONDE!**"
             result_color = discord.Color.green()
             loser = player2 if round_winner == player1 else player1
             # Update round win/loss stats
-            self.update_round_stats(round_winner.id, loser.id)
+            await self.update_round_stats(round_winner.id, loser.id)
         
         # Check if someone won the session
         session_complete = game.add_round_win(round_winner)
@@ -601,17 +569,18 @@ class RPS(commands.Cog):
             game.is_active = False
             
             # Handle economy if there was a bet
+            unpaid_loser = None
             if game.bet > 0 and session_winner:
                 economy = self.get_economy()
                 if economy:
                     loser = player2 if session_winner == player1 else player1
-                    # Double check balances before transfer (just in case)
-                    if economy.get_balance(loser.id) >= game.bet:
-                        economy.transfer_money(loser.id, session_winner.id, game.bet)
-                        # Note: transfer_money handles deduction from sender and addition to receiver
+                    # The debit is conditional, so a loser who can no longer pay is simply skipped
+                    results = await economy.transfer_many([(loser.id, session_winner.id, game.bet)], reason="rps")
+                    if results[0] is None:
+                        unpaid_loser = loser
             
             # Update game-level statistics
-            self.update_game_stats(game, session_winner)
+            await self.update_game_stats(game, session_winner)
             
             # Create session end embed
             session_end_embed = discord.Embed(
@@ -620,7 +589,9 @@ class RPS(commands.Cog):
                 color=discord.Color.gold()
             )
             
-            if game.bet > 0:
+            if game.bet > 0 and unpaid_loser:
+                session_end_embed.add_field(name="💰 Taruhan", value=f"❌ **{unpaid_loser.display_name}** tidak bisa membayar taruhan **{game.bet}** koin!", inline=False)
+            elif game.bet > 0:
                 session_end_embed.add_field(name="💰 Taruhan", value=f"Pemenang mendapatkan **{game.bet}** koin!", inline=False)
             
             session_end_embed.add_field(
@@ -632,8 +603,8 @@ class RPS(commands.Cog):
             )
             
             # Get updated overall stats
-            stats1 = self.get_player_stats(player1.id)
-            stats2 = self.get_player_stats(player2.id)
+            stats1 = await self.get_player_stats(player1.id)
+            stats2 = await self.get_player_stats(player2.id)
             
             session_end_embed.add_field(
                 name="📈 Statistik Overall",
@@ -685,7 +656,7 @@ class RPS(commands.Cog):
             await interaction.response.send_message("❌ Bot tidak memiliki statistik!", ephemeral=True)
             return
         
-        stats = self.get_player_stats(target.id)
+        stats = await self.get_player_stats(target.id)
         
         embed = discord.Embed(
             title=f"📊 Statistik RPS - {target.display_name}",
@@ -738,148 +709,130 @@ class RPS(commands.Cog):
     @app_commands.command(name="rps_leaderboard", description="🏆 Lihat papan peringkat RPS server")
     async def rps_leaderboard(self, interaction: discord.Interaction, sort_by: str = "games"):
         """Display RPS leaderboard with different sorting options"""
-        conn = get_db_connection()
-        if not conn: return
+        # Define sorting options
+        sort_options = {
+            "games": ("games_won", "Games Won"),
+            "winrate": ("(games_won * 1.0 / CASE WHEN total_games = 0 THEN 1 ELSE total_games END)", "Win Rate"),
+            "rounds": ("rounds_won", "Rounds Won"),
+            "total": ("total_games", "Total Games")
+        }
         
-        try:
-            cursor = conn.cursor()
-            
-            # Define sorting options
-            sort_options = {
-                "games": ("games_won", "Games Won"),
-                "winrate": ("(games_won * 1.0 / CASE WHEN total_games = 0 THEN 1 ELSE total_games END)", "Win Rate"),
-                "rounds": ("rounds_won", "Rounds Won"),
-                "total": ("total_games", "Total Games")
-            }
-            
-            if sort_by not in sort_options:
-                sort_by = "games"
-            
-            sort_column, sort_name = sort_options[sort_by]
-            
-            # Get top 10 players
-            # Safe to interpolate sort_column because it is validated against keys of sort_options
-            cursor.execute(f'''
-                SELECT user_id, total_games, games_won, games_lost, rounds_won, rounds_lost, rounds_tied
-                FROM rps_stats 
-                WHERE total_games > 0
-                ORDER BY {sort_column} DESC, total_games DESC
-                LIMIT 10
-            ''')
-            top_players = cursor.fetchall()
-            
-            if not top_players:
-                embed = discord.Embed(
-                    title="🏆 Papan Peringkat RPS",
-                    description="Belum ada yang bermain RPS di server ini!\nGunakan `/rps @member` untuk memulai.",
-                    color=discord.Color.blue()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
-            
+        if sort_by not in sort_options:
+            sort_by = "games"
+        
+        sort_column, sort_name = sort_options[sort_by]
+        
+        # Get top 10 players
+        # Safe to interpolate sort_column because it is validated against keys of sort_options
+        top_players = await self.db.fetchall(f'''
+            SELECT user_id, total_games, games_won, games_lost, rounds_won, rounds_lost, rounds_tied
+            FROM rps_stats 
+            WHERE total_games > 0
+            ORDER BY {sort_column} DESC, total_games DESC
+            LIMIT 10
+        ''')
+        
+        if not top_players:
             embed = discord.Embed(
                 title="🏆 Papan Peringkat RPS",
-                description=f"Top 10 pemain RPS (diurutkan berdasarkan {sort_name}):",
-                color=discord.Color.gold()
+                description="Belum ada yang bermain RPS di server ini!\nGunakan `/rps @member` untuk memulai.",
+                color=discord.Color.blue()
             )
-            
-            medals = ["🥇", "🥈", "🥉"]
-            
-            leaderboard_text = ""
-            
-            for i, (user_id, total_games, games_won, games_lost, rounds_won, rounds_lost, rounds_tied) in enumerate(top_players):
-                try:
-                    user = await self.client.fetch_user(user_id)
-                    medal = medals[i] if i < 3 else f"**{i+1}.**"
-                    
-                    # Calculate win rates
-                    game_win_rate = (games_won / max(1, total_games)) * 100
-                    total_rounds = rounds_won + rounds_lost + rounds_tied
-                    round_win_rate = (rounds_won / max(1, total_rounds)) * 100
-                    
-                    # Format based on sort type
-                    if sort_by == "games":
-                        main_stat = f"🏆 {games_won} games"
-                    elif sort_by == "winrate":
-                        main_stat = f"📊 {game_win_rate:.1f}% win rate"
-                    elif sort_by == "rounds":
-                        main_stat = f"⚡ {rounds_won} rounds"
-                    else:  # total
-                        main_stat = f"🎮 {total_games} games"
-                    
-                    leaderboard_text += f"{medal} **{user.display_name}**\n"
-                    leaderboard_text += f"└ {main_stat} • {total_games} total games\n\n"
-                    
-                except discord.NotFound:
-                    continue
-            
-            embed.description += f"\n\n{leaderboard_text}"
-            embed.set_footer(text="💡 Tip: First to 3 wins in each game session!")
-            
             await interaction.response.send_message(embed=embed)
-        finally:
-            conn.close()
+            return
+        
+        embed = discord.Embed(
+            title="🏆 Papan Peringkat RPS",
+            description=f"Top 10 pemain RPS (diurutkan berdasarkan {sort_name}):",
+            color=discord.Color.gold()
+        )
+        
+        medals = ["🥇", "🥈", "🥉"]
+        
+        leaderboard_text = ""
+        
+        for i, (user_id, total_games, games_won, games_lost, rounds_won, rounds_lost, rounds_tied) in enumerate(top_players):
+            try:
+                user = await self.client.fetch_user(user_id)
+                medal = medals[i] if i < 3 else f"**{i+1}.**"
+                
+                # Calculate win rates
+                game_win_rate = (games_won / max(1, total_games)) * 100
+                total_rounds = rounds_won + rounds_lost + rounds_tied
+                round_win_rate = (rounds_won / max(1, total_rounds)) * 100
+                
+                # Format based on sort type
+                if sort_by == "games":
+                    main_stat = f"🏆 {games_won} games"
+                elif sort_by == "winrate":
+                    main_stat = f"📊 {game_win_rate:.1f}% win rate"
+                elif sort_by == "rounds":
+                    main_stat = f"⚡ {rounds_won} rounds"
+                else:  # total
+                    main_stat = f"🎮 {total_games} games"
+                
+                leaderboard_text += f"{medal} **{user.display_name}**\n"
+                leaderboard_text += f"└ {main_stat} • {total_games} total games\n\n"
+                
+            except discord.NotFound:
+                continue
+        
+        embed.description += f"\n\n{leaderboard_text}"
+        embed.set_footer(text="💡 Tip: First to 3 wins in each game session!")
+        
+        await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="rps_history", description="📋 Lihat riwayat permainan RPS Anda")
     async def rps_history(self, interaction: discord.Interaction, member: discord.Member = None):
         """View recent RPS game history"""
-        conn = get_db_connection()
-        if not conn: return
-
-        try:
-            target = member or interaction.user
-            
-            if target.bot:
-                await interaction.response.send_message("❌ Bot tidak memiliki riwayat permainan!", ephemeral=True)
-                return
-            
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT player1_id, player2_id, winner_id, player1_score, player2_score, rounds_played, timestamp
-                FROM rps_sessions 
-                WHERE player1_id = %s OR player2_id = %s
-                ORDER BY timestamp DESC
-                LIMIT 10
-            ''', (target.id, target.id))
-            
-            history = cursor.fetchall()
-            
-            if not history:
-                embed = discord.Embed(
-                    title=f"📋 Riwayat RPS - {target.display_name}",
-                    description="Belum ada riwayat permainan!",
-                    color=discord.Color.blue()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
-            
+        target = member or interaction.user
+        
+        if target.bot:
+            await interaction.response.send_message("❌ Bot tidak memiliki riwayat permainan!", ephemeral=True)
+            return
+        
+        history = await self.db.fetchall('''
+            SELECT player1_id, player2_id, winner_id, player1_score, player2_score, rounds_played, timestamp
+            FROM rps_sessions 
+            WHERE player1_id = %s OR player2_id = %s
+            ORDER BY timestamp DESC
+            LIMIT 10
+        ''', (target.id, target.id))
+        
+        if not history:
             embed = discord.Embed(
                 title=f"📋 Riwayat RPS - {target.display_name}",
+                description="Belum ada riwayat permainan!",
                 color=discord.Color.blue()
             )
+            await interaction.response.send_message(embed=embed)
+            return
+        
+        embed = discord.Embed(
+            title=f"📋 Riwayat RPS - {target.display_name}",
+            color=discord.Color.blue()
+        )
+        
+        for match in history:
+            p1_id, p2_id, winner_id, p1_score, p2_score, rounds, timestamp = match
             
-            for match in history:
-                p1_id, p2_id, winner_id, p1_score, p2_score, rounds, timestamp = match
-                
-                opponent_id = p2_id if p1_id == target.id else p1_id
-                try:
-                    opponent = await self.client.fetch_user(opponent_id)
-                    opponent_name = opponent.display_name
-                except:
-                    opponent_name = "Unknown"
-                    
-                result = "🏆 Menang" if winner_id == target.id else "❌ Kalah" if winner_id else "🤝 Seri"
-                score = f"{p1_score}-{p2_score}" if p1_id == target.id else f"{p2_score}-{p1_score}"
-                
-                embed.add_field(
-                    name=f"{result} vs {opponent_name}",
-                    value=f"Skor: {score} • {rounds} ronde",
-                    inline=False
-                )
+            opponent_id = p2_id if p1_id == target.id else p1_id
+            try:
+                opponent = await self.client.fetch_user(opponent_id)
+                opponent_name = opponent.display_name
+            except:
+                opponent_name = "Unknown"
                 
-            await interaction.response.send_message(embed=embed)
-        finally:
-            conn.close()
+            result = "🏆 Menang" if winner_id == target.id else "❌ Kalah" if winner_id else "🤝 Seri"
+            score = f"{p1_score}-{p2_score}" if p1_id == target.id else f"{p2_score}-{p1_score}"
+            
+            embed.add_field(
+                name=f"{result} vs {opponent_name}",
+                value=f"Skor: {score} • {rounds} ronde",
+                inline=False
+            )
+            
+        await interaction.response.send_message(embed=embed)
 
 
 async def setup(bot):
@@ -1,11 +1,5 @@
 import discord
 from discord.ext import commands
-import json
-import aiomysql
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 class RoleButtons(commands.Cog):
     """Handles role assignment buttons and select menus from dashboard"""
@@ -16,88 +10,56 @@ class RoleButtons(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.pool = None
-        
-    async def get_pool(self):
-        """Get or create database connection pool"""
-        if self.pool is None:
-            self.pool = await aiomysql.create_pool(
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=int(os.getenv('DB_PORT', 3306)),
-                user=os.getenv('DB_USER', 'root'),
-                password=os.getenv('DB_PASSWORD', ''),
-                db=os.getenv('DB_NAME', 'donpollobot'),
-                autocommit=True
-            )
-        return self.pool
+
+    async def cog_load(self):
+        # Kelamin uses its own persistent view
+        self.bot.router.ignore_prefix('kelamin_', owner=self)
+        self.bot.router.add_fallback(self.handle_component, owner=self, priority=10)
+
+    def cog_unload(self):
+        self.bot.router.remove_owner(self)
     
-    async def find_component_action(self, guild_id: int, custom_id: str):
-        """Find component action from database by custom_id"""
+    async def find_component_action(self, guild_id: int, custom_id: str, message_id: int = None):
+        """Find component action by custom_id from the in-memory component index"""
         try:
-            pool = await self.get_pool()
-            async with pool.acquire() as conn:
-                async with conn.cursor(aiomysql.DictCursor) as cur:
-                    await cur.execute(
-                        "SELECT component_rows FROM reaction_role_messages WHERE guild_id = %s",
-                        (str(guild_id),)
-                    )
-                    rows = await cur.fetchall()
-                    
-                    for row in rows:
-                        if row['component_rows']:
-                            component_rows = json.loads(row['component_rows'])
-                            for comp_row in component_rows:
-                                for comp in comp_row:
-                                    if comp.get('custom_id') == custom_id:
-                                        return {
-                                            'type': 'button',
-                                            'action_type': comp.get('action_type'),
-                                            'role_id': comp.get('role_id'),
-                                            'component': comp
-                                        }
-                                    # Check select menu options
-                                    if comp.get('type') == 3 and comp.get('options'):
-                                        for opt in comp.get('options', []):
-                                            if opt.get('value') == custom_id or comp.get('custom_id') == custom_id:
-                                                return {
-                                                    'type': 'select_menu',
-                                                    'options': comp.get('options', []),
-                                                    'custom_id': comp.get('custom_id'),
-                                                    'component': comp
-                                                }
-            return None
+            index = self.bot.component_index
+            await index.ensure_loaded()
+            comp = index.get_guild_component(guild_id, custom_id)
+            if not comp and message_id and await index.resolve_message(message_id):
+                # Message was posted after the last index rebuild
+                comp = index.get_guild_component(guild_id, custom_id)
+            if not comp:
+                return None
+            return {
+                'type': 'select_menu' if comp.get('type') == 3 else 'button',
+                'action_type': comp.get('action_type'),
+                'role_id': comp.get('role_id'),
+                'options': comp.get('options', []),
+                'custom_id': comp.get('custom_id'),
+                'component': comp
+            }
         except Exception as e:
             print(f"[RoleButtons] Error finding component: {e}")
             return None
     
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
-        """Handle button and select menu interactions"""
-        
-        # Only handle component interactions
-        if interaction.type != discord.InteractionType.component:
-            return
-            
+    async def handle_component(self, interaction: discord.Interaction) -> bool:
+        """Handle button and select menu interactions. False if the component isn't ours."""
         custom_id = interaction.data.get('custom_id', '')
         component_type = interaction.data.get('component_type')
-        
-        # Skip if not from our role system (check custom_id patterns)
-        if not custom_id or custom_id.startswith('kelamin_'):
-            return
             
         guild = interaction.guild
         user = interaction.user
         
         if not guild or not user:
-            return
+            return False
             
         try:
             # Find component action from database
-            action_data = await self.find_component_action(guild.id, custom_id)
+            action_data = await self.find_component_action(guild.id, custom_id, interaction.message.id if interaction.message else None)
             
             if not action_data:
                 # Not our component, ignore
-                return
+                return False
             
             # Handle button clicks
             if component_type == 2:  # Button
@@ -106,14 +68,14 @@ class RoleButtons(commands.Cog):
                 
                 if not action_type or not role_id:
                     # No action configured
-                    return
+                    return True
                     
                 role = guild.get_role(int(role_id))
                 if not role:
                     await interaction.response.send_message(
                         "❌ Role tidak ditemukan!", ephemeral=True
                     )
-                    return
+                    return True
                 
                 await self.execute_role_action(interaction, user, role, action_type)
                 
@@ -122,7 +84,7 @@ class RoleButtons(commands.Cog):
                 selected_values = interaction.data.get('values', [])
                 
                 if not selected_values:
-                    return
+                    return True
                     
                 options = action_data.get('options', [])
                 
@@ -140,7 +102,7 @@ class RoleButtons(commands.Cog):
                                         interaction, user, role, action_type,
                                         is_select=True, option_label=opt.get('label', 'Option')
                                     )
-                                    return
+                                    return True
                 
         except Exception as e:
             print(f"[RoleButtons] Error handling interaction: {e}")
@@ -148,6 +110,7 @@ class RoleButtons(commands.Cog):
                 await interaction.response.send_message(
                     f"❌ Terjadi kesalahan: {str(e)}", ephemeral=True
                 )
+        return True
     
     async def execute_role_action(self, interaction: discord.Interaction, user: discord.Member, 
                                   role: discord.Role, action_type: str, is_select: bool = False,
@@ -218,11 +181,6 @@ class RoleButtons(commands.Cog):
                     f"❌ Gagal mengubah role: {str(e)}",
                     ephemeral=True
                 )
-    
-    def cog_unload(self):
-        """Cleanup when cog is unloaded"""
-        if self.pool:
-            self.pool.close()
 
 async def setup(bot):
     await bot.add_cog(RoleButtons(bot))
@@ -2,7 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
-import aiohttp
+from utils.components_v2 import send_components_v2
 import asyncio
 
 class Slot(commands.Cog):
@@ -63,15 +63,8 @@ class Slot(commands.Cog):
         }
 
     async def send_raw_payload(self, interaction: discord.Interaction, payload: dict):
-        url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
-        async with aiohttp.ClientSession() as session:
-            # Type 4 = Channel Message with Source
-            json_data = {"type": 4, "data": payload}
-            async with session.post(url, json=json_data, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error sending Slot payload: {resp.status} {await resp.text()}")
+        # Type 4 = Channel Message with Source
+        await send_components_v2(interaction, payload, label="Slot")
 
     @app_commands.command(name="slot", description="Mainkan mesin slot dengan taruhan! (Components V2)")
     @app_commands.describe(bet="Jumlah taruhan (default: 10)")
@@ -82,7 +75,7 @@ class Slot(commands.Cog):
             return
 
         user_id = interaction.user.id
-        current_balance = economy.get_balance(user_id)
+        current_balance = await economy.get_balance(user_id)
 
         # Validasi taruhan
         if bet < 1:
@@ -121,7 +114,7 @@ class Slot(commands.Cog):
             result_text = "LOSE!"
 
         # Update balance
-        new_balance = economy.update_balance(user_id, winnings)
+        new_balance = await economy.buffer_balance(user_id, winnings, reason="slot")
 
         # Build and send payload
         payload = self.build_slot_payload(slots, result_text, new_balance, bet, winnings)
@@ -1,125 +1,67 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-
-import mysql.connector
-from utils.database import get_db_connection
+from datetime import datetime
 
 class TicketDatabase:
-    def __init__(self):
-        self._init_db()
-    
-    def _init_db(self):
-        """Tables are now created via migrate_db.py or manual SQL setup. 
-           This method ensures basic consistency if needed."""
-        pass
-    
-    def get_conn(self):
-        return get_db_connection()
+    def __init__(self, db):
+        self.db = db
 
-    def set_category(self, guild_id: int, category_id: int):
-        self._update_config(guild_id, "category_id", category_id)
+    async def set_category(self, guild_id: int, category_id: int):
+        await self._update_config(guild_id, "category_id", category_id)
 
-    def set_log_channel(self, guild_id: int, channel_id: int):
-        self._update_config(guild_id, "log_channel_id", channel_id)
+    async def set_log_channel(self, guild_id: int, channel_id: int):
+        await self._update_config(guild_id, "log_channel_id", channel_id)
 
-    def set_support_role(self, guild_id: int, role_id: int):
-        self._update_config(guild_id, "support_role_id", role_id)
+    async def set_support_role(self, guild_id: int, role_id: int):
+        await self._update_config(guild_id, "support_role_id", role_id)
     
-    def set_panel(self, guild_id: int, channel_id: int, message_id: int):
-        conn = self.get_conn()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT guild_id FROM guild_config WHERE guild_id = %s', (guild_id,))
-            if cursor.fetchone():
-                cursor.execute('''
-                    UPDATE guild_config 
-                    SET panel_channel_id = %s, panel_message_id = %s
-                    WHERE guild_id = %s
-                ''', (channel_id, message_id, guild_id))
-            else:
-                cursor.execute('''
-                    INSERT INTO guild_config (guild_id, panel_channel_id, panel_message_id) 
-                    VALUES (%s, %s, %s)
-                ''', (guild_id, channel_id, message_id))
-            conn.commit()
-        finally:
-            conn.close()
+    async def set_panel(self, guild_id: int, channel_id: int, message_id: int):
+        await self.db.execute('''
+            INSERT INTO guild_config (guild_id, panel_channel_id, panel_message_id) 
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE panel_channel_id = VALUES(panel_channel_id),
+                                    panel_message_id = VALUES(panel_message_id)
+        ''', (guild_id, channel_id, message_id))
 
-    def _update_config(self, guild_id: int, column: str, value: int):
-        conn = self.get_conn()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT guild_id FROM guild_config WHERE guild_id = %s', (guild_id,))
-            if cursor.fetchone():
-                cursor.execute(f'UPDATE guild_config SET {column} = %s WHERE guild_id = %s', (value, guild_id))
-            else:
-                cursor.execute(f'INSERT INTO guild_config (guild_id, {column}) VALUES (%s, %s)', (guild_id, value))
-            conn.commit()
-        finally:
-            conn.close()
+    async def _update_config(self, guild_id: int, column: str, value: int):
+        await self.db.execute(
+            f'INSERT INTO guild_config (guild_id, {column}) VALUES (%s, %s) '
+            f'ON DUPLICATE KEY UPDATE {column} = VALUES({column})',
+            (guild_id, value)
+        )
     
-    def get_config(self, guild_id: int):
-        conn = self.get_conn()
-        if not conn: return None
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM guild_config WHERE guild_id = %s', (guild_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                # Map based on schema order: 
-                # guild_id, category_id, log_channel_id, panel_channel_id, panel_message_id, support_role_id
-                return {
-                    'guild_id': result[0],
-                    'category_id': result[1],
-                    'log_channel_id': result[2],
-                    'panel_channel_id': result[3],
-                    'panel_message_id': result[4],
-                    'support_role_id': result[5] if len(result) > 5 else None
-                }
-            return None
-        finally:
-            conn.close()
+    async def get_config(self, guild_id: int):
+        result = await self.db.fetchone('SELECT * FROM guild_config WHERE guild_id = %s', (guild_id,))
+        
+        if result:
+            # Map based on schema order: 
+            # guild_id, category_id, log_channel_id, panel_channel_id, panel_message_id, support_role_id
+            return {
+                'guild_id': result[0],
+                'category_id': result[1],
+                'log_channel_id': result[2],
+                'panel_channel_id': result[3],
+                'panel_message_id': result[4],
+                'support_role_id': result[5] if len(result) > 5 else None
+            }
+        return None
     
-    def add_ticket(self, channel_id: int, guild_id: int, user_id: int, reason: str = None):
-        conn = self.get_conn()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO active_tickets (channel_id, guild_id, user_id, created_at, reason)
-                VALUES (%s, %s, %s, %s, %s)
-            ''', (channel_id, guild_id, user_id, datetime.now().isoformat(), reason))
-            conn.commit()
-        finally:
-            conn.close()
+    async def add_ticket(self, channel_id: int, guild_id: int, user_id: int, reason: str = None):
+        await self.db.execute('''
+            INSERT INTO active_tickets (channel_id, guild_id, user_id, created_at, reason)
+            VALUES (%s, %s, %s, %s, %s)
+        ''', (channel_id, guild_id, user_id, datetime.now().isoformat(), reason))
     
-    def remove_ticket(self, channel_id: int):
-        conn = self.get_conn()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM active_tickets WHERE channel_id = %s', (channel_id,))
-            conn.commit()
-        finally:
-            conn.close()
+    async def remove_ticket(self, channel_id: int):
+        await self.db.execute('DELETE FROM active_tickets WHERE channel_id = %s', (channel_id,))
     
-    def get_user_ticket(self, guild_id: int, user_id: int):
-        conn = self.get_conn()
-        if not conn: return None
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT channel_id FROM active_tickets 
-                WHERE guild_id = %s AND user_id = %s
-            ''', (guild_id, user_id))
-            result = cursor.fetchone()
-            return result[0] if result else None
-        finally:
-            conn.close()
+    async def get_user_ticket(self, guild_id: int, user_id: int):
+        result = await self.db.fetchone('''
+            SELECT channel_id FROM active_tickets 
+            WHERE guild_id = %s AND user_id = %s
+        ''', (guild_id, user_id))
+        return result[0] if result else None
 
 
 class TicketModal(discord.ui.Modal, title="Buat Tiket Baru"):
@@ -174,7 +116,7 @@ class TicketCloseView(discord.ui.View):
 class Ticket(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = TicketDatabase()
+        self.db = TicketDatabase(bot.db)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -206,7 +148,7 @@ class Ticket(commands.Cog):
         author = interaction.user
         
         # Cek konfigurasi
-        config = self.db.get_config(guild.id)
+        config = await self.db.get_config(guild.id)
         if not config or not config['category_id']:
             await interaction.followup.send(embed=discord.Embed(
                 title="❌ Konfigurasi Belum Lengkap",
@@ -216,7 +158,7 @@ class Ticket(commands.Cog):
             return
         
         # Cek tiket yang sudah ada
-        existing_ticket_id = self.db.get_user_ticket(guild.id, author.id)
+        existing_ticket_id = await self.db.get_user_ticket(guild.id, author.id)
         if existing_ticket_id:
             existing_channel = guild.get_channel(existing_ticket_id)
             if existing_channel:
@@ -227,7 +169,7 @@ class Ticket(commands.Cog):
                 ), ephemeral=True)
                 return
             else:
-                self.db.remove_ticket(existing_ticket_id)
+                await self.db.remove_ticket(existing_ticket_id)
         
         # Ambil kategori
         category = guild.get_channel(config['category_id'])
@@ -290,7 +232,7 @@ class Ticket(commands.Cog):
             )
             
             # Simpan ke database
-            self.db.add_ticket(ticket_channel.id, guild.id, author.id, reason)
+            await self.db.add_ticket(ticket_channel.id, guild.id, author.id, reason)
             
             # Embed untuk channel tiket
             ticket_embed = discord.Embed(
@@ -336,7 +278,7 @@ class Ticket(commands.Cog):
         is_admin = interaction.user.guild_permissions.administrator
         is_support = False
         
-        config = self.db.get_config(interaction.guild.id)
+        config = await self.db.get_config(interaction.guild.id)
         if config and config.get('support_role_id'):
             support_role = interaction.guild.get_role(config['support_role_id'])
             if support_role and support_role in interaction.user.roles:
@@ -404,7 +346,7 @@ class Ticket(commands.Cog):
                 pass
             
             # Hapus dari database
-            self.db.remove_ticket(channel.id)
+            await self.db.remove_ticket(channel.id)
             
             # Kirim pesan penutupan
             close_embed = discord.Embed(
@@ -465,7 +407,7 @@ class CategorySelect(discord.ui.View):
     )
     async def category_select(self, interaction: discord.Interaction, select: discord.ui.ChannelSelect):
         category = select.values[0]
-        self.db.set_category(interaction.guild.id, category.id)
+        await self.db.set_category(interaction.guild.id, category.id)
         await interaction.response.edit_message(content=None, embed=discord.Embed(title="✅ Berhasil", description=f"Kategori tiket diatur ke: **{category.name}**", color=discord.Color.green()), view=None)
 
 class LogChannelSelect(discord.ui.View):
@@ -481,7 +423,7 @@ class LogChannelSelect(discord.ui.View):
     )
     async def log_select(self, interaction: discord.Interaction, select: discord.ui.ChannelSelect):
         channel = select.values[0]
-        self.db.set_log_channel(interaction.guild.id, channel.id)
+        await self.db.set_log_channel(interaction.guild.id, channel.id)
         await interaction.response.edit_message(content=None, embed=discord.Embed(title="✅ Berhasil", description=f"Log channel diatur ke: {channel.mention}", color=discord.Color.green()), view=None)
 
 class SupportRoleSelect(discord.ui.View):
@@ -496,7 +438,7 @@ class SupportRoleSelect(discord.ui.View):
     )
     async def role_select(self, interaction: discord.Interaction, select: discord.ui.RoleSelect):
         role = select.values[0]
-        self.db.set_support_role(interaction.guild.id, role.id)
+        await self.db.set_support_role(interaction.guild.id, role.id)
         await interaction.response.edit_message(content=None, embed=discord.Embed(title="✅ Berhasil", description=f"Support role diatur ke: {role.mention}", color=discord.Color.green()), view=None)
 
 class PanelChannelSelect(discord.ui.View):
@@ -530,7 +472,7 @@ class PanelChannelSelect(discord.ui.View):
                 panel_embed.set_thumbnail(url=interaction.guild.icon.url)
             
             panel_message = await channel.send(embed=panel_embed, view=TicketControlPanel(self.bot))
-            self.db.set_panel(interaction.guild.id, channel.id, panel_message.id)
+            await self.db.set_panel(interaction.guild.id, channel.id, panel_message.id)
             
             await interaction.response.edit_message(content=None, embed=discord.Embed(title="✅ Berhasil", description=f"Control panel berhasil dikirim ke {channel.mention}!\n\n[Klik di sini untuk melihat]({panel_message.jump_url})", color=discord.Color.green()), view=None)
             
@@ -3,9 +3,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime
-import mysql.connector
 import os
-from utils.database import get_db_connection
 
 class ConfirmClearView(discord.ui.View):
     def __init__(self, member, total_warnings):
@@ -22,7 +20,7 @@ class ConfirmClearView(discord.ui.View):
         # Hapus semua warnings dari database
         warn_cog = interaction.client.get_cog('Warn')
         # Call synchronous method (no await)
-        warn_cog.clear_user_warnings(interaction.guild.id, self.member.id)
+        await warn_cog.clear_user_warnings(interaction.guild.id, self.member.id)
         
         # Embed konfirmasi
         embed = discord.Embed(
@@ -57,75 +55,44 @@ class ConfirmClearView(discord.ui.View):
 class Warn(commands.Cog):
     def __init__(self, client):
         self.client = client
-        self._init_db()
-        
-    def _init_db(self):
-        """Inisialisasi database placeholder"""
-        pass
+        self.db = client.db
     
-    def get_next_case_number(self, guild_id):
+    async def get_next_case_number(self, guild_id):
         """Mendapatkan nomor kasus berikutnya untuk guild"""
-        conn = get_db_connection()
-        if not conn: return 1
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT current_case FROM warn_cases WHERE guild_id = %s', (guild_id,))
-            row = cursor.fetchone()
-                
+        async with self.db.transaction() as cursor:
+            await cursor.execute('SELECT current_case FROM warn_cases WHERE guild_id = %s FOR UPDATE', (guild_id,))
+            row = await cursor.fetchone()
+
             if row:
                 new_case = row[0] + 1
-                cursor.execute('UPDATE warn_cases SET current_case = %s WHERE guild_id = %s', (new_case, guild_id))
+                await cursor.execute('UPDATE warn_cases SET current_case = %s WHERE guild_id = %s', (new_case, guild_id))
             else:
                 new_case = 1
-                cursor.execute('INSERT INTO warn_cases (guild_id, current_case) VALUES (%s, %s)', (guild_id, new_case))
-            
-            conn.commit()
+                await cursor.execute('INSERT INTO warn_cases (guild_id, current_case) VALUES (%s, %s)', (guild_id, new_case))
+
             return new_case
-        finally:
-            conn.close()
     
-    def add_warning(self, guild_id, user_id, moderator_id, moderator_name, reason, case_number):
+    async def add_warning(self, guild_id, user_id, moderator_id, moderator_name, reason, case_number):
         """Menambahkan warning ke database"""
-        conn = get_db_connection()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO warnings (guild_id, user_id, moderator_id, moderator_name, reason, case_number)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            ''', (guild_id, user_id, moderator_id, moderator_name, reason, case_number))
-            conn.commit()
-        finally:
-            conn.close()
+        await self.db.execute('''
+            INSERT INTO warnings (guild_id, user_id, moderator_id, moderator_name, reason, case_number)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        ''', (guild_id, user_id, moderator_id, moderator_name, reason, case_number))
     
-    def get_user_warnings(self, guild_id, user_id):
+    async def get_user_warnings(self, guild_id, user_id):
         """Mendapatkan semua warning untuk user tertentu"""
-        conn = get_db_connection()
-        if not conn: return []
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM warnings 
-                WHERE guild_id = %s AND user_id = %s
-                ORDER BY timestamp DESC
-            ''', (guild_id, user_id))
-            return cursor.fetchall()
-        finally:
-            conn.close()
+        return await self.db.fetchall('''
+            SELECT * FROM warnings 
+            WHERE guild_id = %s AND user_id = %s
+            ORDER BY timestamp DESC
+        ''', (guild_id, user_id))
     
-    def clear_user_warnings(self, guild_id, user_id):
+    async def clear_user_warnings(self, guild_id, user_id):
         """Menghapus semua warning untuk user tertentu"""
-        conn = get_db_connection()
-        if not conn: return
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM warnings 
-                WHERE guild_id = %s AND user_id = %s
-            ''', (guild_id, user_id))
-            conn.commit()
-        finally:
-            conn.close()
+        await self.db.execute('''
+            DELETE FROM warnings 
+            WHERE guild_id = %s AND user_id = %s
+        ''', (guild_id, user_id))
 
     def is_admin(self, member):
         """Cek apakah member adalah admin"""
@@ -184,13 +151,13 @@ class Warn(commands.Cog):
 
         try:
             # Mendapatkan nomor kasus berikutnya (Sync call)
-            case_number = self.get_next_case_number(guild_id)
+            case_number = await self.get_next_case_number(guild_id)
             
             # Menambahkan warning ke database dengan nama moderator (Sync call)
-            self.add_warning(guild_id, user_id, interaction.user.id, interaction.user.display_name, reason, case_number)
+            await self.add_warning(guild_id, user_id, interaction.user.id, interaction.user.display_name, reason, case_number)
             
             # Mendapatkan total warnings user (Sync call)
-            warnings = self.get_user_warnings(guild_id, user_id)
+            warnings = await self.get_user_warnings(guild_id, user_id)
             total_warnings = len(warnings)
             
             # Waktu saat ini dalam format yang lebih bagus
@@ -330,7 +297,7 @@ class Warn(commands.Cog):
         
         try:
             # Sync call
-            warnings = self.get_user_warnings(guild_id, user_id)
+            warnings = await self.get_user_warnings(guild_id, user_id)
             
             if not warnings:
                 embed = discord.Embed(
@@ -3,33 +3,28 @@ from discord.ext import commands
 import json
 import re
 from datetime import datetime
-from utils.database import get_db_connection
 
 
 
 class Welcome(commands.Cog):
     """Handles welcome, leave, boost, and role assignment messages"""
     
+    def __init__(self, bot):
+        self.bot = bot
+
     @commands.Cog.listener()
     async def on_ready(self):
         print('✅ Welcome Cog is ready')
 
 
-    def get_settings(self, guild_id: int) -> dict | None:
+    async def get_settings(self, guild_id: int) -> dict | None:
         """Get welcome settings from database"""
         try:
-            conn = get_db_connection()
-            if not conn:
-                return None
-            
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(
+            row = await self.bot.db.fetchone(
                 "SELECT * FROM welcome_settings WHERE guild_id = %s",
-                (str(guild_id),)
+                (str(guild_id),),
+                dictionary=True
             )
-            row = cursor.fetchone()
-            cursor.close()
-            conn.close()
             
             if row and row.get('embed_data'):
                 try:
@@ -182,7 +177,7 @@ class Welcome(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """Handle member join event"""
-        settings = self.get_settings(member.guild.id)
+        settings = await self.get_settings(member.guild.id)
         if not settings:
             return
         
@@ -193,7 +188,7 @@ class Welcome(commands.Cog):
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         """Handle member leave event"""
-        settings = self.get_settings(member.guild.id)
+        settings = await self.get_settings(member.guild.id)
         if not settings:
             return
         
@@ -204,7 +199,7 @@ class Welcome(commands.Cog):
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
         """Handle role changes and boost events"""
-        settings = self.get_settings(after.guild.id)
+        settings = await self.get_settings(after.guild.id)
         if not settings:
             return
         
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
+from utils.components_v2 import send_components_v2, edit_components_v2, UPDATE_MESSAGE
 import json
 import asyncio
 from typing import List, Optional, Dict
@@ -14,6 +14,7 @@ class XOXGame:
         self.board = ["BLANK"] * 9  # 0-8, BLANK, X, O
         self.turn = player1
         self.winner: Optional[discord.Member] = None
+        self.bet_paid = True  # False if the loser could not cover the bet at settlement
         self.is_draw = False
         self.is_active = True
 
@@ -55,6 +56,12 @@ class XOX(commands.Cog):
         self.bot = bot
         self.games: Dict[int, XOXGame] = {} # Message ID -> Game
 
+    async def cog_load(self):
+        self.bot.router.add_prefix("xox_", self.on_xox_component, owner=self)
+
+    def cog_unload(self):
+        self.bot.router.remove_owner(self)
+
     def get_economy(self):
         return self.bot.get_cog('Economy')
 
@@ -112,8 +119,11 @@ class XOX(commands.Cog):
         # Turn Indicator or Result
         if game.winner:
             footer_text = f"## 🏆 WINNER: {game.winner.mention}!"
-            if game.bet > 0:
+            if game.bet > 0 and game.bet_paid:
                 footer_text += f"\n💰 Won {game.bet} coins!"
+            elif game.bet > 0:
+                loser = game.player2 if game.winner.id == game.player1.id else game.player1
+                footer_text += f"\n❌ {loser.mention} couldn't pay the {game.bet} coin bet."
         elif game.is_draw:
             footer_text = "## 🤝 DRAW!"
         elif game.player2 is None:
@@ -163,21 +173,8 @@ class XOX(commands.Cog):
     async def send_raw_payload(self, interaction: discord.Interaction, payload: dict, edit: bool = False):
         """Helper to send raw JSON payload"""
         if edit:
-            url = f"https://discord.com/api/v10/webhooks/{self.bot.user.id}/{interaction.token}/messages/@original"
-            method = "PATCH"
-        else:
-            url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-            method = "POST"
-            payload = {"type": 4, "data": payload}
-
-        headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, url, json=payload, headers=headers) as resp:
-                if resp.status not in [200, 204]:
-                    print(f"❌ Error sending XOX payload: {resp.status} {await resp.text()}")
-                    return False
-        return True
+            return await edit_components_v2(interaction, payload, label="XOX")
+        return await send_components_v2(interaction, payload, label="XOX")
 
     @app_commands.command(name="xox", description="Mainkan XOX (Tic-Tac-Toe) dengan taruhan!")
     @app_commands.describe(bet="Jumlah taruhan (opsional)")
@@ -189,7 +186,7 @@ class XOX(commands.Cog):
                 await interaction.response.send_message("❌ Sistem ekonomi belum siap!", ephemeral=True)
                 return
             
-            bal = economy.get_balance(interaction.user.id)
+            bal = await economy.get_balance(interaction.user.id)
             if bal < bet:
                 await interaction.response.send_message(f"❌ Saldo tidak cukup! (Butuh: {bet}, Ada: {bal})", ephemeral=True)
                 return
@@ -204,14 +201,8 @@ class XOX(commands.Cog):
             msg = await interaction.original_response()
             self.games[msg.id] = game
 
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
-        if interaction.type != discord.InteractionType.component:
-            return
-            
+    async def on_xox_component(self, interaction: discord.Interaction):
         custom_id = interaction.data.get("custom_id", "")
-        if not custom_id.startswith("xox_"):
-            return
 
         msg_id = interaction.message.id
         game = self.games.get(msg_id)
@@ -234,7 +225,7 @@ class XOX(commands.Cog):
             if game.bet > 0:
                 economy = self.get_economy()
                 if economy:
-                    bal = economy.get_balance(interaction.user.id)
+                    bal = await economy.get_balance(interaction.user.id)
                     if bal < game.bet:
                         await interaction.response.send_message(f"❌ Saldo tidak cukup! (Butuh: {game.bet}, Ada: {bal})", ephemeral=True)
                         return
@@ -243,11 +234,7 @@ class XOX(commands.Cog):
             # Update message
             payload = self.build_payload(game)
             # We must acknowledge the interaction. We can use Update Message (Type 7)
-            
-            url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-            headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-            async with aiohttp.ClientSession() as session:
-                await session.post(url, json={"type": 7, "data": payload}, headers=headers)
+            await send_components_v2(interaction, payload, UPDATE_MESSAGE, label="XOX")
 
         elif custom_id.startswith("xox_move_"):
             try:
@@ -266,8 +253,9 @@ class XOX(commands.Cog):
                         economy = self.get_economy()
                         if economy:
                             loser = game.player2 if game.winner.id == game.player1.id else game.player1
-                            # Transfer money
-                            economy.transfer_money(loser.id, game.winner.id, game.bet)
+                            # Transfer money (fails safely if the loser can no longer pay)
+                            results = await economy.transfer_many([(loser.id, game.winner.id, game.bet)], reason="xox")
+                            game.bet_paid = results[0] is not None
                     
                     # Remove game from memory
                     del self.games[msg_id]
@@ -275,10 +263,7 @@ class XOX(commands.Cog):
                 payload = self.build_payload(game)
                 
                 # Update Message (Type 7)
-                url = f"https://discord.com/api/v10/interactions/{interaction.id}/{interaction.token}/callback"
-                headers = {"Authorization": f"Bot {self.bot.http.token}", "Content-Type": "application/json"}
-                async with aiohttp.ClientSession() as session:
-                    await session.post(url, json={"type": 7, "data": payload}, headers=headers)
+                await send_components_v2(interaction, payload, UPDATE_MESSAGE, label="XOX")
             else:
                  await interaction.response.send_message("❌ Langkah tidak valid!", ephemeral=True)
 
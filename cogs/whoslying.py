@@ -6,7 +6,6 @@ import random
 import asyncio
 from datetime import datetime
 from typing import Dict, List, Optional
-from utils.database import get_db_connection
 
 # =============================================
 # CONFIGURATION - EDIT THESE TO CUSTOMIZE GAME
@@ -32,19 +31,14 @@ DISCUSSION_TIME = 30  # seconds
 VOTE_TIME = 30  # seconds
 CLUE_TIMEOUT = 45  # seconds for each player to give clue (increased slightly for modal)
 
-# Initialize database
-def init_db():
-    pass
-
-init_db()
-
 # =============================================
 # GAME IMPLEMENTATION
 # =============================================
 
 class WhosLyingGame:
-    def __init__(self, channel_id: int):
+    def __init__(self, channel_id: int, db):
         self.channel_id = channel_id
+        self.db = db
         self.players: List[discord.Member] = []
         self.impostor: Optional[discord.Member] = None
         self.current_theme = ""
@@ -64,45 +58,34 @@ class WhosLyingGame:
         self.clue_timeout_task = None
         self.current_clue_giver: Optional[discord.Member] = None
         
-    def add_player(self, member: discord.Member) -> bool:
+    async def add_player(self, member: discord.Member) -> bool:
         if len(self.players) >= MAX_PLAYERS:
             return False
         if member not in self.players:
             self.players.append(member)
-            self.save_players()
+            await self.save_players()
             return True
         return False
     
-    def remove_player(self, member: discord.Member) -> bool:
+    async def remove_player(self, member: discord.Member) -> bool:
         if member in self.players:
             self.players.remove(member)
-            self.save_players()
+            await self.save_players()
             return True
         return False
     
-    def save_players(self):
+    async def save_players(self):
         """Save current players to database"""
-        conn = get_db_connection()
-        if not conn: return
-        try:
-            c = conn.cursor()
-            c.execute("DELETE FROM game_players WHERE channel_id = %s", (self.channel_id,))
-            for player in self.players:
-                c.execute("INSERT INTO game_players VALUES (%s, %s)", (self.channel_id, player.id))
-            conn.commit()
-        finally:
-            conn.close()
+        async with self.db.transaction() as c:
+            await c.execute("DELETE FROM game_players WHERE channel_id = %s", (self.channel_id,))
+            if self.players:
+                await c.executemany("INSERT INTO game_players VALUES (%s, %s)",
+                                    [(self.channel_id, player.id) for player in self.players])
     
-    def load_players(self, bot):
+    async def load_players(self, bot):
         """Load players from database"""
-        conn = get_db_connection()
-        if not conn: return
-        try:
-            c = conn.cursor()
-            c.execute("SELECT user_id FROM game_players WHERE channel_id = %s", (self.channel_id,))
-            player_ids = [row[0] for row in c.fetchall()]
-        finally:
-            conn.close()
+        rows = await self.db.fetchall("SELECT user_id FROM game_players WHERE channel_id = %s", (self.channel_id,))
+        player_ids = [row[0] for row in rows]
         
         self.players = []
         for user_id in player_ids:
@@ -110,36 +93,20 @@ class WhosLyingGame:
             if user:
                 self.players.append(user)
     
-    def save_game_state(self):
+    async def save_game_state(self):
         """Save current game state to database"""
-        conn = get_db_connection()
-        if not conn: return
-        try:
-            c = conn.cursor()
-            
-            if self.game_active:
-                c.execute('''REPLACE INTO active_games 
-                             VALUES (%s, %s, %s, %s, %s, %s)''',
-                         (self.channel_id, self.current_theme, self.current_word,
-                          self.current_session, self.impostor.id if self.impostor else None,
-                          self.session_phase))
-            else:
-                c.execute("DELETE FROM active_games WHERE channel_id = %s", (self.channel_id,))
-            
-            conn.commit()
-        finally:
-            conn.close()
+        if self.game_active:
+            await self.db.execute('''REPLACE INTO active_games 
+                                     VALUES (%s, %s, %s, %s, %s, %s)''',
+                                  (self.channel_id, self.current_theme, self.current_word,
+                                   self.current_session, self.impostor.id if self.impostor else None,
+                                   self.session_phase))
+        else:
+            await self.db.execute("DELETE FROM active_games WHERE channel_id = %s", (self.channel_id,))
     
-    def load_game_state(self, bot):
+    async def load_game_state(self, bot):
         """Load game state from database"""
-        conn = get_db_connection()
-        if not conn: return
-        try:
-            c = conn.cursor()
-            c.execute("SELECT theme, word, session, impostor_id, phase FROM active_games WHERE channel_id = %s", (self.channel_id,))
-            result = c.fetchone()
-        finally:
-            conn.close()
+        result = await self.db.fetchone("SELECT theme, word, session, impostor_id, phase FROM active_games WHERE channel_id = %s", (self.channel_id,))
         
         if result:
             self.current_theme = result[0]
@@ -155,7 +122,7 @@ class WhosLyingGame:
                 self.current_player_index = len(self.clues_given)
 
     
-    def start_game(self) -> bool:
+    async def start_game(self) -> bool:
         if len(self.players) < MIN_PLAYERS:
             return False
         
@@ -175,7 +142,7 @@ class WhosLyingGame:
         self.voted_players = set()
         
         # Save game state
-        self.save_game_state()
+        await self.save_game_state()
         
         return True
     
@@ -251,7 +218,7 @@ class WhosLyingGame:
         # Check if current player still hasn't given clue
         if self.current_clue_giver and self.current_clue_giver.id not in self.clues_given:
             self.clues_given[self.current_clue_giver.id] = "(Tidak memberikan clue)"
-            self.save_game_state()
+            await self.save_game_state()
             
             embed = discord.Embed(
                 title="⏰ Waktu Habis!",
@@ -263,7 +230,7 @@ class WhosLyingGame:
         # Move to next player
         await self.next_player_turn(cog)
     
-    def reset_game(self):
+    async def reset_game(self):
         self.impostor = None
         self.current_theme = ""
         self.current_word = ""
@@ -283,7 +250,7 @@ class WhosLyingGame:
             self.clue_timeout_task.cancel()
         
         # Clear game state from database
-        self.save_game_state()
+        await self.save_game_state()
 
 # ==========================================
 # NEW: Clue Modal & View
@@ -305,7 +272,7 @@ class ClueModal(discord.ui.Modal, title="Berikan Clue"):
         clue = self.clue_input.value
         
         self.game.clues_given[interaction.user.id] = clue
-        self.game.save_game_state()
+        await self.game.save_game_state()
         
         await interaction.response.send_message(f"✅ Clue berhasil diberikan: \"{clue}\"", ephemeral=True)
         
@@ -473,7 +440,7 @@ class ContinueVoteView(discord.ui.View):
                 self.game.player_order = random.sample(self.game.players, len(self.game.players))
                 self.game.current_player_index = 0
                 self.game.session_phase = "clue_giving"
-                self.game.save_game_state()
+                await self.game.save_game_state()
                 
                 embed = discord.Embed(
                     title="✅ Game Berlanjut!",
@@ -489,7 +456,7 @@ class ContinueVoteView(discord.ui.View):
                 self.game.session_phase = "voting_impostor"
                 self.game.impostor_votes = {}
                 self.game.voted_players = set()
-                self.game.save_game_state()
+                await self.game.save_game_state()
                 
                 embed = discord.Embed(
                     title="🎯 Waktunya Vote Impostor!",
@@ -565,7 +532,7 @@ class PersistentGameControlView(discord.ui.View):
             await interaction.response.send_message("❌ Game sudah dimulai! Tunggu hingga selesai.", ephemeral=True)
             return
         
-        if self.game.add_player(interaction.user):
+        if await self.game.add_player(interaction.user):
             embed = self.cog.create_lobby_embed(self.game)
             await interaction.response.edit_message(embed=embed, view=self)
             await interaction.followup.send(f"✅ {interaction.user.display_name} bergabung ke game!", ephemeral=True)
@@ -577,7 +544,7 @@ class PersistentGameControlView(discord.ui.View):
             await interaction.response.send_message("❌ Tidak bisa keluar saat game sedang berlangsung!", ephemeral=True)
             return
             
-        if self.game.remove_player(interaction.user):
+        if await self.game.remove_player(interaction.user):
             embed = self.cog.create_lobby_embed(self.game)
             await interaction.response.edit_message(embed=embed, view=self)
             await interaction.followup.send(f"👋 {interaction.user.display_name} keluar dari game!", ephemeral=True)
@@ -593,7 +560,7 @@ class PersistentGameControlView(discord.ui.View):
             await interaction.response.send_message(f"❌ Minimal {MIN_PLAYERS} pemain diperlukan untuk memulai game!", ephemeral=True)
             return
         
-        if not self.game.start_game():
+        if not await self.game.start_game():
             await interaction.response.send_message("❌ Gagal memulai game!", ephemeral=True)
             return
         
@@ -607,7 +574,7 @@ class PersistentGameControlView(discord.ui.View):
             await interaction.response.send_message("❌ Tidak ada game yang sedang berlangsung!", ephemeral=True)
             return
         
-        self.game.reset_game()
+        await self.game.reset_game()
         embed = self.cog.create_lobby_embed(self.game)
         await interaction.response.edit_message(embed=embed, view=self)
         await interaction.followup.send("⏹️ Game dihentikan!", ephemeral=True)
@@ -736,15 +703,7 @@ class WhosLying(commands.Cog):
 
     async def restore_lobbies(self):
         """Restore existing lobbies after bot restart"""
-        conn = get_db_connection()
-        if not conn: return
-        
-        try:
-            c = conn.cursor()
-            c.execute("SELECT channel_id, message_id FROM lobby_messages")
-            lobbies = c.fetchall()
-        finally:
-            conn.close()
+        lobbies = await self.client.db.fetchall("SELECT channel_id, message_id FROM lobby_messages")
         
         for channel_id, message_id in lobbies:
             try:
@@ -758,8 +717,8 @@ class WhosLying(commands.Cog):
                 
                 # Recreate game and load players
                 game = self.get_or_create_game(channel_id)
-                game.load_players(self.client)
-                game.load_game_state(self.client)
+                await game.load_players(self.client)
+                await game.load_game_state(self.client)
                 
                 # Update message with new view
                 if game.game_active:
@@ -775,19 +734,13 @@ class WhosLying(commands.Cog):
             except Exception as e:
                 print(f"❌ Failed to restore lobby {channel_id}: {e}")
                 # Remove invalid lobby from database
-                conn = get_db_connection()
-                if conn:
-                    try:
-                        c = conn.cursor()
-                        c.execute("DELETE FROM lobby_messages WHERE channel_id = %s", (channel_id,))
-                        c.execute("DELETE FROM active_games WHERE channel_id = %s", (channel_id,))
-                        conn.commit()
-                    finally:
-                        conn.close()
+                async with self.client.db.transaction() as c:
+                    await c.execute("DELETE FROM lobby_messages WHERE channel_id = %s", (channel_id,))
+                    await c.execute("DELETE FROM active_games WHERE channel_id = %s", (channel_id,))
 
     def get_or_create_game(self, channel_id: int) -> WhosLyingGame:
         if channel_id not in self.games:
-            self.games[channel_id] = WhosLyingGame(channel_id)
+            self.games[channel_id] = WhosLyingGame(channel_id, self.client.db)
         return self.games[channel_id]
 
     # ... (create_lobby_embed and create_game_embed are unchanged)
@@ -809,14 +762,7 @@ class WhosLying(commands.Cog):
         )
         
         # Save channel to database
-        conn = get_db_connection()
-        if conn:
-            try:
-                c = conn.cursor()
-                c.execute("INSERT IGNORE INTO game_channels VALUES (%s, %s)", (channel.id, guild.id))
-                conn.commit()
-            finally:
-                conn.close()
+        await self.client.db.execute("INSERT IGNORE INTO game_channels VALUES (%s, %s)", (channel.id, guild.id))
         
         game = self.get_or_create_game(channel.id)
         embed = self.create_lobby_embed(game)
@@ -826,14 +772,7 @@ class WhosLying(commands.Cog):
         game.control_panel_message = control_message
         
         # Save lobby message to database
-        conn = get_db_connection()
-        if conn:
-            try:
-                c = conn.cursor()
-                c.execute("REPLACE INTO lobby_messages VALUES (%s, %s)", (channel.id, control_message.id))
-                conn.commit()
-            finally:
-                conn.close()
+        await self.client.db.execute("REPLACE INTO lobby_messages VALUES (%s, %s)", (channel.id, control_message.id))
         
         await interaction.response.send_message(f"✅ Game channel berhasil dibuat: {channel.mention}\n\n🔄 **Lobby akan tetap berfungsi meski bot di-restart!**", ephemeral=True)
 
@@ -841,7 +780,7 @@ class WhosLying(commands.Cog):
 
     async def cleanup_channel(self, channel: discord.TextChannel, game: WhosLyingGame):
         """Cleanup the game channel"""
-        game.reset_game()
+        await game.reset_game()
         
         def is_not_control_panel(m):
             return m.id != game.control_panel_message.id if game.control_panel_message else True
@@ -867,18 +806,11 @@ class WhosLying(commands.Cog):
             game.control_panel_message = await channel.send(embed=embed, view=view)
         
         # Save lobby message to database
-        conn = get_db_connection()
-        if conn:
-            try:
-                c = conn.cursor()
-                c.execute("REPLACE INTO lobby_messages VALUES (%s, %s)", (channel.id, game.control_panel_message.id))
-                conn.commit()
-            finally:
-                conn.close()
+        await self.client.db.execute("REPLACE INTO lobby_messages VALUES (%s, %s)", (channel.id, game.control_panel_message.id))
 
     async def cleanup_and_restart(self, channel: discord.TextChannel, game: WhosLyingGame):
         """Cleanup and restart the game"""
-        game.reset_game()
+        await game.reset_game()
         
         def is_not_control_panel(m):
             return m.id != game.control_panel_message.id if game.control_panel_message else True
@@ -901,18 +833,11 @@ class WhosLying(commands.Cog):
             game.control_panel_message = await channel.send(embed=embed, view=view)
         
         # Save lobby message to database
-        conn = get_db_connection()
-        if conn:
-            try:
-                c = conn.cursor()
-                c.execute("REPLACE INTO lobby_messages VALUES (%s, %s)", (channel.id, game.control_panel_message.id))
-                conn.commit()
-            finally:
-                conn.close()
+        await self.client.db.execute("REPLACE INTO lobby_messages VALUES (%s, %s)", (channel.id, game.control_panel_message.id))
         
         # Start new game
         if len(game.players) >= MIN_PLAYERS:
-            if game.start_game():
+            if await game.start_game():
                 await self.start_game_sequence(game)
 
 async def setup(client):
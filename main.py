@@ -4,6 +4,10 @@ import os
 import asyncio
 import traceback
 from dotenv import load_dotenv
+from utils.database import Database, pool_config
+from utils.migrations import run_migrations
+from utils.interaction_router import InteractionRouter
+from utils.component_index import ComponentIndex
 #
 load_dotenv()
 
@@ -16,6 +20,19 @@ intents.members = True
 # Buat bot instance DENGAN prefix, agar !reload bisa berfungsi
 bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
 
+# Single async pool shared by all cogs (self.bot.db), sized from DB_POOL_MIN/DB_POOL_MAX
+bot.db = Database(**pool_config)
+
+# Component clicks are routed by custom_id to the one cog that registered it (self.bot.router)
+bot.router = InteractionRouter()
+
+# Dashboard role buttons, parsed once and re-polled for changes (self.bot.component_index)
+bot.component_index = ComponentIndex(bot.db)
+
+@bot.listen()
+async def on_interaction(interaction: discord.Interaction):
+    await bot.router.dispatch(interaction)
+
 @bot.event
 async def on_ready():
     print(f'✅ Logged in as {bot.user}')
@@ -53,8 +70,30 @@ async def main():
         return
 
     async with bot:
-        await load_cogs()
-        await bot.start(TOKEN)
+        try:
+            await bot.db.connect()
+            # Schema changes run once here, before any cog touches the tables
+            migrated = await run_migrations(bot.db)
+        except Exception as e:
+            print(f"❌ Gagal konek database: {e}")
+            migrated = False
+        if not migrated:
+            # Every cog needs the pool and an up-to-date schema, so don't start half-working
+            print("❌ Database tidak siap, bot tidak dijalankan.")
+            await bot.db.close()
+            raise SystemExit(1)
+        await bot.component_index.ensure_loaded()
+        try:
+            bot.component_index.start()
+            await load_cogs()
+            await bot.start(TOKEN)
+        finally:
+            bot.component_index.stop()
+            # Write buffered balance changes before the pool goes away
+            economy = bot.get_cog("Economy")
+            if economy:
+                await economy.flush_balances()
+            await bot.db.close()
 
 if __name__ == "__main__":
     try:
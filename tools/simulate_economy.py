@@ -0,0 +1,320 @@
+"""Offline Monte Carlo simulator for the fishing economy.
+
+Runs millions of simulated casts, forges and salvages against the *same*
+tables the bot uses (fish_data, rod_data, forge_data, buff_item_data and the
+alias samplers compiled by cogs/Fishing.py), so balance changes can be checked
+before they reach live players. Also doubles as a throughput benchmark for the
+roll engine.
+
+Needs numpy (only for this tool, the bot does not use it):
+    pip install numpy
+
+Examples:
+    python tools/simulate_economy.py
+    python tools/simulate_economy.py --casts 5000000 --trials 200000 --seed 7
+    python tools/simulate_economy.py --bench --bench-rolls 2000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ numpy belum terinstall. Jalankan: pip install numpy")
+    sys.exit(1)
+
+from cogs.Fishing import Fishing
+
+RARITIES = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
+
+# Shop price of one Lucky Charm (consumed on every charmed forge attempt)
+LUCKY_CHARM_PRICE = 100_000
+
+RISK_CODES = {"none": 0, "downgrade": 1, "reset": 2, "destroy": 3}
+
+BUFF_SETS = {
+    "none": (),
+    "all": ("Rokok Surya", "Kail Mata Dua", "Pancing Magnet"),
+}
+
+
+def load_fishing():
+    """The real cog (no bot / database needed to read its tables)."""
+    return Fishing(SimpleNamespace(db=None))
+
+
+class VectorTables:
+    """NumPy views of the cog's alias samplers."""
+
+    def __init__(self, fishing):
+        self.fishing = fishing
+        self.fish = []
+        for rarity in RARITIES:
+            sampler = fishing.fish_samplers[rarity]
+            self.fish.append({
+                "prob": np.array(sampler.prob),
+                "alias": np.array(sampler.alias),
+                "base_price": np.array([f["base_price"] for f in sampler.items], dtype=np.float64),
+                "min_w": np.array([f["min_weight"] for f in sampler.items], dtype=np.float64),
+                "max_w": np.array([f["max_weight"] for f in sampler.items], dtype=np.float64),
+            })
+        self._rarity = {}
+
+    def rarity_arrays(self, rarity_boost):
+        key = round(rarity_boost, 4)
+        if key not in self._rarity:
+            sampler = self.fishing.get_rarity_sampler(rarity_boost)
+            assert sampler.items == RARITIES
+            self._rarity[key] = (np.array(sampler.prob), np.array(sampler.alias))
+        return self._rarity[key]
+
+
+def alias_draw(rng, prob, alias, n):
+    i = rng.integers(0, len(prob), n)
+    return np.where(rng.random(n) < prob[i], i, alias[i])
+
+
+def roll_fish(tables, rng, rarity_boost, weight_boost, n):
+    """Vectorised Fishing.catch roll. Returns (rarity index, weight, price) arrays."""
+    rarity = alias_draw(rng, *tables.rarity_arrays(rarity_boost), n)
+    weight = np.zeros(n)
+    price = np.zeros(n, dtype=np.int64)
+    for ri, table in enumerate(tables.fish):
+        mask = rarity == ri
+        k = int(mask.sum())
+        if not k:
+            continue
+        fi = alias_draw(rng, table["prob"], table["alias"], k)
+        w = np.round(rng.uniform(table["min_w"][fi], table["max_w"][fi]) * weight_boost, 2)
+        weight[mask] = w
+        price[mask] = (table["base_price"][fi] * (w / table["min_w"][fi])).astype(np.int64)
+    return rarity, weight, price
+
+
+def rod_boosts(fishing, rod_name, level):
+    stats = fishing.rod_data[rod_name]
+    weight_boost = stats["weight_boost"] + level * stats.get("scaling_weight", 0.1)
+    rarity_boost = stats["rarity_boost"] + level * stats.get("scaling_rarity", 1)
+    return weight_boost, rarity_boost
+
+
+def simulate_casts(tables, rng, rod_name, level, buffs, casts):
+    """Same rules as /fish catch: double catch, scrap and pearl drops, buff cooldown."""
+    fishing = tables.fishing
+    weight_boost, rarity_boost = rod_boosts(fishing, rod_name, level)
+
+    loot_boost, pearl_boost = (0.10, 0.03) if "Pancing Magnet" in buffs else (0, 0)
+    double_chance = 0.20 if "Kail Mata Dua" in buffs else 0
+    cooldown = 5.0 if "Rokok Surya" in buffs else 15.0
+
+    rarity, weight, price = roll_fish(tables, rng, rarity_boost, weight_boost, casts)
+    double = rng.random(casts) < double_chance
+    n_double = int(double.sum())
+
+    coins = price.copy()
+    best = rarity.copy()
+    fish_count = casts + n_double
+    rarity_counts = np.bincount(rarity, minlength=len(RARITIES))
+    if n_double:
+        r2, _, p2 = roll_fish(tables, rng, rarity_boost, weight_boost, n_double)
+        coins[double] += p2
+        best[double] = np.maximum(best[double], r2)
+        rarity_counts += np.bincount(r2, minlength=len(RARITIES))
+
+    scrap_hit = rng.random(casts) < 0.10 + loot_boost
+    scrap = np.where(scrap_hit, rng.integers(1, 4, casts), 0)
+    pearl = (best >= RARITIES.index("Rare")) & (rng.random(casts) < 0.01 + pearl_boost)
+
+    casts_per_hour = 3600 / cooldown
+    buff_cost_per_hour = sum(
+        fishing.buff_item_data[b]["price"] * 3600 / fishing.buff_item_data[b]["duration"] for b in buffs
+    )
+    return {
+        "coins_per_cast": float(coins.mean()),
+        "coins_per_hour": float(coins.mean() * casts_per_hour),
+        "fish_per_hour": fish_count / casts * casts_per_hour,
+        "scrap_per_hour": float(scrap.mean() * casts_per_hour),
+        "pearl_per_hour": float(pearl.mean() * casts_per_hour),
+        "buff_cost_per_hour": buff_cost_per_hour,
+        "rarity_share": rarity_counts / rarity_counts.sum(),
+        "avg_price_by_rarity": [
+            float(price[rarity == ri].mean()) if (rarity == ri).any() else 0.0 for ri in range(len(RARITIES))
+        ],
+    }
+
+
+def simulate_forge(fishing, rng, rod_name, trials, target_level, lucky_charm=False, max_attempts=5000):
+    """Forge from +0 until target_level or destruction, every trial in parallel."""
+    levels = fishing.forge_data[rod_name]["levels"]
+    top = max(levels)
+    rate = np.zeros(top + 2)
+    cost = np.zeros(top + 2)
+    scrap = np.zeros(top + 2)
+    pearl = np.zeros(top + 2)
+    risk = np.zeros(top + 2, dtype=np.int64)
+    for lvl, info in levels.items():
+        rate[lvl] = min(100, info["rate"] + (50 if lucky_charm else 0))
+        cost[lvl], scrap[lvl], pearl[lvl] = info["cost"], info["scrap"], info["pearl"]
+        risk[lvl] = RISK_CODES[info["risk"]]
+
+    level = np.zeros(trials, dtype=np.int64)
+    best = np.zeros(trials, dtype=np.int64)
+    alive = np.ones(trials, dtype=bool)
+    attempts = np.zeros(trials, dtype=np.int64)
+    spent = {"coins": np.zeros(trials), "scrap": np.zeros(trials), "pearl": np.zeros(trials)}
+
+    for _ in range(max_attempts):
+        active = np.flatnonzero(alive & (level < target_level))
+        if not active.size:
+            break
+        nxt = level[active] + 1
+        attempts[active] += 1
+        spent["coins"][active] += cost[nxt] + (LUCKY_CHARM_PRICE if lucky_charm else 0)
+        spent["scrap"][active] += scrap[nxt]
+        spent["pearl"][active] += pearl[nxt]
+
+        success = rng.integers(1, 101, active.size) <= rate[nxt]
+        fail_risk = np.where(success, -1, risk[nxt])
+
+        level[active[success]] = nxt[success]
+        down = active[fail_risk == RISK_CODES["downgrade"]]
+        level[down] = np.maximum(0, level[down] - 1)
+        level[active[fail_risk == RISK_CODES["reset"]]] = 0
+        alive[active[fail_risk == RISK_CODES["destroy"]]] = False
+        best = np.maximum(best, level)
+
+    reached = alive & (level >= target_level)
+    return {
+        "reach_rate": float(reached.mean()),
+        "destroy_rate": float((~alive).mean()),
+        "attempts_p50": float(np.percentile(attempts[reached], 50)) if reached.any() else float("nan"),
+        "attempts_p95": float(np.percentile(attempts[reached], 95)) if reached.any() else float("nan"),
+        "coins_mean": float(spent["coins"].mean()),
+        "scrap_mean": float(spent["scrap"].mean()),
+        "pearl_mean": float(spent["pearl"].mean()),
+        "best_level_share": np.bincount(best, minlength=top + 1)[: top + 1] / trials,
+    }
+
+
+def expected_quest_coins(fishing, samples=20000):
+    """Mean coin rewards per day from roll_quests (assumes every quest is finished)."""
+    random.seed(1)
+    daily = sum(q["reward_amount"] for _ in range(samples) for q in fishing.roll_quests("daily") if q["reward_type"] == "coin")
+    weekly = sum(q["reward_amount"] for _ in range(samples) for q in fishing.roll_quests("weekly") if q["reward_type"] == "coin")
+    return daily / samples + weekly / samples / 7
+
+
+def run_benchmark(fishing, tables, n):
+    print(f"\n⏱️  Roll engine benchmark ({n:,} rolls, Masterwork Rod +5)")
+    print("-" * 56)
+    weight_boost, rarity_boost = rod_boosts(fishing, "Masterwork Rod", 5)
+
+    # The pre-sampler implementation: rebuild lists + random.choices per roll
+    start = time.perf_counter()
+    for _ in range(n):
+        rarities = list(fishing.rarity_weights.keys())
+        weights = list(fishing.rarity_weights.values())
+        weights[2] += rarity_boost
+        weights[3] += rarity_boost
+        weights[4] += rarity_boost
+        rarity = random.choices(rarities, weights=weights, k=1)[0]
+        fish_list = fishing.fish_data[rarity]
+        random.choices(fish_list, weights=[f["spawn_weight"] for f in fish_list], k=1)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fishing.roll_n(rarity_boost, n)
+    alias_py = time.perf_counter() - start
+
+    rng = np.random.default_rng()
+    start = time.perf_counter()
+    roll_fish(tables, rng, rarity_boost, weight_boost, n)
+    alias_np = time.perf_counter() - start
+
+    for label, elapsed in (("random.choices (old)", baseline), ("Fishing.roll_n", alias_py), ("numpy alias", alias_np)):
+        print(f"{label:<24} | {elapsed:>7.3f}s | {n / elapsed:>14,.0f} rolls/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulator for the fishing economy")
+    parser.add_argument("--casts", type=int, default=1_000_000, help="simulated casts per rod/level/buff row")
+    parser.add_argument("--trials", type=int, default=100_000, help="forge runs per rod")
+    parser.add_argument("--levels", type=int, nargs="+", default=[0, 3, 5, 7, 10], help="rod levels to report")
+    parser.add_argument("--target", type=int, default=10, help="forge target level")
+    parser.add_argument("--players", type=int, default=50, help="active fishers (for inflation)")
+    parser.add_argument("--hours", type=float, default=2.0, help="fishing hours per player per day")
+    parser.add_argument("--supply", type=float, default=50_000_000, help="current total coin supply")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bench", action="store_true", help="also benchmark the roll engine")
+    parser.add_argument("--bench-rolls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    fishing = load_fishing()
+    tables = VectorTables(fishing)
+
+    # --- Catches ---
+    print(f"🎣 Catch economy ({args.casts:,} casts per row)")
+    print("-" * 96)
+    print(f"{'Rod':<16}{'Lv':>3} {'Buffs':<6}| {'coins/cast':>10} {'coins/h':>11} {'net/h':>11} {'fish/h':>7} {'scrap/h':>8} {'pearl/h':>8}")
+    print("-" * 96)
+    reference = None
+    for rod_name in fishing.rod_data:
+        for level in args.levels:
+            for buff_label, buffs in BUFF_SETS.items():
+                r = simulate_casts(tables, rng, rod_name, level, buffs, args.casts)
+                net = r["coins_per_hour"] - r["buff_cost_per_hour"]
+                print(f"{rod_name:<16}{level:>3} {buff_label:<6}| {r['coins_per_cast']:>10,.0f} {r['coins_per_hour']:>11,.0f} "
+                      f"{net:>11,.0f} {r['fish_per_hour']:>7.0f} {r['scrap_per_hour']:>8.1f} {r['pearl_per_hour']:>8.2f}")
+                if reference is None:
+                    reference = r
+
+    # --- Salvage ---
+    print("\n🔩 Salvage value (Common Rod +0, no buffs)")
+    print("-" * 64)
+    print(f"{'Rarity':<10} | {'avg price':>10} | {'bulk scrap':>10} | {'coins/scrap':>11} | {'share':>6}")
+    print("-" * 64)
+    for ri, rarity in enumerate(RARITIES):
+        avg = reference["avg_price_by_rarity"][ri]
+        # Bulk salvage yield comes from the cog; single-fish salvage gives randint(1, 3)
+        scrap = fishing.salvage_scrap[rarity]
+        print(f"{rarity:<10} | {avg:>10,.0f} | {scrap:>10} | {avg / scrap:>11,.0f} | {reference['rarity_share'][ri]:>6.2%}")
+    print(f"Single-fish salvage: E[scrap] = 2.0 per fish -> {reference['coins_per_cast'] / 2:,.0f} coins forgone per scrap")
+
+    # --- Forge ---
+    print(f"\n🔨 Forge +0 -> +{args.target} ({args.trials:,} runs per rod)")
+    print("-" * 104)
+    print(f"{'Rod':<16}{'Charm':<6}| {'reach':>7} {'destroy':>8} {'tries p50':>10} {'tries p95':>10} {'coins':>14} {'scrap':>8} {'pearl':>8}")
+    print("-" * 104)
+    for rod_name in fishing.forge_data:
+        for charm in (False, True):
+            f = simulate_forge(fishing, rng, rod_name, args.trials, args.target, charm)
+            print(f"{rod_name:<16}{'yes' if charm else 'no':<6}| {f['reach_rate']:>7.2%} {f['destroy_rate']:>8.2%} {f['attempts_p50']:>10.0f} "
+                  f"{f['attempts_p95']:>10.0f} {f['coins_mean']:>14,.0f} {f['scrap_mean']:>8.1f} {f['pearl_mean']:>8.1f}")
+        share = " ".join(f"+{lvl}:{p:.1%}" for lvl, p in enumerate(f["best_level_share"]) if p > 0)
+        print(f"{'':<22}best level reached (charm): {share}")
+
+    # --- Inflation ---
+    quest_coins = expected_quest_coins(fishing)
+    minted_per_day = args.players * (reference["coins_per_hour"] * args.hours + quest_coins)
+    print("\n📈 Inflation (Common Rod +0 baseline, all fish sold, all quests finished)")
+    print("-" * 56)
+    print(f"Quest coins per player/day : {quest_coins:>14,.0f}")
+    print(f"Coins minted per day       : {minted_per_day:>14,.0f}  ({args.players} players x {args.hours}h)")
+    print(f"Daily inflation            : {minted_per_day / args.supply:>14.3%}  (supply {args.supply:,.0f})")
+    print(f"Weekly inflation           : {(1 + minted_per_day / args.supply) ** 7 - 1:>14.3%}")
+
+    if args.bench:
+        run_benchmark(fishing, tables, args.bench_rolls)
+
+
+if __name__ == "__main__":
+    main()
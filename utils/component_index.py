@@ -0,0 +1,144 @@
+import json
+from datetime import datetime, timezone
+
+import discord
+from discord.ext import tasks
+
+from utils.cache import TTLCache
+
+
+class ComponentIndex:
+    """Parsed, in-memory view of the dashboard's ``reaction_role_messages`` table.
+
+    Role-button clicks are answered from two dicts:
+    ``(message_id, custom_id)`` for BotHandler and ``(guild_id, custom_id)`` for
+    RoleButtons, so a click never touches MySQL or ``json.loads``. The dashboard
+    writes the table directly, so a cheap fingerprint (row count + CRC of every
+    row) is polled and the index is rebuilt only when it changes.
+
+    Clicks on other components (Music, Fishing, Poll views...) are rejected
+    without a query: a message older than the last full load is known not to be
+    configured, and newer unknown messages are checked once and then kept in a
+    bounded TTL negative cache until the table changes. Dashboard edits to
+    existing messages therefore take effect after at most one poll interval.
+    """
+
+    def __init__(self, db, poll_seconds: float = 15.0):
+        self.db = db
+        self.by_message = {}   # (message_id, custom_id) -> component dict
+        self.by_guild = {}     # (guild_id, custom_id or select option value) -> component dict
+        self.message_ids = set()
+        self.fingerprint = None
+        self.loaded = False
+        self.last_error = None
+        self.loaded_at = None
+        self.negative = TTLCache(maxsize=4096, ttl=600)  # message_id -> True, known not configured
+        self.poller = tasks.loop(seconds=poll_seconds)(self.poll)
+
+    async def fetch_fingerprint(self):
+        return await self.db.fetchone('''
+            SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', message_id, guild_id, component_rows))), 0)
+            FROM reaction_role_messages
+        ''')
+
+    async def load(self):
+        """(Re)build the whole index; the table holds one row per dashboard message, so this is small"""
+        # Taken before reading so a message posted mid-load still counts as "newer"
+        started_at = datetime.now(timezone.utc)
+        fingerprint = await self.fetch_fingerprint()
+        rows = await self.db.fetchall('SELECT message_id, guild_id, component_rows FROM reaction_role_messages')
+
+        by_message, by_guild, message_ids = {}, {}, set()
+        for message_id, guild_id, raw in rows:
+            self.index_message(by_message, by_guild, message_ids, message_id, guild_id, raw)
+
+        self.by_message, self.by_guild, self.message_ids = by_message, by_guild, message_ids
+        self.fingerprint = tuple(fingerprint) if fingerprint else None
+        self.loaded_at = started_at
+        self.negative.clear()
+        self.loaded = True
+
+    @staticmethod
+    def index_message(by_message, by_guild, message_ids, message_id, guild_id, raw):
+        try:
+            message_id, guild_id = int(message_id), int(guild_id)
+            component_rows = json.loads(raw) if isinstance(raw, (str, bytes)) else (raw or [])
+        except (TypeError, ValueError) as e:
+            print(f"❌ Skipping reaction role message {message_id}: {e}")
+            return
+
+        message_ids.add(message_id)
+        for comp_row in component_rows:
+            for comp in comp_row:
+                custom_id = comp.get('custom_id')
+                if custom_id:
+                    by_message.setdefault((message_id, custom_id), comp)
+                    by_guild.setdefault((guild_id, custom_id), comp)
+                # RoleButtons also matches select menus by option value
+                if comp.get('type') == 3:
+                    for opt in comp.get('options') or []:
+                        if opt.get('value'):
+                            by_guild.setdefault((guild_id, opt['value']), comp)
+
+    async def ensure_loaded(self):
+        """Load on first use; on failure serve an empty index until the poller succeeds"""
+        if not self.loaded:
+            try:
+                await self.load()
+            except Exception as e:
+                self.report(e)
+                self.loaded = True
+
+    async def poll(self):
+        try:
+            fingerprint = await self.fetch_fingerprint()
+            if self.fingerprint is None or (tuple(fingerprint) if fingerprint else None) != self.fingerprint:
+                await self.load()
+            self.last_error = None
+        except Exception as e:
+            self.report(e)
+
+    def report(self, error):
+        # The table is created by the dashboard; don't repeat the same error every poll
+        if str(error) != self.last_error:
+            self.last_error = str(error)
+            print(f"❌ Component index refresh failed: {error}")
+
+    def start(self):
+        if not self.poller.is_running():
+            self.poller.start()
+
+    def stop(self):
+        self.poller.cancel()
+
+    async def resolve_message(self, message_id) -> bool:
+        """Is this a dashboard message? Only messages posted since the last load can cost a query.
+
+        A config attached to an *older* message is not looked up here (that
+        would cost a query for every Music/Fishing/Poll click); it becomes
+        clickable once the next fingerprint poll (``poll_seconds``) reloads.
+        """
+        message_id = int(message_id)
+        if message_id in self.message_ids:
+            return True
+        if self.loaded_at and discord.utils.snowflake_time(message_id) < self.loaded_at:
+            return False
+        if message_id in self.negative:
+            return False
+
+        row = await self.db.fetchone(
+            'SELECT guild_id, component_rows FROM reaction_role_messages WHERE message_id = %s',
+            (str(message_id),)
+        )
+        if row is None:
+            self.negative.set(message_id, True)
+            return False
+        # Posted after the last poll: index it now instead of waiting for the next rebuild
+        self.index_message(self.by_message, self.by_guild, self.message_ids, message_id, row[0], row[1])
+        return True
+
+    def get_message_component(self, message_id, custom_id):
+        return self.by_message.get((int(message_id), custom_id))
+
+    def get_guild_component(self, guild_id, custom_id):
+        return self.by_guild.get((int(guild_id), custom_id))
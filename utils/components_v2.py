@@ -0,0 +1,43 @@
+import discord
+from discord.http import Route
+
+# Interaction callback types used with raw Components V2 payloads
+CHANNEL_MESSAGE = 4
+DEFERRED_UPDATE = 6
+UPDATE_MESSAGE = 7
+
+
+async def send_components_v2(interaction: discord.Interaction, payload: dict = None, response_type: int = CHANNEL_MESSAGE, label: str = "Components V2"):
+    """Answer an interaction with a raw payload. Returns True on success.
+
+    Goes through the bot's own HTTP client (``bot.http``), so every call reuses
+    discord.py's pooled keep-alive session and rate limit handling instead of
+    opening a new TCP/TLS connection per button press.
+    """
+    body = {"type": response_type}
+    if payload is not None:
+        body["data"] = payload
+    route = Route(
+        "POST", "/interactions/{webhook_id}/{webhook_token}/callback",
+        webhook_id=interaction.id, webhook_token=interaction.token
+    )
+    try:
+        await interaction.client.http.request(route, json=body)
+    except discord.HTTPException as e:
+        print(f"❌ Error sending {label} payload: {e.status} {e.text}")
+        return False
+    return True
+
+
+async def edit_components_v2(interaction: discord.Interaction, payload: dict, label: str = "Components V2"):
+    """PATCH the original interaction response with a raw payload. Returns True on success."""
+    route = Route(
+        "PATCH", "/webhooks/{webhook_id}/{webhook_token}/messages/@original",
+        webhook_id=interaction.application_id, webhook_token=interaction.token
+    )
+    try:
+        await interaction.client.http.request(route, json=payload)
+    except discord.HTTPException as e:
+        print(f"❌ Error updating {label} message: {e.status} {e.text}")
+        return False
+    return True
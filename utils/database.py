@@ -1,6 +1,12 @@
 import mysql.connector
 from mysql.connector import pooling
+import aiomysql
 import os
+import re
+import json
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,8 +19,258 @@ db_config = {
     "port": int(os.getenv("DB_PORT", 3306))
 }
 
-# Create a connection pool to handle multiple connections efficiently
-# This avoids "Lost connection to MySQL server" errors during high load
+# Size of the single bot-wide pool (see main.py)
+pool_config = {
+    "minsize": int(os.getenv("DB_POOL_MIN", 1)),
+    "maxsize": int(os.getenv("DB_POOL_MAX", 10))
+}
+
+# Statements slower than this are printed to the console (milliseconds)
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class QueryStats:
+    """Per-fingerprint timings, row counts, pool wait and a slow-query log.
+
+    Percentiles are computed over the most recent ``sample_size`` executions
+    of each fingerprint so memory stays bounded no matter how long the bot runs.
+    """
+
+    _ws = re.compile(r"\s+")
+    _literals = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b")
+    _placeholder_lists = re.compile(r"\((?:\s*\?\s*,)*\s*\?\s*\)")
+    _repeated_rows = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, sample_size: int = 500, slow_log_size: int = 50):
+        self.slow_ms = slow_ms
+        self.sample_size = sample_size
+        self.started_at = time.time()
+        self.queries = {}  # fingerprint -> {"count", "errors", "rows", "total_ms", "max_ms", "samples"}
+        self.pool_wait = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "samples": deque(maxlen=sample_size)}
+        self.slow_log = deque(maxlen=slow_log_size)
+
+    @classmethod
+    def fingerprint(cls, query: str) -> str:
+        """Normalise a statement so calls that only differ by values share a bucket."""
+        fp = cls._ws.sub(" ", query).strip()
+        fp = fp.replace("%s", "?")
+        fp = cls._literals.sub("?", fp)
+        # IN (...) / multi-row VALUES lists of any length collapse together
+        fp = cls._placeholder_lists.sub("(?+)", fp)
+        fp = cls._repeated_rows.sub("(?+), ...", fp)
+        return fp
+
+    def record_query(self, query: str, elapsed_ms: float, rows: int = 0, error: bool = False):
+        fp = self.fingerprint(query)
+        entry = self.queries.get(fp)
+        if entry is None:
+            entry = {"count": 0, "errors": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0,
+                     "samples": deque(maxlen=self.sample_size)}
+            self.queries[fp] = entry
+
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["samples"].append(elapsed_ms)
+        if error:
+            entry["errors"] += 1
+        elif rows and rows > 0:
+            entry["rows"] += rows
+
+        if elapsed_ms >= self.slow_ms:
+            self.slow_log.append({"at": time.time(), "ms": round(elapsed_ms, 2), "rows": rows, "query": fp})
+            print(f"🐢 Slow query ({elapsed_ms:.0f} ms, {rows} rows): {fp[:300]}")
+
+    def record_pool_wait(self, elapsed_ms: float):
+        self.pool_wait["count"] += 1
+        self.pool_wait["total_ms"] += elapsed_ms
+        self.pool_wait["max_ms"] = max(self.pool_wait["max_ms"], elapsed_ms)
+        self.pool_wait["samples"].append(elapsed_ms)
+
+    @staticmethod
+    def _summarise(entry):
+        ordered = sorted(entry["samples"])
+        count = entry["count"]
+        return {
+            "count": count,
+            "total_ms": round(entry["total_ms"], 2),
+            "avg_ms": round(entry["total_ms"] / count, 2) if count else 0.0,
+            "p50_ms": round(_percentile(ordered, 50), 2),
+            "p95_ms": round(_percentile(ordered, 95), 2),
+            "p99_ms": round(_percentile(ordered, 99), 2),
+            "max_ms": round(entry["max_ms"], 2),
+        }
+
+    def snapshot(self, pool=None) -> dict:
+        """Plain-dict view of everything collected, sorted by total time spent."""
+        queries = []
+        for fp, entry in self.queries.items():
+            summary = self._summarise(entry)
+            summary.update({
+                "query": fp,
+                "errors": entry["errors"],
+                "rows": entry["rows"],
+                "avg_rows": round(entry["rows"] / entry["count"], 2) if entry["count"] else 0.0,
+            })
+            queries.append(summary)
+        queries.sort(key=lambda q: q["total_ms"], reverse=True)
+
+        data = {
+            "since": self.started_at,
+            "slow_query_ms": self.slow_ms,
+            "queries": queries,
+            "pool_wait": self._summarise(self.pool_wait),
+            "slow_log": list(self.slow_log),
+        }
+        if pool is not None:
+            data["pool"] = {"size": pool.size, "free": pool.freesize,
+                            "minsize": pool.minsize, "maxsize": pool.maxsize}
+        return data
+
+    def dump_json(self, path: str, pool=None):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(pool), f, indent=2, ensure_ascii=False)
+        return path
+
+    def reset(self):
+        self.__init__(self.slow_ms, self.sample_size, self.slow_log.maxlen)
+
+
+class _TimedCursor:
+    """Cursor proxy that reports every execute/executemany to ``QueryStats``."""
+
+    def __init__(self, cursor, stats: QueryStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    async def _timed(self, method, query, args):
+        start = time.perf_counter()
+        try:
+            result = await method(query, args)
+        except Exception:
+            self._stats.record_query(query, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        self._stats.record_query(query, (time.perf_counter() - start) * 1000, self._cursor.rowcount)
+        return result
+
+    async def execute(self, query, args=None):
+        return await self._timed(self._cursor.execute, query, args)
+
+    async def executemany(self, query, args):
+        return await self._timed(self._cursor.executemany, query, args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class Database:
+    """Async MySQL access shared by every cog through ``bot.db``.
+
+    Each coroutine borrows a pooled connection only for the duration of the
+    statement, so a slow MySQL round-trip suspends the calling task instead of
+    blocking the whole event loop (heartbeats, other guilds, interactions).
+    There is exactly one instance per bot; cogs must not create their own pools.
+    """
+
+    def __init__(self, minsize: int = pool_config["minsize"], maxsize: int = pool_config["maxsize"]):
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.pool = None
+        self.closed = False
+        self.stats = QueryStats()
+
+    async def connect(self):
+        """Create the aiomysql pool. Safe to call more than once, but not after ``close()``."""
+        if self.closed:
+            # A late task during shutdown would otherwise open a pool nobody closes
+            raise RuntimeError("Database is closed")
+        if self.pool is None:
+            self.pool = await aiomysql.create_pool(
+                host=db_config["host"],
+                port=db_config["port"],
+                user=db_config["user"],
+                password=db_config["password"],
+                db=db_config["database"],
+                minsize=self.minsize,
+                maxsize=self.maxsize,
+                autocommit=True,
+                pool_recycle=3600,
+            )
+            print(f"✅ Async database pool created (min={self.minsize}, max={self.maxsize})")
+        return self.pool
+
+    async def close(self):
+        self.closed = True
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    @asynccontextmanager
+    async def _acquire(self):
+        """Borrow a pooled connection, recording how long we waited for it."""
+        pool = await self.connect()
+        start = time.perf_counter()
+        conn = await pool.acquire()
+        self.stats.record_pool_wait((time.perf_counter() - start) * 1000)
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    @asynccontextmanager
+    async def cursor(self, dictionary: bool = False):
+        """Borrow a connection and yield a cursor (autocommit, no transaction)."""
+        async with self._acquire() as conn:
+            cursor_cls = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+            async with conn.cursor(cursor_cls) as cur:
+                yield _TimedCursor(cur, self.stats)
+
+    async def fetchone(self, query: str, args=None, dictionary: bool = False):
+        async with self.cursor(dictionary) as cur:
+            await cur.execute(query, args)
+            return await cur.fetchone()
+
+    async def fetchall(self, query: str, args=None, dictionary: bool = False):
+        async with self.cursor(dictionary) as cur:
+            await cur.execute(query, args)
+            return await cur.fetchall()
+
+    async def execute(self, query: str, args=None) -> int:
+        """Run a single statement and return the affected row count."""
+        async with self.cursor() as cur:
+            return await cur.execute(query, args)
+
+    async def executemany(self, query: str, seq_args) -> int:
+        async with self.cursor() as cur:
+            return await cur.executemany(query, seq_args)
+
+    @asynccontextmanager
+    async def transaction(self, dictionary: bool = False):
+        """Yield a cursor whose statements commit together or roll back together."""
+        async with self._acquire() as conn:
+            await conn.begin()
+            cursor_cls = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+            try:
+                async with conn.cursor(cursor_cls) as cur:
+                    yield _TimedCursor(cur, self.stats)
+                await conn.commit()
+            except BaseException:
+                await conn.rollback()
+                raise
+
+
+# --- Legacy sync shim ---
+# Only kept for code that cannot await (offline scripts). Bot code must use
+# ``bot.db`` instead, since these calls block the event loop. The pool is only
+# created on first call, so the running bot never opens it.
 connection_pool = None
 
 def get_db_connection():
@@ -0,0 +1,75 @@
+import traceback
+
+import discord
+
+
+class InteractionRouter:
+    """Dispatches component interactions to the one handler owning their custom_id.
+
+    Cogs register exact ids or prefixes once (usually in ``cog_load``) instead
+    of each listening to ``on_interaction``. A click costs one dict lookup per
+    distinct prefix length, longest prefix first. Ids nobody registered go to
+    the fallback handlers (dashboard-configured components), tried in priority
+    order until one returns True.
+    """
+
+    def __init__(self):
+        self.exact = {}        # custom_id -> (owner, handler)
+        self.prefixes = {}     # prefix -> (owner, handler); handler None = ignore
+        self.prefix_lengths = []
+        self.fallbacks = []    # [(priority, owner, handler)]
+
+    def add_exact(self, custom_id, handler, owner=None):
+        self.exact[custom_id] = (owner, handler)
+
+    def add_prefix(self, prefix, handler, owner=None):
+        self.prefixes[prefix] = (owner, handler)
+        self.prefix_lengths = sorted({len(p) for p in self.prefixes}, reverse=True)
+
+    def ignore_prefix(self, prefix, owner=None):
+        """Ids handled elsewhere (e.g. a persistent discord.ui.View) never reach the fallbacks"""
+        self.add_prefix(prefix, None, owner)
+
+    def add_fallback(self, handler, owner=None, priority=0):
+        """``handler(interaction) -> bool``; True means the click was handled"""
+        self.fallbacks.append((priority, owner, handler))
+        self.fallbacks.sort(key=lambda entry: entry[0])
+
+    def remove_owner(self, owner):
+        """Drop everything a cog registered (call from cog_unload so !reload doesn't double up)"""
+        self.exact = {k: v for k, v in self.exact.items() if v[0] is not owner}
+        self.prefixes = {k: v for k, v in self.prefixes.items() if v[0] is not owner}
+        self.prefix_lengths = sorted({len(p) for p in self.prefixes}, reverse=True)
+        self.fallbacks = [entry for entry in self.fallbacks if entry[1] is not owner]
+
+    def resolve(self, custom_id):
+        """(found, handler) for a custom_id; found is False when only the fallbacks apply"""
+        entry = self.exact.get(custom_id)
+        if entry is not None:
+            return True, entry[1]
+        for length in self.prefix_lengths:
+            if length <= len(custom_id):
+                entry = self.prefixes.get(custom_id[:length])
+                if entry is not None:
+                    return True, entry[1]
+        return False, None
+
+    async def dispatch(self, interaction: discord.Interaction):
+        if interaction.type != discord.InteractionType.component:
+            return
+        custom_id = (interaction.data or {}).get("custom_id")
+        if not custom_id:
+            return
+
+        found, handler = self.resolve(custom_id)
+        try:
+            if found:
+                if handler is not None:
+                    await handler(interaction)
+                return
+            for _, _, fallback in list(self.fallbacks):
+                if await fallback(interaction):
+                    return
+        except Exception as e:
+            print(f"❌ Interaction handler error for '{custom_id}': {e}")
+            traceback.print_exc()
@@ -0,0 +1,312 @@
+"""Versioned schema migrations, applied once at startup (see main.py).
+
+Every migration is an ``async def`` taking a cursor, registered with
+``@migration(version, name)``. Applied versions are recorded in
+``schema_migrations`` so each one runs exactly once per database. Never edit a
+migration that has shipped; add a new one with the next version number.
+
+MySQL commits DDL implicitly, so helpers below are written to be idempotent:
+a migration interrupted half way can simply run again on the next start.
+"""
+
+MIGRATIONS = []
+
+LOCK_NAME = "donpollobot_schema_migrations"
+
+
+def migration(version: int, name: str):
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        return func
+    return register
+
+
+async def _column_exists(cursor, table, column):
+    await cursor.execute('''
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    ''', (table, column))
+    return await cursor.fetchone() is not None
+
+
+async def _add_column(cursor, table, column, definition):
+    if not await _column_exists(cursor, table, column):
+        await cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+async def _add_index(cursor, table, name, columns):
+    await cursor.execute('''
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    ''', (table, name))
+    if await cursor.fetchone() is None:
+        await cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+@migration(1, "baseline tables")
+async def _baseline(cursor):
+    # --- Economy ---
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS slot_users (
+            user_id BIGINT PRIMARY KEY,
+            balance BIGINT DEFAULT 500,
+            total_wins INT DEFAULT 0,
+            total_losses INT DEFAULT 0,
+            last_daily TEXT,
+            last_work TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS loans (
+            user_id BIGINT PRIMARY KEY,
+            amount BIGINT,
+            due_date TEXT
+        )
+    ''')
+
+    # --- Fishing ---
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fish_inventory (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT,
+            fish_name TEXT,
+            rarity TEXT,
+            weight DECIMAL(10, 2),
+            price INT,
+            caught_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fishing_rods (
+            user_id BIGINT,
+            rod_name VARCHAR(255),
+            level INT DEFAULT 0,
+            PRIMARY KEY (user_id, rod_name)
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fishing_profile (
+            user_id BIGINT PRIMARY KEY,
+            equipped_rod TEXT,
+            total_catches INT DEFAULT 0
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fishing_materials (
+            user_id BIGINT,
+            material_name VARCHAR(255),
+            amount INT DEFAULT 0,
+            PRIMARY KEY (user_id, material_name)
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fishing_items (
+            user_id BIGINT,
+            item_name VARCHAR(255),
+            amount INT DEFAULT 0,
+            PRIMARY KEY (user_id, item_name)
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fishing_buffs (
+            user_id BIGINT,
+            buff_name VARCHAR(255),
+            end_time TIMESTAMP,
+            PRIMARY KEY (user_id, buff_name)
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fishing_quests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT,
+            quest_type TEXT,
+            target_criteria TEXT,
+            target_value INT,
+            progress INT DEFAULT 0,
+            reward_amount INT,
+            is_claimed BOOLEAN DEFAULT 0,
+            created_at DATE,
+            quest_period TEXT,
+            expiration_date TIMESTAMP,
+            reward_type TEXT DEFAULT 'coin',
+            reward_name TEXT
+        )
+    ''')
+
+    # Columns added after the first fishing release
+    await _add_column(cursor, "fishing_profile", "total_catches", "INT DEFAULT 0")
+    await _add_column(cursor, "fishing_rods", "level", "INT DEFAULT 0")
+
+    # --- Tickets ---
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS guild_config (
+            guild_id BIGINT PRIMARY KEY,
+            category_id BIGINT,
+            log_channel_id BIGINT,
+            panel_channel_id BIGINT,
+            panel_message_id BIGINT,
+            support_role_id BIGINT
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS active_tickets (
+            channel_id BIGINT PRIMARY KEY,
+            guild_id BIGINT,
+            user_id BIGINT,
+            created_at TEXT,
+            reason TEXT
+        )
+    ''')
+
+    # --- RPS ---
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rps_stats (
+            user_id BIGINT PRIMARY KEY,
+            total_games INT DEFAULT 0,
+            games_won INT DEFAULT 0,
+            games_lost INT DEFAULT 0,
+            rounds_won INT DEFAULT 0,
+            rounds_lost INT DEFAULT 0,
+            rounds_tied INT DEFAULT 0,
+            last_played BIGINT DEFAULT 0
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rps_sessions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            player1_id BIGINT,
+            player2_id BIGINT,
+            winner_id BIGINT,
+            player1_score INT,
+            player2_score INT,
+            rounds_played INT,
+            timestamp BIGINT
+        )
+    ''')
+
+    # --- WhosLying ---
+    await cursor.execute('''CREATE TABLE IF NOT EXISTS game_channels
+                 (channel_id BIGINT PRIMARY KEY, guild_id BIGINT)''')
+    await cursor.execute('''CREATE TABLE IF NOT EXISTS lobby_messages
+                 (channel_id BIGINT PRIMARY KEY, message_id BIGINT)''')
+    await cursor.execute('''CREATE TABLE IF NOT EXISTS game_players
+                 (channel_id BIGINT, user_id BIGINT,
+                  PRIMARY KEY (channel_id, user_id))''')
+    await cursor.execute('''CREATE TABLE IF NOT EXISTS active_games
+                 (channel_id BIGINT PRIMARY KEY,
+                  theme TEXT, word TEXT, session INT,
+                  impostor_id BIGINT, phase TEXT)''')
+
+    # --- Warn ---
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            guild_id BIGINT NOT NULL,
+            user_id BIGINT NOT NULL,
+            moderator_id BIGINT NOT NULL,
+            moderator_name TEXT,
+            reason TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            case_number INT NOT NULL
+        )
+    ''')
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS warn_cases (
+            guild_id BIGINT PRIMARY KEY,
+            current_case INT DEFAULT 0
+        )
+    ''')
+
+
+@migration(2, "fishing_stats leaderboard aggregates")
+async def _fishing_stats(cursor):
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fishing_stats (
+            user_id BIGINT PRIMARY KEY,
+            networth BIGINT DEFAULT 0,
+            best_weight DECIMAL(10, 2) DEFAULT 0,
+            best_fish TEXT,
+            best_rarity TEXT,
+            INDEX idx_fishing_stats_networth (networth),
+            INDEX idx_fishing_stats_best_weight (best_weight)
+        )
+    ''')
+
+    # Backfill from existing inventories (skipped if the table was filled before)
+    await cursor.execute("SELECT COUNT(*) FROM fishing_stats")
+    if (await cursor.fetchone())[0] == 0:
+        await cursor.execute('''
+            INSERT INTO fishing_stats (user_id, networth, best_weight, best_fish, best_rarity)
+            SELECT t.user_id, t.networth, b.weight, b.fish_name, b.rarity
+            FROM (SELECT user_id, SUM(price) AS networth FROM fish_inventory GROUP BY user_id) t
+            JOIN fish_inventory b ON b.id = (
+                SELECT f.id FROM fish_inventory f WHERE f.user_id = t.user_id ORDER BY f.weight DESC, f.id LIMIT 1
+            )
+        ''')
+
+
+@migration(3, "indexes for hot fishing / economy / warn queries")
+async def _hot_path_indexes(cursor):
+    # Sell/salvage by rarity and per-user heaviest fish
+    await _add_index(cursor, "fish_inventory", "idx_fish_inventory_user_rarity", "user_id, rarity(20), weight")
+    await _add_index(cursor, "fish_inventory", "idx_fish_inventory_user_weight", "user_id, weight")
+    await _add_index(cursor, "fishing_quests", "idx_fishing_quests_user_period", "user_id, quest_period(10), created_at")
+    await _add_index(cursor, "fishing_profile", "idx_fishing_profile_total_catches", "total_catches")
+    await _add_index(cursor, "warnings", "idx_warnings_guild_user", "guild_id, user_id")
+    await _add_index(cursor, "slot_users", "idx_slot_users_balance", "balance")
+
+
+@migration(4, "keyset index for inventory pages")
+async def _inventory_keyset_index(cursor):
+    # "WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT n" reads exactly n index entries
+    await _add_index(cursor, "fish_inventory", "idx_fish_inventory_user_id", "user_id, id")
+
+
+@migration(5, "balance_ledger audit trail")
+async def _balance_ledger(cursor):
+    # One row per balance change; balance_after makes "balance as of T" a single index seek
+    await cursor.execute('''
+        CREATE TABLE IF NOT EXISTS balance_ledger (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            delta BIGINT NOT NULL,
+            balance_after BIGINT NOT NULL,
+            reason VARCHAR(32),
+            created_at DATETIME(6) NOT NULL,
+            INDEX idx_balance_ledger_user_time (user_id, created_at)
+        )
+    ''')
+
+
+async def run_migrations(db):
+    """Apply every pending migration in version order. Safe to call on every start."""
+    async with db.cursor() as cursor:
+        await cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(255),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Another instance starting at the same time waits instead of racing us
+        await cursor.execute("SELECT GET_LOCK(%s, 60)", (LOCK_NAME,))
+        try:
+            await cursor.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in await cursor.fetchall()}
+
+            for version, name, func in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in applied:
+                    continue
+                try:
+                    await func(cursor)
+                    await cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                    print(f"🧱 Applied migration {version:03d}: {name}")
+                except Exception as e:
+                    # Later migrations may depend on this one, so stop here
+                    print(f"❌ Migration {version:03d} ({name}) failed: {e}")
+                    return False
+        finally:
+            await cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+    return True
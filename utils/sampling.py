@@ -0,0 +1,59 @@
+import random
+
+
+class AliasSampler:
+    """Weighted sampler using Walker/Vose alias tables.
+
+    Built once from ``items`` and ``weights``; every roll afterwards is O(1)
+    (one uniform index + one coin flip) and allocates nothing, unlike
+    ``random.choices`` which rebuilds the cumulative weights on each call.
+    ``prob`` and ``alias`` are plain lists so offline tools can vectorise them.
+    """
+
+    def __init__(self, items, weights):
+        if len(items) != len(weights) or not items:
+            raise ValueError("items and weights must be non-empty and the same length")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("weights must sum to a positive number")
+
+        n = len(items)
+        self.items = list(items)
+        self.weights = list(weights)
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # Leftovers are 1.0 up to float rounding
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def roll(self, rng=random):
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+    def roll_n(self, n, rng=random):
+        items, prob, alias = self.items, self.prob, self.alias
+        size = len(items)
+        rand = rng.random
+        out = []
+        for _ in range(n):
+            i = int(rand() * size)
+            out.append(items[i] if rand() < prob[i] else items[alias[i]])
+        return out
+
+    def probabilities(self):
+        """[(item, probability), ...] in table order"""
+        total = float(sum(self.weights))
+        return [(item, w / total) for item, w in zip(self.items, self.weights)]
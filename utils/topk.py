@@ -0,0 +1,51 @@
+class TopK:
+    """In-memory top-K scoreboard fed by point updates.
+
+    Keeps up to ``capacity`` (> k) best entries so a score that drops out of the
+    top K can usually be replaced without going back to the database. The
+    invariant is: every key *not* stored has a score <= ``threshold``. When too
+    few entries are left to fill K, ``top()`` returns None and the caller
+    reloads from its source of truth with ``load()``.
+    """
+
+    def __init__(self, k: int = 15, capacity: int = None):
+        self.k = k
+        self.capacity = capacity or k * 4
+        self.entries = {}  # key -> (score, extra)
+        self.threshold = float("-inf")
+        self.ready = False
+
+    def load(self, rows):
+        """Reset from ``[(key, score, extra), ...]`` sorted by score DESC, at most ``capacity`` long."""
+        rows = list(rows)[: self.capacity]
+        self.entries = {key: (score, extra) for key, score, extra in rows}
+        # A full page means there may be more keys below the lowest one we kept
+        self.threshold = rows[-1][1] if len(rows) >= self.capacity else float("-inf")
+        self.ready = True
+
+    def update(self, key, score, extra=None):
+        if not self.ready:
+            return
+        if key in self.entries:
+            if score < self.threshold:
+                # Fell below keys we never stored; we can't rank it any more
+                del self.entries[key]
+            else:
+                self.entries[key] = (score, extra)
+        elif score > self.threshold:
+            self.entries[key] = (score, extra)
+            if len(self.entries) > self.capacity:
+                lowest = min(self.entries, key=lambda k: self.entries[k][0])
+                self.threshold = max(self.threshold, self.entries.pop(lowest)[0])
+
+    def top(self):
+        """``[(key, score, extra), ...]`` best first, or None if a reload is needed."""
+        if not self.ready:
+            return None
+        if len(self.entries) < self.k and self.threshold != float("-inf"):
+            return None
+        ranked = sorted(self.entries.items(), key=lambda item: item[1][0], reverse=True)[: self.k]
+        return [(key, score, extra) for key, (score, extra) in ranked]
+
+    def invalidate(self):
+        self.ready = False